@@ -0,0 +1,7 @@
+"""
+Modo assíncrono (ASGI) da aplicação
+Requer as dependências de requirements-async.txt (Quart + Hypercorn).
+"""
+from .app import create_async_app
+
+__all__ = ['create_async_app']
@@ -0,0 +1,165 @@
+"""
+Factory da aplicação assíncrona (ASGI).
+Expõe a mesma API /todos do app.py usando Quart e o AsyncMongoClient.
+"""
+import asyncio
+import logging
+import time
+from quart import Quart, g, request
+from config import Config
+from database import storage
+from aio.database import async_db
+from aio.routes import todos_bp
+from aio.services import AsyncSessionService
+from aio.session_store import AsyncSessionStore
+from monitoring import (bind_request_id, configure_logging, metrics, observe_request,
+                        report_profile, reset_request_id, roundtrip_budget, start_profile,
+                        stop_profile)
+from routes.metrics_routes import service_samples
+from services.activity_buffer import activity_buffer
+from services.email_filter import email_filter
+from services.expiry_reaper import expiry_reaper
+
+logger = logging.getLogger(__name__)
+
+
+def create_async_app():
+    """
+    Factory function para criar a aplicação Quart (modo assíncrono).
+    O app síncrono (app.py) continua disponível; os dois compartilham
+    banco, sessões, configuração e regras de negócio.
+    """
+    if Config.STORAGE_BACKEND != 'mongodb':
+        raise ValueError('O modo assíncrono requer STORAGE_BACKEND = "mongodb"')
+    if Config.SESSION_MODE != 'server':
+        raise ValueError('O modo assíncrono requer SESSION_MODE = "server"')
+
+    app = Quart(__name__)
+    app.config.from_object(Config)
+    configure_logging(app.config)
+    session_store = AsyncSessionStore(app.config)
+
+    @app.before_serving
+    async def startup():
+        """Índices e filtro de emails (usam o driver síncrono, fora do loop)."""
+        if app.config['DB_APPLY_INDEXES_ON_STARTUP']:
+            try:
+                await asyncio.to_thread(storage.ensure_schema)
+            except Exception:
+                logger.exception('Falha ao criar indices', extra={'event': 'db.indexes_failed'})
+        if email_filter is not None:
+            try:
+                await asyncio.to_thread(email_filter.rebuild)
+            except Exception:
+                logger.exception('Falha ao carregar filtro de emails', extra={'event': 'email_filter.failed'})
+        if app.config['EXPIRY_REAPER_ENABLED']:
+            expiry_reaper.ensure_started()
+
+    @app.after_serving
+    async def shutdown():
+        """Grava as atividades pendentes e fecha a conexão."""
+        await asyncio.to_thread(activity_buffer.flush)
+        await async_db.close()
+
+    if app.config['METRICS_ENABLED']:
+        if app.config['METRICS_MULTIPROC_DIR']:
+            # Soma entre os workers: cada um grava o seu snapshot no diretório
+            metrics.share(app.config['METRICS_MULTIPROC_DIR'], app.config['METRICS_FLUSH_INTERVAL'],
+                          extra=service_samples)
+
+        @app.before_request
+        async def start_request_timer():
+            metrics.ensure_writer()
+            g._request_started = time.perf_counter()
+
+        @app.after_request
+        async def record_request_metrics(response):
+            started = getattr(g, '_request_started', None)
+            if started is not None:
+                rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+                observe_request(request.blueprint, rule, request.method,
+                                response.status_code, time.perf_counter() - started)
+            return response
+
+    if app.config['DB_PROFILER_ENABLED']:
+        @app.before_request
+        async def start_db_profile():
+            g._db_profile = start_profile()
+
+        @app.after_request
+        async def report_db_profile(response):
+            active = g.get('_db_profile')
+            if active is not None:
+                report_profile(active[0], response, request.method, request.path,
+                               roundtrip_budget(app.config, request.endpoint), request.endpoint)
+            return response
+
+        @app.teardown_request
+        async def stop_db_profile(exception=None):
+            active = g.pop('_db_profile', None)
+            if active is not None:
+                stop_profile(active[1])
+
+    @app.before_request
+    async def bind_request_context():
+        g._request_id = bind_request_id(request.headers.get('X-Request-ID'))
+
+    @app.after_request
+    async def add_request_id_header(response):
+        active = getattr(g, '_request_id', None)
+        if active is not None:
+            response.headers['X-Request-ID'] = active[0]
+        return response
+
+    @app.teardown_request
+    async def reset_request_context(exception=None):
+        active = g.pop('_request_id', None)
+        if active is not None:
+            reset_request_id(active[1])
+
+    @app.before_request
+    async def open_session():
+        """Carrega a sessão (mesma coleção/formato do Flask-Session)."""
+        g.session = await session_store.open(request.cookies)
+
+    @app.after_request
+    async def save_session(response):
+        """Salva informações legíveis da sessão e grava a sessão."""
+        session = getattr(g, 'session', None)
+        if session is None:
+            return response
+
+        save_info = getattr(g, '_save_session_info', None)
+        if save_info is not None and not session_store.stores_session_info:
+            try:
+                await AsyncSessionService.create_session_info(
+                    session_id=session.sid,
+                    email=save_info['email'],
+                    user_id=save_info['user_id']
+                )
+            except Exception:
+                logger.exception('Falha ao salvar info de sessao', extra={'event': 'session.info_failed'})
+        elif save_info is None and 'user' in session:
+            AsyncSessionService.touch_session(session.sid)
+
+        await session_store.save(session, response)
+        return response
+
+    @app.after_request
+    async def add_cors_headers(response):
+        """CORS para o frontend (equivalente ao flask_cors do app síncrono)."""
+        origin = request.headers.get('Origin')
+        if origin in app.config['CORS_ORIGINS'] and request.path.startswith('/todos'):
+            response.headers['Access-Control-Allow-Origin'] = origin
+            response.headers['Access-Control-Allow-Credentials'] = 'true'
+            response.vary.add('Origin')
+            if request.method == 'OPTIONS':
+                response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
+                response.headers['Access-Control-Allow-Headers'] = request.headers.get(
+                    'Access-Control-Request-Headers', 'Content-Type'
+                )
+        return response
+
+    app.register_blueprint(todos_bp)
+
+    return app
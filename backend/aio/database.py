@@ -0,0 +1,51 @@
+"""
+Conexão assíncrona com MongoDB (pymongo AsyncMongoClient).
+O cliente vem do registro de clientes (database.clients) e é criado no
+primeiro uso, já dentro do event loop do servidor.
+"""
+from pymongo import AsyncMongoClient
+from config import Config
+from database.clients import mongo_clients
+
+
+class AsyncDatabaseConnection:
+    """
+    Singleton para a conexão assíncrona com MongoDB.
+    Mesma interface de database.connection.DatabaseConnection.
+    """
+    _instance = None
+
+    def __new__(cls):
+        """Cria uma única instância do AsyncDatabaseConnection."""
+        if cls._instance is None:
+            cls._instance = super(AsyncDatabaseConnection, cls).__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_instance(cls):
+        """Retorna a instância única do AsyncDatabaseConnection."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def client(self) -> AsyncMongoClient:
+        """Retorna o cliente assíncrono, criando-o no primeiro uso."""
+        return mongo_clients.get_async()
+
+    @property
+    def db(self):
+        """Retorna o banco de dados."""
+        return self.client[Config.DB_NAME]
+
+    def get_collection(self, collection_name):
+        """Retorna uma coleção específica do banco de dados."""
+        return self.db[collection_name]
+
+    async def close(self):
+        """Fecha a conexão com MongoDB."""
+        await mongo_clients.close_async()
+
+
+# Instância única do banco assíncrono
+async_db = AsyncDatabaseConnection.get_instance()
@@ -0,0 +1,355 @@
+"""
+Rotas do modo assíncrono
+Mesma API /todos das rotas síncronas (routes/), sobre Quart.
+"""
+from functools import wraps
+from quart import Blueprint, Response, current_app, g, jsonify, request
+from aio.services import AsyncAuthService, AsyncSessionService, AsyncTaskService, AsyncTokenService
+from services.password_hasher import HashPoolBusyError
+from services.task_service import TaskService
+from services.task_events import task_events, async_sse_events, StreamLimitError, StreamCapacityError
+from monitoring import metrics
+from routes.metrics_routes import check_metrics_access, service_samples
+
+# Um único Blueprint com todas as rotas /todos
+todos_bp = Blueprint('todos', __name__, url_prefix='/todos')
+
+
+def require_auth(f):
+    """Versão async de middleware.auth_middleware.require_auth."""
+    @wraps(f)
+    async def decorated_function(*args, **kwargs):
+        if 'user' not in g.session:
+            return jsonify({'error': 'Não autorizado'}), 401
+        return await f(*args, **kwargs)
+    return decorated_function
+
+
+@todos_bp.errorhandler(HashPoolBusyError)
+async def handle_hash_pool_busy(error):
+    """Responde rápido com 503 quando o pool de hash de senhas está cheio."""
+    response = jsonify({'error': 'Servidor ocupado, tente novamente em instantes'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
+
+# ---------------------------------------------------------------------------
+# Autenticação
+# ---------------------------------------------------------------------------
+
+@todos_bp.route('/register', methods=['POST'])
+async def register():
+    """Rota de cadastro de novo usuário."""
+    data = await request.get_json() or {}
+    email = data.get('email')
+    password = data.get('password')
+
+    if not email or not password:
+        return jsonify({'error': 'Email e senha são obrigatórios'}), 400
+
+    user_id = await AsyncAuthService.create_user(email, password)
+    if user_id is None:
+        return jsonify({'error': 'Usuário já existe'}), 409
+
+    return jsonify({
+        'message': 'Usuário cadastrado com sucesso!',
+        'user_id': user_id
+    }), 201
+
+
+@todos_bp.route('/login', methods=['POST'])
+async def login():
+    """Rota de login - autentica um usuário e cria uma sessão."""
+    data = await request.get_json() or {}
+    email = data.get('email')
+    password = data.get('password')
+    remember_me = data.get('remember_me', False)
+
+    if not email or not password:
+        return jsonify({'error': 'Email e senha são obrigatórios'}), 400
+
+    user = await AsyncAuthService.authenticate(email, password)
+    if user is None:
+        return jsonify({'error': 'Email ou senha inválidos'}), 401
+
+    g.session['user'] = {'email': user['email'], '_id': user['_id']}
+    g._save_session_info = {'email': user['email'], 'user_id': user['_id']}
+
+    response_data = {
+        'message': 'Acesso Permitido!',
+        'user_id': user['_id']
+    }
+    if remember_me:
+        response_data['token'] = await AsyncTokenService.create_token(user['_id'], user['email'])
+
+    return jsonify(response_data), 200
+
+
+@todos_bp.route('/logout', methods=['POST'])
+async def logout():
+    """Rota de logout - encerra a sessão e revoga o token, se enviado."""
+    data = await request.get_json(silent=True) or {}
+    token = data.get('token')
+
+    if token:
+        await AsyncTokenService.revoke_token(token)
+
+    if 'user' in g.session:
+        await AsyncSessionService.deactivate_session(g.session.sid)
+        # Sessão vazia: removida do banco e avisada aos outros workers
+        g.session.clear()
+        return jsonify({'message': 'Logout bem-sucedido'}), 200
+    return jsonify({'error': 'Nenhuma sessão ativa'}), 400
+
+
+@todos_bp.route('/session', methods=['GET'])
+async def check_session():
+    """Rota para verificar se há uma sessão ativa."""
+    if 'user' in g.session:
+        return jsonify({'logged_in': True, 'user': g.session['user']}), 200
+    return jsonify({'logged_in': False}), 401
+
+
+@todos_bp.route('/sessions', methods=['GET'])
+async def get_all_sessions():
+    """Rota para listar todas as sessões ativas."""
+    sessions = await AsyncSessionService.get_all_active_sessions()
+    return jsonify({'total': len(sessions), 'sessions': sessions}), 200
+
+
+@todos_bp.route('/auto-login', methods=['POST'])
+async def auto_login():
+    """Rota para login automático usando token."""
+    data = await request.get_json(silent=True)
+    token = data.get('token') if data else None
+
+    if not token:
+        return jsonify({'error': 'Token é obrigatório'}), 400
+
+    user_info = await AsyncTokenService.validate_token(token)
+    if user_info is None:
+        return jsonify({'error': 'Token inválido ou expirado'}), 401
+
+    g.session['user'] = {'email': user_info['email'], '_id': user_info['user_id']}
+    g._save_session_info = {'email': user_info['email'], 'user_id': user_info['user_id']}
+
+    return jsonify({
+        'message': 'Login automático realizado com sucesso!',
+        'user_id': user_info['user_id'],
+        'user': {'email': user_info['email'], '_id': user_info['user_id']}
+    }), 200
+
+
+# ---------------------------------------------------------------------------
+# Tarefas
+# ---------------------------------------------------------------------------
+
+@todos_bp.route('', methods=['GET'])
+@require_auth
+async def get_tasks():
+    """Lista as tarefas (completa, paginada ou em streaming), com ETag."""
+    user_id = g.session['user']['_id']
+
+    # A mesma versão identifica o ETag e a lista servida (ou lida do cache)
+    version = await AsyncTaskService.get_list_version(user_id)
+    variant = request.query_string.decode('utf-8') + '|' + (request.accept_mimetypes.best or '')
+    etag = TaskService.make_list_etag(user_id, version, variant)
+    if request.if_none_match.contains(etag):
+        return _with_list_cache_headers(Response('', status=304), etag)
+
+    response, status = await _list_tasks(user_id, version)
+    if status != 200:
+        return response, status
+    response.status_code = status
+    return _with_list_cache_headers(response, etag)
+
+
+@todos_bp.route('/changes', methods=['GET'])
+@require_auth
+async def get_changes():
+    """Sincronização incremental das tarefas (ver routes/task_routes.py)."""
+    user_id = g.session['user']['_id']
+    limit = request.args.get('limit')
+
+    max_limit = current_app.config['TASKS_PAGE_MAX_LIMIT']
+    try:
+        limit = int(limit) if limit is not None else max_limit
+    except ValueError:
+        return jsonify({'error': 'O parâmetro "limit" deve ser um número'}), 400
+
+    if limit < 1:
+        return jsonify({'error': 'O parâmetro "limit" deve ser maior que zero'}), 400
+    limit = min(limit, max_limit)
+
+    try:
+        changes = await AsyncTaskService.get_changes(user_id, request.args.get('since'), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify(changes)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response, 200
+
+
+@todos_bp.route('/stream', methods=['GET'])
+@require_auth
+async def stream_tasks():
+    """Feed de alterações das tarefas (ver routes/task_routes.py)."""
+    if not current_app.config['TASK_STREAM_ENABLED']:
+        return jsonify({'error': 'Não encontrado'}), 404
+
+    user_id = g.session['user']['_id']
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    config = current_app.config
+    try:
+        subscription = task_events.subscribe(
+            user_id, last_event_id, max_connections=config['TASK_STREAM_MAX_CONNECTIONS'] or None
+        )
+    except StreamCapacityError:
+        response = jsonify({'error': 'Servidor sem conexões livres para o feed'})
+        response.headers['Retry-After'] = str(max(1, config['TASK_STREAM_RETRY_MS'] // 1000))
+        return response, 429
+    except StreamLimitError:
+        return jsonify({'error': 'Muitas conexões abertas para este usuário'}), 429
+
+    chunks = async_sse_events(subscription, config['TASK_STREAM_HEARTBEAT'],
+                              config['TASK_STREAM_MAX_DURATION'], config['TASK_STREAM_RETRY_MS'])
+    response = Response(chunks, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    # A duração já é limitada por TASK_STREAM_MAX_DURATION
+    response.timeout = None
+    return response
+
+
+@todos_bp.route('', methods=['POST'])
+@require_auth
+async def create_task():
+    """Cria uma nova tarefa."""
+    user_id = g.session['user']['_id']
+    data = await request.get_json(silent=True)
+
+    if not data or 'text' not in data:
+        return jsonify({'error': 'O campo "text" é obrigatório'}), 400
+
+    return jsonify(await AsyncTaskService.create_task(data['text'], user_id)), 201
+
+
+@todos_bp.route('/batch', methods=['POST'])
+@require_auth
+async def batch_tasks():
+    """Aplica várias operações de tarefas em uma única requisição."""
+    user_id = g.session['user']['_id']
+    data = await request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    ordered = data.get('ordered', True)
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'O campo "operations" deve ser uma lista não vazia'}), 400
+    if not isinstance(ordered, bool):
+        return jsonify({'error': 'O campo "ordered" deve ser true ou false'}), 400
+
+    max_operations = current_app.config['TASKS_BATCH_MAX_OPERATIONS']
+    if len(operations) > max_operations:
+        return jsonify({
+            'error': f'O lote pode ter no máximo {max_operations} operações'
+        }), 400
+
+    results = await AsyncTaskService.apply_batch(user_id, operations, ordered=ordered)
+    return jsonify({'results': results}), 200
+
+
+@todos_bp.route('/<string:task_id>', methods=['PUT'])
+@require_auth
+async def modify_task(task_id):
+    """Atualiza uma tarefa existente."""
+    user_id = g.session['user']['_id']
+    data = await request.get_json(silent=True)
+
+    text = data.get('text') if data else None
+    done = data.get('done') if data else None
+
+    updated_task = await AsyncTaskService.update_task(task_id, user_id, text=text, done=done)
+    if updated_task is None:
+        return jsonify({
+            'error': 'Tarefa não encontrada ou não pertence ao usuário'
+        }), 404
+    return jsonify(updated_task), 200
+
+
+@todos_bp.route('/<string:task_id>', methods=['DELETE'])
+@require_auth
+async def remove_task(task_id):
+    """Deleta uma tarefa."""
+    user_id = g.session['user']['_id']
+    if not await AsyncTaskService.delete_task(task_id, user_id):
+        return jsonify({
+            'error': 'Tarefa não encontrada ou não pertence ao usuário'
+        }), 404
+    return jsonify({"message": "Tarefa deletada com sucesso"}), 200
+
+
+# ---------------------------------------------------------------------------
+# Métricas
+# ---------------------------------------------------------------------------
+
+@todos_bp.route('/metrics', methods=['GET'])
+async def get_metrics():
+    """Métricas no formato Prometheus (ver routes/metrics_routes.py)."""
+    if not current_app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Não encontrado'}), 404
+
+    denied = check_metrics_access(current_app.config, request.headers.get('Authorization', ''),
+                                  request.remote_addr)
+    if denied is not None:
+        return Response(denied[0], status=denied[1], mimetype='text/plain')
+
+    body = metrics.render(extra=service_samples())
+    return Response(body, mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _with_list_cache_headers(response: Response, etag: str) -> Response:
+    """Adiciona o ETag e obriga o navegador a revalidar a lista."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+async def _list_tasks(user_id: str, version: int):
+    """Monta a resposta de listagem (completa, paginada ou em streaming)."""
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+
+    stream_mode = request.args.get('stream')
+    if stream_mode is None and request.accept_mimetypes.best == 'application/x-ndjson':
+        stream_mode = 'ndjson'
+
+    if stream_mode is not None:
+        if stream_mode == 'ndjson':
+            chunks = AsyncTaskService.stream_tasks_ndjson(user_id)
+            mimetype = 'application/x-ndjson'
+        elif stream_mode in ('json', '1', 'true'):
+            chunks = AsyncTaskService.stream_tasks_json(user_id)
+            mimetype = 'application/json'
+        else:
+            return jsonify({'error': 'O parâmetro "stream" deve ser "json" ou "ndjson"'}), 400
+        return Response(chunks, mimetype=mimetype), 200
+
+    if limit is None and cursor is None:
+        return jsonify(await AsyncTaskService.get_all_tasks(user_id, version)), 200
+
+    max_limit = current_app.config['TASKS_PAGE_MAX_LIMIT']
+    try:
+        limit = int(limit) if limit is not None else max_limit
+    except ValueError:
+        return jsonify({'error': 'O parâmetro "limit" deve ser um número'}), 400
+
+    if limit < 1:
+        return jsonify({'error': 'O parâmetro "limit" deve ser maior que zero'}), 400
+    limit = min(limit, max_limit)
+
+    try:
+        page = await AsyncTaskService.get_tasks_page(user_id, limit, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page), 200
@@ -0,0 +1,456 @@
+"""
+Serviços assíncronos
+Versões async de TaskService, AuthService, TokenService e SessionService.
+Só o acesso ao banco é assíncrono: as regras (validação, cursores, ETag,
+cache, eventos, documentos gravados) são as funções dos serviços síncronos
+e de database.storage.mongo, chamadas pelos dois modos.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from config import Config, session_info_in_session
+from aio.database import async_db
+from models.task import Task
+from database import storage
+from database.storage.base import finish_bulk
+from database.storage.mongo import (
+    referenced_ids, owned_filter, plan_bulk, merge_bulk_errors, tombstone_requests, any_applied,
+    updated_ids, merge_updated, page_filter, merge_changes, seq_now, sync_seq, version_bump,
+    changes_filter, new_task_doc, task_update, tombstone_doc, token_revocation,
+    session_deactivation, MongoSessionInfoStore, REVOCATION_PROJECTION, TOKEN_PROJECTION,
+    TASK_CHANGES_PROJECTION, TASK_UPDATE_OPTIONS, TOMBSTONES_COLLECTION_NAME
+)
+from services.task_service import TaskService, task_cache
+from services.auth_service import AuthService
+from services.session_service import SessionService
+from services.activity_buffer import activity_buffer
+from services.password_hasher import password_hasher
+from services.token_cache import RevocationChannel
+from services.token_service import TokenService, token_cache
+
+
+class AsyncTaskService:
+    """
+    Operações de tarefas com o driver assíncrono.
+    """
+
+    @staticmethod
+    def get_collection():
+        """Retorna a coleção de tarefas."""
+        return async_db.get_collection(Task.COLLECTION_NAME)
+
+    @staticmethod
+    async def find_page(user_id: str, limit: int = None, after_id: str = None) -> List[Dict]:
+        """Busca tarefas em ordem de _id (ver Task.find_page_by_user)."""
+        cursor = AsyncTaskService.get_collection().find(page_filter(user_id, after_id),
+                                                        Task.LIST_PROJECTION)
+        cursor = cursor.sort('_id', ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        return [Task.doc_to_dict(task_doc) async for task_doc in cursor]
+
+    @staticmethod
+    async def get_all_tasks(user_id: str, version: Optional[int] = None) -> List[Dict]:
+        """
+        Recupera todas as tarefas de um usuário, pelo mesmo cache versionado
+        do modo síncrono (ver TaskService.get_all_tasks).
+        """
+        if task_cache is None:
+            return await AsyncTaskService.find_page(user_id)
+
+        if version is None:
+            version = await AsyncTaskService.get_list_version(user_id)
+        tasks = task_cache.get(user_id, version)
+        if tasks is None:
+            tasks = await AsyncTaskService.find_page(user_id)
+            task_cache.set(user_id, tasks, version)
+        return tasks
+
+    @staticmethod
+    async def get_tasks_page(user_id: str, limit: int, cursor: str = None) -> Dict:
+        """
+        Recupera uma página de tarefas (ver TaskService.get_tasks_page).
+
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        after_id = TaskService.decode_cursor(cursor) if cursor else None
+        tasks = await AsyncTaskService.find_page(user_id, limit=limit + 1, after_id=after_id)
+        return TaskService.format_page(tasks, limit)
+
+    @staticmethod
+    async def iter_tasks(user_id: str, batch_size: int = 500) -> AsyncIterator[Dict]:
+        """Itera sobre as tarefas sem carregá-las todas em memória."""
+        cursor = AsyncTaskService.get_collection().find({'user_id': user_id}, Task.LIST_PROJECTION)
+        cursor = cursor.sort('_id', ASCENDING).batch_size(batch_size)
+        try:
+            async for task_doc in cursor:
+                yield Task.doc_to_dict(task_doc)
+        finally:
+            await cursor.close()
+
+    @staticmethod
+    async def stream_tasks_json(user_id: str) -> AsyncIterator[str]:
+        """Gera as tarefas como um array JSON, em pedaços."""
+        yield '['
+        index = 0
+        async for task in AsyncTaskService.iter_tasks(user_id):
+            yield TaskService.json_array_item(task, index)
+            index += 1
+        yield ']'
+
+    @staticmethod
+    async def stream_tasks_ndjson(user_id: str) -> AsyncIterator[str]:
+        """Gera as tarefas como NDJSON (uma tarefa por linha)."""
+        async for task in AsyncTaskService.iter_tasks(user_id):
+            yield json.dumps(task) + '\n'
+
+    @staticmethod
+    async def get_list_version(user_id: str) -> int:
+        """Retorna a versão da lista (ver TaskService.get_list_version)."""
+        collection = async_db.get_collection(Task.VERSIONS_COLLECTION_NAME)
+        version_doc = await collection.find_one({'_id': user_id}, {'version': 1})
+        return version_doc.get('version', 0) if version_doc else 0
+
+    @staticmethod
+    async def get_list_etag(user_id: str, variant: str = '') -> str:
+        """Calcula o ETag da lista (ver TaskService.get_list_etag)."""
+        version = await AsyncTaskService.get_list_version(user_id)
+        return TaskService.make_list_etag(user_id, version, variant)
+
+    @staticmethod
+    async def bump_list_version(user_id: str) -> None:
+        """Incrementa a versão da lista (após uma escrita que mudou algo)."""
+        await async_db.get_collection(Task.VERSIONS_COLLECTION_NAME).update_one(
+            *version_bump(user_id), upsert=True
+        )
+
+    @staticmethod
+    async def get_changes(user_id: str, cursor: str = None, limit: int = 500) -> Dict:
+        """Sincronização incremental (ver TaskService.get_changes)."""
+        now = int(time.time())
+        since, basis = TaskService.decode_sync_cursor(cursor) if cursor else (None, None)
+
+        current_seq = sync_seq(Config.TASK_SYNC_LAG)
+
+        if TaskService.needs_reset(since, basis, now):
+            return TaskService.format_reset(await AsyncTaskService.find_page(user_id), current_seq, now)
+
+        query_filter = changes_filter(user_id, since)
+        task_cursor = AsyncTaskService.get_collection().find(query_filter, TASK_CHANGES_PROJECTION)
+        tombstone_cursor = async_db.get_collection(TOMBSTONES_COLLECTION_NAME).find(query_filter, {'seq': 1})
+        task_docs, tombstone_docs = await asyncio.gather(
+            task_cursor.sort('seq', ASCENDING).limit(limit + 1).to_list(None),
+            tombstone_cursor.sort('seq', ASCENDING).limit(limit + 1).to_list(None)
+        )
+        changes = merge_changes(task_docs, tombstone_docs, limit + 1)
+        return TaskService.format_changes(changes, since, current_seq, basis, now, limit)
+
+    @staticmethod
+    async def create_task(text: str, user_id: str) -> Dict:
+        """Cria uma nova tarefa."""
+        task_doc = new_task_doc(user_id, text, False, seq_now())
+        await AsyncTaskService.get_collection().insert_one(task_doc)
+        await AsyncTaskService.bump_list_version(user_id)
+        return TaskService.after_write('created', user_id, Task.doc_to_dict(task_doc))
+
+    @staticmethod
+    async def update_task(task_id: str, user_id: str, text: str = None, done: bool = None) -> Optional[Dict]:
+        """Atualiza uma tarefa em uma única escrita."""
+        if not ObjectId.is_valid(task_id):
+            return None
+
+        fields = TaskService.update_fields(text, done)
+        collection = AsyncTaskService.get_collection()
+        if not fields:
+            task_doc = await collection.find_one({'_id': ObjectId(task_id), 'user_id': user_id},
+                                                 Task.LIST_PROJECTION)
+            return Task.doc_to_dict(task_doc) if task_doc else None
+
+        task_doc = await collection.find_one_and_update(
+            *task_update(ObjectId(task_id), user_id, fields, seq_now()), **TASK_UPDATE_OPTIONS
+        )
+        if task_doc is None:
+            return None
+        await AsyncTaskService.bump_list_version(user_id)
+        return TaskService.after_write('updated', user_id, Task.doc_to_dict(task_doc))
+
+    @staticmethod
+    async def delete_task(task_id: str, user_id: str) -> bool:
+        """Deleta uma tarefa e deixa a sua lápide."""
+        if not ObjectId.is_valid(task_id):
+            return False
+
+        obj_id = ObjectId(task_id)
+        task_doc = await AsyncTaskService.get_collection().find_one_and_delete(
+            {'_id': obj_id, 'user_id': user_id},
+            projection={'_id': 1}
+        )
+        if task_doc is None:
+            return False
+        tombstone = tombstone_doc(obj_id, user_id, seq_now(), datetime.utcnow())
+        await async_db.get_collection(TOMBSTONES_COLLECTION_NAME).replace_one(
+            {'_id': obj_id}, tombstone, upsert=True
+        )
+        await AsyncTaskService.bump_list_version(user_id)
+        TaskService.after_write('deleted', user_id, {'_id': task_id})
+        return True
+
+    @staticmethod
+    async def apply_batch(user_id: str, operations: List[Dict], ordered: bool = True) -> List[Dict]:
+        """Aplica um lote de operações (ver TaskService.apply_batch e MongoTaskStore.bulk_apply)."""
+        results, valid_ops, valid_index = TaskService.validate_batch(operations, ordered)
+        collection = AsyncTaskService.get_collection()
+
+        referenced = referenced_ids(valid_ops)
+        existing = set()
+        if referenced:
+            cursor = collection.find(owned_filter(user_id, referenced), {'_id': 1})
+            existing = {str(task_doc['_id']) async for task_doc in cursor}
+
+        if valid_ops:
+            requests, request_index, bulk_results, tombstones = plan_bulk(
+                user_id, valid_ops, existing, ordered, seq_now(), datetime.utcnow()
+            )
+            if requests:
+                try:
+                    await collection.bulk_write(requests, ordered=ordered)
+                except BulkWriteError as e:
+                    merge_bulk_errors(bulk_results, request_index, e.details, ordered)
+
+            deleted = tombstone_requests(tombstones, bulk_results)
+            if deleted:
+                await async_db.get_collection(TOMBSTONES_COLLECTION_NAME).bulk_write(
+                    deleted, ordered=False
+                )
+            if any_applied(bulk_results):
+                await AsyncTaskService.bump_list_version(user_id)
+
+            updated = updated_ids(valid_ops, bulk_results)
+            if updated:
+                cursor = collection.find(owned_filter(user_id, updated), Task.LIST_PROJECTION)
+                merge_updated(valid_ops, bulk_results, [task_doc async for task_doc in cursor])
+
+            for index, result in zip(valid_index, finish_bulk(bulk_results)):
+                results[index] = result
+        return TaskService.after_batch(user_id, operations, results)
+
+
+class AsyncAuthService:
+    """
+    Operações de autenticação com o driver assíncrono.
+    O hash de senhas continua no pool de processos (sem bloquear o loop).
+    """
+    COLLECTION_NAME = 'users'
+
+    @staticmethod
+    def get_collection():
+        """Retorna a coleção de usuários."""
+        return async_db.get_collection(AsyncAuthService.COLLECTION_NAME)
+
+    @staticmethod
+    async def create_user(email: str, password: str) -> Optional[str]:
+        """
+        Cria um novo usuário (ver AuthService.create_user).
+
+        Raises:
+            HashPoolBusyError: Se o pool de hash estiver sobrecarregado
+        """
+        collection = AsyncAuthService.get_collection()
+        if AuthService.email_may_exist(email):
+            if await collection.find_one({'email': email}, {'_id': 1}):
+                return None
+
+        password_hash = await asyncio.to_thread(password_hasher.hash, password)
+        # Mesma verificação do índice único do MongoUserStore.insert (estado compartilhado)
+        email_index = storage.users.email_index
+        if email_index.needs_check():
+            email_index.record(await collection.index_information())
+        if not email_index.present and await collection.find_one({'email': email}, {'_id': 1}):
+            return None
+        try:
+            result = await collection.insert_one({'email': email, 'password': password_hash})
+        except DuplicateKeyError:
+            return None
+
+        user_id = str(result.inserted_id)
+        AuthService.on_user_created(email, user_id)
+        return user_id
+
+    @staticmethod
+    async def authenticate(email: str, password: str) -> Optional[Dict]:
+        """
+        Autentica um usuário.
+        Retorna os dados do usuário direto (sem uma segunda busca por email).
+
+        Returns:
+            Dicionário com _id e email, ou None se as credenciais forem inválidas
+
+        Raises:
+            HashPoolBusyError: Se o pool de hash estiver sobrecarregado
+        """
+        collection = AsyncAuthService.get_collection()
+        user_doc = await collection.find_one({'email': email})
+        if not user_doc or not user_doc.get('password'):
+            return None
+
+        if not await asyncio.to_thread(password_hasher.verify, user_doc['password'], password):
+            return None
+
+        new_hash = await asyncio.to_thread(AuthService.rehash_password, user_doc['password'], password)
+        if new_hash is not None:
+            await collection.update_one({'_id': user_doc['_id']}, {'$set': {'password': new_hash}})
+
+        return {'_id': str(user_doc['_id']), 'email': user_doc['email']}
+
+
+class AsyncTokenService:
+    """
+    Tokens de login automático com o driver assíncrono.
+    """
+    COLLECTION_NAME = 'auth_tokens'
+
+    @staticmethod
+    def get_collection():
+        """Retorna a coleção de tokens."""
+        return async_db.get_collection(AsyncTokenService.COLLECTION_NAME)
+
+    @staticmethod
+    async def create_token(user_id: str, email: str, days_valid: int = 30) -> str:
+        """Cria um novo token de autenticação para o usuário."""
+        token_data = TokenService.new_token_data(user_id, email, days_valid)
+        await AsyncTokenService.get_collection().insert_one(dict(token_data))
+        return token_data['token']
+
+    @staticmethod
+    async def validate_token(token: str) -> Optional[Dict]:
+        """
+        Valida um token e retorna as informações do usuário se válido.
+        Usa o mesmo cache de tokens validados do TokenService.
+        """
+        if token_cache is not None:
+            await AsyncTokenService.poll_revocations()
+            user_info = token_cache.get(token, poll=False)
+            if user_info is not None:
+                await AsyncTokenService._touch_last_used(token)
+                return user_info
+
+        collection = AsyncTokenService.get_collection()
+        token_doc = await collection.find_one({'token': token, 'is_active': True}, TOKEN_PROJECTION)
+        if not token_doc:
+            return None
+
+        if TokenService.is_expired(token_doc):
+            await collection.update_one({'token': token}, {'$set': {'is_active': False}})
+            return None
+
+        user_info = TokenService.accept_token(token, token_doc)
+        await AsyncTokenService._touch_last_used(token)
+        return user_info
+
+    @staticmethod
+    async def poll_revocations() -> None:
+        """Aplica no cache as revogações de outros workers (ver RevocationChannel.poll)."""
+        window = token_cache.channel.claim()
+        if window is None:
+            return
+        since, sync_started = window
+        cursor = async_db.get_collection(RevocationChannel.COLLECTION_NAME).find(
+            {'created_at': {'$gte': since}}, REVOCATION_PROJECTION
+        )
+        token_cache.channel.apply(token_cache, [event async for event in cursor], sync_started)
+
+    @staticmethod
+    async def publish_revocation(token: str = None, user_id: str = None) -> None:
+        """
+        Publica uma revogação aos outros workers (ver RevocationChannel.publish).
+
+        Args:
+            token: Token revogado, ou hash da sessão encerrada (ver database.sessions)
+            user_id: Usuário com todos os tokens revogados
+        """
+        await async_db.get_collection(RevocationChannel.COLLECTION_NAME).insert_one(
+            RevocationChannel.event(token=token, user_id=user_id)
+        )
+
+    @staticmethod
+    async def _touch_last_used(token: str) -> None:
+        """Atualiza o last_used_at (no máximo uma vez por intervalo com o cache)."""
+        if TokenService.last_used_due(token):
+            await AsyncTokenService.get_collection().update_one(
+                {'token': token}, {'$set': {'last_used_at': datetime.utcnow()}}
+            )
+
+    @staticmethod
+    async def revoke_token(token: str) -> bool:
+        """Revoga um token e avisa os outros workers."""
+        result = await AsyncTokenService.get_collection().update_one(
+            {'token': token}, token_revocation(datetime.utcnow())
+        )
+        if token_cache is not None:
+            token_cache.invalidate(token)
+            await AsyncTokenService.publish_revocation(token=token)
+        return result.modified_count > 0
+
+    @staticmethod
+    async def revoke_all_user_tokens(user_id: str) -> int:
+        """Revoga todos os tokens de um usuário e avisa os outros workers."""
+        result = await AsyncTokenService.get_collection().update_many(
+            {'user_id': user_id, 'is_active': True}, token_revocation(datetime.utcnow())
+        )
+        if token_cache is not None:
+            token_cache.invalidate_user(user_id)
+            await AsyncTokenService.publish_revocation(user_id=user_id)
+        return result.modified_count
+
+
+class AsyncSessionService:
+    """
+    Informações legíveis de sessão com o driver assíncrono.
+    Com SESSION_INFO_IN_SESSION, ficam nos documentos da própria sessão.
+    """
+    COLLECTION_NAME = (Config.SESSION_MONGODB_COLLECT if session_info_in_session()
+                       else MongoSessionInfoStore.COLLECTION_NAME)
+
+    @staticmethod
+    def get_collection():
+        """Retorna a coleção de informações de sessão."""
+        return async_db.get_collection(AsyncSessionService.COLLECTION_NAME)
+
+    @staticmethod
+    async def create_session_info(session_id: str, email: str, user_id: str,
+                                  expiration_minutes: int = 31) -> Dict:
+        """Cria informações legíveis de uma sessão."""
+        session_info = SessionService.new_session_info(session_id, email, user_id, expiration_minutes)
+        await AsyncSessionService.get_collection().insert_one(dict(session_info))
+        return session_info
+
+    @staticmethod
+    def touch_session(session_id: str) -> None:
+        """
+        Registra atividade no buffer write-behind (sem I/O no loop).
+        Com o buffer cheio, a gravação fica com a thread do buffer.
+        """
+        activity_buffer.touch(session_id, background=True)
+
+    @staticmethod
+    async def deactivate_session(session_id: str) -> bool:
+        """Desativa uma sessão (logout)."""
+        activity_buffer.discard(session_id)
+        result = await AsyncSessionService.get_collection().update_one(
+            {'session_id': session_id}, session_deactivation(datetime.utcnow())
+        )
+        return result.modified_count > 0
+
+    @staticmethod
+    async def get_all_active_sessions() -> list:
+        """Retorna todas as sessões ativas (formato legível)."""
+        cursor = AsyncSessionService.get_collection().find(
+            {'is_active': True}, MongoSessionInfoStore.PROJECTION
+        ).sort('created_at', -1)
+        return [SessionService.to_readable(session) async for session in cursor]
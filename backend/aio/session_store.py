@@ -0,0 +1,141 @@
+"""
+Sessões do modo assíncrono.
+Lê e grava na mesma coleção e no mesmo formato do Flask-Session (MongoDB,
+msgpack), então um cookie de sessão vale nos dois modos de execução.
+Como no app síncrono, sessões não modificadas só renovam a validade a cada
+SESSION_REFRESH_INTERVAL e, com SESSION_INFO_IN_SESSION, as informações
+legíveis vão no mesmo documento (as mesmas funções de database.sessions).
+O logout é publicado no canal de revogações, para que os workers do app
+síncrono descartem a sessão dos seus caches.
+"""
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import msgspec
+from itsdangerous import BadSignature, Signer, want_bytes
+from aio.database import async_db
+from aio.services import AsyncTokenService
+from database.sessions import needs_refresh, session_key, session_upsert
+
+
+class AsyncSession(dict):
+    """Dicionário de sessão com o ID e o controle de modificação."""
+
+    def __init__(self, data: Dict = None, sid: str = None, new: bool = False,
+                 expiration: Optional[datetime] = None):
+        super().__init__(data or {})
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        # Validade gravada no banco (None em sessões novas)
+        self.expiration = expiration
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.modified = True
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.modified = True
+
+    def pop(self, key, *args):
+        self.modified = self.modified or key in self
+        return super().pop(key, *args)
+
+    def clear(self):
+        self.modified = self.modified or bool(self)
+        super().clear()
+
+
+class AsyncSessionStore:
+    """
+    Store de sessões compatível com o MongoDBSessionInterface do Flask-Session.
+    """
+
+    def __init__(self, config: Dict):
+        self.collection_name = config['SESSION_MONGODB_COLLECT']
+        self.key_prefix = config.get('SESSION_KEY_PREFIX', 'session:')
+        self.cookie_name = config.get('SESSION_COOKIE_NAME', 'session')
+        self.use_signer = config.get('SESSION_USE_SIGNER', False)
+        self.sid_length = config.get('SESSION_ID_LENGTH', 32)
+        self.refresh_each_request = config.get('SESSION_REFRESH_EACH_REQUEST', True)
+        self.refresh_interval = timedelta(seconds=config.get('SESSION_REFRESH_INTERVAL', 0))
+        self.stores_session_info = config.get('SESSION_INFO_IN_SESSION', False)
+        # Há caches de sessão nos workers síncronos: o logout precisa ser avisado
+        self.publishes_logout = config.get('SESSION_CACHE_ENABLED', False)
+        self.lifetime = config['PERMANENT_SESSION_LIFETIME']
+        self.cookie_samesite = config.get('SESSION_COOKIE_SAMESITE')
+        self.cookie_secure = config.get('SESSION_COOKIE_SECURE', False)
+        self.secret_key = config.get('SECRET_KEY')
+        self._encoder = msgspec.msgpack.Encoder()
+        self._decoder = msgspec.msgpack.Decoder()
+
+    @property
+    def collection(self):
+        """Retorna a coleção de sessões do Flask-Session."""
+        return async_db.get_collection(self.collection_name)
+
+    def _signer(self) -> Signer:
+        return Signer(self.secret_key, salt='flask-session', key_derivation='hmac')
+
+    def _new_session(self) -> AsyncSession:
+        return AsyncSession(sid=secrets.token_urlsafe(self.sid_length), new=True)
+
+    async def open(self, cookies: Dict) -> AsyncSession:
+        """Carrega a sessão indicada pelo cookie (ou cria uma nova)."""
+        sid = cookies.get(self.cookie_name)
+        if not sid:
+            return self._new_session()
+
+        if self.use_signer:
+            try:
+                sid = self._signer().unsign(sid).decode()
+            except BadSignature:
+                return self._new_session()
+
+        document = await self.collection.find_one({'id': self.key_prefix + sid},
+                                                  {'val': 1, 'expiration': 1})
+        if document is None:
+            return self._new_session()
+
+        try:
+            data = self._decoder.decode(want_bytes(document['val']))
+        except msgspec.DecodeError:
+            return self._new_session()
+        return AsyncSession(data, sid=sid, expiration=document.get('expiration'))
+
+    async def save(self, session: AsyncSession, response) -> None:
+        """Grava a sessão (se necessário) e ajusta o cookie da resposta."""
+        store_id = self.key_prefix + session.sid
+
+        if not session:
+            if session.modified and not session.new:
+                await self.collection.delete_one({'id': store_id})
+                if self.publishes_logout:
+                    # Só o hash, como no SessionCache.discard do app síncrono
+                    await AsyncTokenService.publish_revocation(token=session_key(store_id))
+                response.delete_cookie(self.cookie_name)
+            return
+
+        now = datetime.utcnow()
+        if not session.modified:
+            if not self.refresh_each_request:
+                return
+            if not needs_refresh(session.expiration, self.lifetime, self.refresh_interval, now):
+                return
+
+        session['_permanent'] = True
+        expiration = now + self.lifetime
+        update = session_upsert(store_id, self._encoder.encode(dict(session)), session,
+                                expiration, now, self.stores_session_info)
+        await self.collection.update_one({'id': store_id}, update, upsert=True)
+
+        value = self._signer().sign(want_bytes(session.sid)).decode() if self.use_signer else session.sid
+        response.set_cookie(
+            self.cookie_name,
+            value,
+            expires=expiration,
+            httponly=True,
+            secure=self.cookie_secure,
+            samesite=self.cookie_samesite
+        )
@@ -1,10 +1,25 @@
-from flask import Flask, g
+import logging
+import time
+import click
+from cachelib import FileSystemCache
+from flask import Flask, g, request
 from flask_cors import CORS
 from flask_session import Session
 from config import Config
-from routes import auth_bp, task_bp
+from routes import auth_bp, task_bp, metrics_bp
+from monitoring import (bind_request_id, configure_logging, metrics, observe_request,
+                        report_profile, reset_request_id, roundtrip_budget, start_profile,
+                        stop_profile)
 from services.session_service import SessionService
-from database import db
+from services.expiry_reaper import expiry_reaper
+from services.email_filter import email_filter
+from services.token_cache import RevocationChannel
+from database import storage
+from database.sessions import MongoSessionInterface
+from middleware.signed_session import SignedSessionInterface
+from routes.metrics_routes import service_samples
+
+logger = logging.getLogger(__name__)
 
 
 def create_app():
@@ -15,14 +30,124 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    # Configuração de sessão
-    Session(app)
+    # Logs estruturados: fila + thread de escrita (monitoring/log.py)
+    configure_logging(app.config)
+
+    @app.before_request
+    def bind_request_context():
+        g._request_id = bind_request_id(request.headers.get('X-Request-ID'))
+
+    @app.after_request
+    def add_request_id_header(response):
+        active = g.get('_request_id')
+        if active is not None:
+            response.headers['X-Request-ID'] = active[0]
+        return response
+
+    @app.teardown_request
+    def reset_request_context(exception=None):
+        active = g.pop('_request_id', None)
+        if active is not None:
+            reset_request_id(active[1])
+
+    # Métricas por rota (registrado primeiro: o after_request roda por último
+    # e a duração inclui os demais hooks)
+    if app.config['METRICS_ENABLED']:
+        if app.config['METRICS_MULTIPROC_DIR']:
+            # Soma entre os workers: cada um grava o seu snapshot no diretório
+            metrics.share(app.config['METRICS_MULTIPROC_DIR'], app.config['METRICS_FLUSH_INTERVAL'],
+                          extra=service_samples)
+
+        @app.before_request
+        def start_request_timer():
+            metrics.ensure_writer()
+            g._request_started = time.perf_counter()
+
+        @app.after_request
+        def record_request_metrics(response):
+            started = g.pop('_request_started', None)
+            if started is not None:
+                rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+                observe_request(request.blueprint, rule, request.method,
+                                response.status_code, time.perf_counter() - started)
+            return response
+
+    if app.config['DB_PROFILER_ENABLED']:
+        @app.before_request
+        def start_db_profile():
+            g._db_profile = start_profile()
+
+        @app.after_request
+        def report_db_profile(response):
+            active = g.get('_db_profile')
+            if active is not None:
+                report_profile(active[0], response, request.method, request.path,
+                               roundtrip_budget(app.config, request.endpoint), request.endpoint)
+            return response
+
+        @app.teardown_request
+        def stop_db_profile(exception=None):
+            active = g.pop('_db_profile', None)
+            if active is not None:
+                stop_profile(active[1])
+
+    # Configuração de sessão (sem MongoDB, as sessões vão para arquivos locais)
+    if app.config['STORAGE_BACKEND'] != 'mongodb' and app.config['SESSION_TYPE'] == 'mongodb':
+        app.config['SESSION_TYPE'] = 'cachelib'
+        app.config['SESSION_CACHELIB'] = FileSystemCache(app.config['SESSION_CACHELIB_DIR'])
+    if app.config['SESSION_MODE'] == 'signed':
+        # Identidade no cookie assinado: nenhuma leitura de sessão no banco
+        app.session_interface = SignedSessionInterface()
+    elif app.config['SESSION_TYPE'] == 'mongodb':
+        # Mesmo cliente do restante da aplicação (database.clients); os logouts
+        # são avisados aos outros workers pelo canal das revogações de tokens
+        app.session_interface = MongoSessionInterface.from_config(
+            app,
+            channel=RevocationChannel(sync_interval=app.config['TOKEN_REVOCATION_SYNC_INTERVAL'])
+        )
+    else:
+        Session(app)
+
+    # Índices (e tabelas, no SQLite) usados nas consultas
+    if app.config['DB_APPLY_INDEXES_ON_STARTUP']:
+        try:
+            _print_index_report(storage.ensure_schema())
+        except Exception:
+            logger.exception('Falha ao criar indices', extra={'event': 'db.indexes_failed'})
+
+    # Filtro de emails cadastrados (herdado pelos workers após o fork)
+    if email_filter is not None:
+        try:
+            count = email_filter.rebuild()
+            logger.info('Filtro de emails carregado', extra={'event': 'email_filter.loaded', 'users': count})
+        except Exception:
+            logger.exception('Falha ao carregar filtro de emails', extra={'event': 'email_filter.failed'})
+
+    @app.cli.command('db-indexes')
+    @click.option('--force', is_flag=True, help='Aplica mesmo se a versão já estiver registrada.')
+    @click.option('--dry-run', is_flag=True, help='Mostra o que seria feito sem alterar o banco.')
+    def db_indexes(force, dry_run):
+        """Cria/atualiza os índices (e tabelas, no SQLite) do backend de armazenamento."""
+        _print_index_report(storage.ensure_schema(force=force, dry_run=dry_run))
+
+    @app.cli.command('reap-expired')
+    def reap_expired():
+        """Desativa agora os tokens e sessões expirados e compacta as lápides de tarefas."""
+        for collection_name, count in expiry_reaper.reap().items():
+            action = 'removido(s)' if collection_name == 'todos_tombstones' else 'expirado(s) desativado(s)'
+            print(f"[OK] {collection_name}: {count} {action}")
+
+    # O reaper é iniciado na primeira requisição (depois de um eventual fork)
+    if app.config['EXPIRY_REAPER_ENABLED']:
+        @app.before_request
+        def start_expiry_reaper():
+            expiry_reaper.ensure_started()
 
     # Configuração de CORS
     CORS(
         app,
         resources={r"/todos/*": {
-            "origins": ["http://localhost:5173", "http://127.0.0.1:5173"]
+            "origins": app.config['CORS_ORIGINS']
         }},
         supports_credentials=True
     )
@@ -33,63 +158,65 @@ def create_app():
         """Salva informações legíveis da sessão após cada requisição."""
         from flask import session as flask_session
         
-        # Verifica se há informações para salvar (definido no login)
+        # O ID vem da própria sessão da requisição (sem varrer a coleção)
+        session_id = SessionService.get_current_session_id()
+        if not session_id:
+            return response
+        
+        # Verifica se há informações para salvar (definido no login); com
+        # SESSION_INFO_IN_SESSION elas já vão no upsert da própria sessão
         if hasattr(g, '_save_session_info'):
+            if getattr(app.session_interface, 'stores_session_info', False):
+                delattr(g, '_save_session_info')
+                return response
             try:
-                # Obtém o ID da sessão do MongoDB
-                # O flask-session salva com o formato: "session:{session_id}"
-                sessions_collection = db.get_collection('sessions')
-                
-                # Busca a última sessão criada (ordenada por _id descendente)
-                latest_session = sessions_collection.find_one(
-                    {},
-                    sort=[('_id', -1)]
+                # Salva informações legíveis
+                SessionService.create_session_info(
+                    session_id=session_id,
+                    email=g._save_session_info['email'],
+                    user_id=g._save_session_info['user_id']
                 )
                 
-                if latest_session:
-                    session_id = latest_session.get('id', '')
-                    # Remove o prefixo "session:" se existir
-                    if session_id.startswith('session:'):
-                        session_id = session_id.replace('session:', '')
-                    
-                    # Salva informações legíveis
-                    SessionService.create_session_info(
-                        session_id=session_id,
-                        email=g._save_session_info['email'],
-                        user_id=g._save_session_info['user_id']
-                    )
-                    
-                    # Remove a flag para não salvar novamente
-                    delattr(g, '_save_session_info')
-            except Exception as e:
-                print(f"[ERRO] Falha ao salvar info de sessao: {e}")
+                # Remove a flag para não salvar novamente
+                delattr(g, '_save_session_info')
+                return response
+            except Exception:
+                logger.exception('Falha ao salvar info de sessao', extra={'event': 'session.info_failed'})
         
         # Atualiza a data de atualização se houver uma sessão ativa
         if 'user' in flask_session:
             try:
-                sessions_collection = db.get_collection('sessions')
-                latest_session = sessions_collection.find_one(
-                    {},
-                    sort=[('_id', -1)]
-                )
-                if latest_session:
-                    session_id = latest_session.get('id', '')
-                    if session_id.startswith('session:'):
-                        session_id = session_id.replace('session:', '')
-                    SessionService.update_session_info(session_id)
-            except Exception as e:
-                # Ignora erros silenciosamente para não afetar requisições
-                pass
+                SessionService.touch_session(session_id)
+            except Exception:
+                # Não afeta a requisição; registrado por amostragem (LOG_SAMPLE_RATES)
+                logger.warning('Falha ao registrar atividade da sessao', exc_info=True,
+                               extra={'event': 'session.touch_failed'})
         
         return response
 
     # Registra os Blueprints (rotas)
     app.register_blueprint(auth_bp)
     app.register_blueprint(task_bp)
+    if app.config['METRICS_ENABLED']:
+        app.register_blueprint(metrics_bp)
 
     return app
 
 
+def _print_index_report(report):
+    """Registra o relatório de aplicação dos índices."""
+    if report['skipped']:
+        return
+    for label in report['created']:
+        logger.info(f"Indice criado: {label}", extra={'event': 'db.index_created', 'index': label})
+    for label in report['dropped']:
+        logger.info(f"Indice removido: {label}", extra={'event': 'db.index_dropped', 'index': label})
+    for error in report['errors']:
+        logger.error(f"Falha no indice {error}", extra={'event': 'db.index_failed'})
+    logger.info(f"Indices na versao {report['version']} ({len(report['unchanged'])} sem alteracao)",
+                extra={'event': 'db.indexes_applied', 'version': report['version']})
+
+
 # Cria a instância da aplicação
 app = create_app()
 
@@ -0,0 +1,11 @@
+# /backend/asgi.py
+"""
+Ponto de entrada ASGI (modo assíncrono).
+
+    hypercorn asgi:app --bind 0.0.0.0:5000
+
+O modo síncrono continua disponível com "python app.py".
+"""
+from aio import create_async_app
+
+app = create_async_app()
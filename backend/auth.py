@@ -1,19 +1,19 @@
 # /backend/auth.py
-from pymongo import MongoClient
 from werkzeug.security import generate_password_hash, check_password_hash 
 from config import Config
+from database.clients import mongo_clients
 
-client = MongoClient(Config.MONGO_URI)
-db = client[Config.DB_NAME]
-users_collection = db.users 
+
+def users_collection():
+    return mongo_clients.get()[Config.DB_NAME].users
 
 
 def add_user(email, password):
-    if users_collection.find_one({'email': email}):
+    if users_collection().find_one({'email': email}):
         return None  
     
     hashed_pw = generate_password_hash(password) 
-    user_id = users_collection.insert_one({
+    user_id = users_collection().insert_one({
         'email': email,
         'password': hashed_pw
     }).inserted_id 
@@ -23,7 +23,7 @@ def add_user(email, password):
 
 
 def get_user_by_email(email):
-    user = users_collection.find_one({'email': email})
+    user = users_collection().find_one({'email': email})
     if user:
         return {
             '_id': str(user['_id']), 
@@ -0,0 +1,4 @@
+"""
+Benchmarks de carga ponta a ponta da API /todos.
+Veja benchmarks/__main__.py (python -m benchmarks --help).
+"""
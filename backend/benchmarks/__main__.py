@@ -0,0 +1,222 @@
+"""
+Benchmark de carga ponta a ponta da API /todos (sobre create_app()).
+
+Uso (a partir de backend/):
+    python -m benchmarks --backend memory --users 100 --tasks 10000
+    python -m benchmarks --backend mongodb --mongo-uri mongodb://localhost:27017/ \\
+        --tasks 1000000 --scenario read_polling --output resultados.json
+
+O resultado sai em JSON (stdout ou --output) para comparar execuções;
+um resumo legível é impresso em stderr.
+"""
+import argparse
+import ast
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split('\n')[1])
+    parser.add_argument('--backend', choices=['mongodb', 'sqlite', 'memory'], default='memory',
+                        help='mongodb (mongod local), sqlite (arquivo) ou memory (SQLite em memória)')
+    parser.add_argument('--mongo-uri', default='mongodb://localhost:27017/')
+    parser.add_argument('--db-name', default='todo_bench',
+                        help='banco usado no MongoDB (apagado no início, se --reset)')
+    parser.add_argument('--sqlite-path', default=os.path.join(tempfile.gettempdir(), 'todo_bench.db'))
+    parser.add_argument('--no-reset', dest='reset', action='store_false',
+                        help='não apaga os dados antes da carga')
+    parser.add_argument('--users', type=int, default=100, help='usuários sintéticos')
+    parser.add_argument('--tasks', type=int, default=10000, help='total de tarefas (ex.: 1000 a 1000000)')
+    parser.add_argument('--scenario', action='append', choices=['login_storm', 'read_polling', 'write_burst'],
+                        help='cenário a executar (repetível; padrão: todos)')
+    parser.add_argument('--transport', choices=['wsgi', 'http'], default='http',
+                        help='http (servidor werkzeug + keep-alive) ou wsgi (em processo, sem rede)')
+    parser.add_argument('--concurrency', type=int, default=8, help='usuários virtuais simultâneos')
+    parser.add_argument('--duration', type=float, default=10, help='segundos medidos por cenário')
+    parser.add_argument('--warmup', type=float, default=2, help='segundos de aquecimento (não medidos)')
+    parser.add_argument('--seed', type=int, default=1, help='semente dos sorteios')
+    parser.add_argument('--set', dest='overrides', action='append', default=[], metavar='CHAVE=VALOR',
+                        help='sobrescreve um atributo de Config (ex.: --set TASK_CACHE_BACKEND=None)')
+    parser.add_argument('--output', help='arquivo JSON de saída (padrão: stdout)')
+    parser.add_argument('--verbose', action='store_true', help='mantém os logs da aplicação')
+    return parser.parse_args(argv)
+
+
+def configure(args) -> Dict:
+    """Ajusta o Config antes de qualquer import de database/app."""
+    from config import Config
+
+    if args.backend == 'mongodb':
+        Config.STORAGE_BACKEND = 'mongodb'
+        Config.MONGO_URI = args.mongo_uri
+        Config.DB_NAME = args.db_name
+        Config.SESSION_MONGODB_DB = args.db_name
+    else:
+        Config.STORAGE_BACKEND = 'sqlite'
+        Config.SQLITE_PATH = ':memory:' if args.backend == 'memory' else args.sqlite_path
+        Config.SESSION_CACHELIB_DIR = os.path.join(tempfile.gettempdir(), 'todo_bench_sessions')
+
+    overrides = {}
+    for item in args.overrides:
+        key, _, raw = item.partition('=')
+        try:
+            value = ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            value = raw
+        setattr(Config, key, value)
+        overrides[key] = value
+    return overrides
+
+
+def run_scenario(name: str, make_client, credentials: List[Tuple[str, str]], args) -> Dict:
+    """
+    Executa um cenário com args.concurrency usuários virtuais.
+
+    Returns:
+        Resumo do cenário (ver benchmarks.stats.summarize)
+    """
+    from benchmarks.scenarios import VirtualUser
+    from benchmarks.stats import LatencyRecorder, summarize
+
+    recorders = [LatencyRecorder() for _ in range(args.concurrency)]
+    users = []
+    for index, recorder in enumerate(recorders):
+        email, password = credentials[index % len(credentials)]
+        user = VirtualUser(make_client(), email, password, recorder,
+                           random.Random(f'{args.seed}-{name}-{index}'))
+        user.setup()
+        users.append(user)
+
+    phase = {'measuring': False, 'stop': False}
+
+    def worker(user: VirtualUser):
+        user.recorder.enabled = False
+        while not phase['stop']:
+            user.recorder.enabled = phase['measuring']
+            try:
+                user.run_action(name)
+            except Exception as e:
+                user.recorder.record('exception', 0.0, 0, False)
+                if args.verbose:
+                    print(f'[ERRO] {name}: {e}', file=sys.stderr)
+
+    threads = [threading.Thread(target=worker, args=(user,), daemon=True) for user in users]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(args.warmup)
+    started = time.perf_counter()
+    phase['measuring'] = True
+    time.sleep(args.duration)
+    phase['measuring'] = False
+    elapsed = time.perf_counter() - started
+    phase['stop'] = True
+    for thread in threads:
+        thread.join(timeout=30)
+    for user in users:
+        user.client.close()
+
+    return summarize(LatencyRecorder.merge(recorders), elapsed)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(results: Dict) -> None:
+    """Tabela legível em stderr."""
+    for name, scenario in results['scenarios'].items():
+        print(f"\n== {name}: {scenario['throughput_rps']} req/s, "
+              f"{scenario['requests']} req, {scenario['errors']} erro(s)", file=sys.stderr)
+        print(f"{'endpoint':28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erros':>6}",
+              file=sys.stderr)
+        for endpoint, stats in scenario['endpoints'].items():
+            print(f"{endpoint:28} {stats['throughput_rps']:>9} {stats['p50_ms']:>9} "
+                  f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>6}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    overrides = configure(args)
+    scenarios = args.scenario or ['login_storm', 'read_polling', 'write_burst']
+
+    if args.backend == 'sqlite' and args.reset:
+        for suffix in ('', '-wal', '-shm'):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(args.sqlite_path + suffix)
+
+    # Os logs da aplicação (um registro por login) competem pela CPU com a medição
+    quiet = open(os.devnull, 'w') if not args.verbose else sys.stderr
+    with contextlib.redirect_stdout(quiet):
+        from database import storage
+        from benchmarks.seed import reset_database, seed
+
+        if args.reset:
+            reset_database(storage)
+        storage.ensure_schema()
+        credentials = seed(storage, args.users, args.tasks)
+
+        from app import create_app
+        app = create_app()
+
+        server = None
+        if args.transport == 'http':
+            from benchmarks.clients import BenchmarkServer
+            server = BenchmarkServer(app).start()
+            make_client = server.client
+        else:
+            from benchmarks.clients import WsgiClient
+            make_client = lambda: WsgiClient(app)
+
+        results = {
+            'meta': {
+                'timestamp': datetime.utcnow().isoformat() + 'Z',
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'backend': args.backend,
+                'transport': args.transport,
+                'users': args.users,
+                'tasks': args.tasks,
+                'concurrency': args.concurrency,
+                'duration_s': args.duration,
+                'warmup_s': args.warmup,
+                'seed': args.seed,
+                'config_overrides': {key: repr(value) for key, value in overrides.items()},
+            },
+            'scenarios': {},
+        }
+        try:
+            for name in scenarios:
+                print(f'Executando {name}...', file=sys.stderr)
+                results['scenarios'][name] = run_scenario(name, make_client, credentials, args)
+        finally:
+            if server is not None:
+                server.stop()
+
+    print_summary(results)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
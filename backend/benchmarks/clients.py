@@ -0,0 +1,95 @@
+"""
+Clientes HTTP usados pelos usuários virtuais.
+Os dois guardam o cookie de sessão entre as requisições.
+
+- WsgiClient: chama o app em processo (Flask test client), sem socket.
+  Mede só o custo da aplicação e do banco.
+- HttpClient: HTTP/1.1 de verdade (keep-alive) contra um servidor
+  werkzeug com threads iniciado pelo runner.
+"""
+import http.client
+import json
+import threading
+from http.cookies import SimpleCookie
+from typing import Dict, Optional, Tuple
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+
+class WsgiClient:
+    """Cliente em processo (sem rede)."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method: str, path: str, json_body: Dict = None,
+                headers: Dict = None) -> Tuple[int, Dict, bytes]:
+        """Executa a requisição e retorna (status, headers, corpo)."""
+        response = self._client.open(path, method=method, json=json_body, headers=headers)
+        return response.status_code, response.headers, response.get_data()
+
+    def close(self) -> None:
+        pass
+
+
+class HttpClient:
+    """Cliente HTTP com conexão persistente e cookies."""
+
+    def __init__(self, host: str, port: int):
+        self._connection = http.client.HTTPConnection(host, port, timeout=60)
+        self._cookies = SimpleCookie()
+
+    def request(self, method: str, path: str, json_body: Dict = None,
+                headers: Dict = None) -> Tuple[int, Dict, bytes]:
+        """Executa a requisição e retorna (status, headers, corpo)."""
+        request_headers = dict(headers or {})
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode('utf-8')
+            request_headers['Content-Type'] = 'application/json'
+        if self._cookies:
+            request_headers['Cookie'] = '; '.join(
+                f'{name}={morsel.value}' for name, morsel in self._cookies.items()
+            )
+
+        self._connection.request(method, path, body=body, headers=request_headers)
+        response = self._connection.getresponse()
+        data = response.read()
+        for cookie in response.headers.get_all('Set-Cookie') or []:
+            self._cookies.load(cookie)
+        return response.status, response.headers, data
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class _KeepAliveRequestHandler(WSGIRequestHandler):
+    """Handler HTTP/1.1 (o padrão do werkzeug fecha a conexão a cada resposta)."""
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class BenchmarkServer:
+    """Servidor werkzeug com threads, em segundo plano, numa porta livre."""
+
+    def __init__(self, app, host: str = '127.0.0.1'):
+        self.host = host
+        self._server = make_server(host, 0, app, threaded=True,
+                                   request_handler=_KeepAliveRequestHandler)
+        self.port = self._server.server_port
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'BenchmarkServer':
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='benchmark-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def client(self) -> HttpClient:
+        return HttpClient(self.host, self.port)
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
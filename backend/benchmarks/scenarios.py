@@ -0,0 +1,188 @@
+"""
+Usuários virtuais e cenários de carga.
+Cada cenário é uma mistura ponderada de ações; cada ação faz uma ou
+mais requisições e registra a latência de cada uma pelo endpoint.
+"""
+import json
+import random
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+from benchmarks.stats import LatencyRecorder
+
+# Ações de cada cenário: (peso, nome do método de VirtualUser)
+SCENARIOS: Dict[str, List[Tuple[int, str]]] = {
+    # Muitos logins simultâneos (hash de senha, criação de sessões e tokens)
+    'login_storm': [
+        (6, 'login_cycle'),
+        (2, 'auto_login'),
+        (1, 'register'),
+        (1, 'list_sessions'),
+    ],
+    # Clientes consultando a lista de tarefas periodicamente
+    'read_polling': [
+        (5, 'poll_tasks'),
+        (2, 'page_tasks'),
+        (1, 'stream_tasks'),
+        (2, 'check_session'),
+    ],
+    # Rajadas de escrita
+    'write_burst': [
+        (4, 'create_task'),
+        (3, 'update_task'),
+        (1, 'delete_task'),
+        (2, 'batch_tasks'),
+    ],
+}
+
+
+class VirtualUser:
+    """
+    Um usuário simulado: mantém cookie de sessão, token de auto-login,
+    ETag da última listagem e os IDs das suas tarefas.
+    """
+
+    def __init__(self, client, email: str, password: str, recorder: LatencyRecorder,
+                 rng: random.Random):
+        self.client = client
+        self.email = email
+        self.password = password
+        self.recorder = recorder
+        self.rng = rng
+        self.token: Optional[str] = None
+        self.etag: Optional[str] = None
+        self.task_ids: List[str] = []
+
+    def request(self, endpoint: str, method: str, path: str, json_body: Dict = None,
+                headers: Dict = None, expect: Tuple[int, ...] = (200,)):
+        """Executa uma requisição e registra a latência em endpoint."""
+        started = time.perf_counter()
+        status, response_headers, body = self.client.request(method, path, json_body, headers)
+        self.recorder.record(endpoint, time.perf_counter() - started, status, status in expect)
+        return status, response_headers, body
+
+    def setup(self) -> None:
+        """Login inicial (com token) e carga dos IDs das tarefas. Não é medido."""
+        enabled, self.recorder.enabled = self.recorder.enabled, False
+        try:
+            self.login(remember_me=True)
+            status, _, body = self.request('setup', 'GET', '/todos?limit=500')
+            if status == 200:
+                self.task_ids = [task['_id'] for task in json.loads(body)['tasks']]
+        finally:
+            self.recorder.enabled = enabled
+
+    def login(self, remember_me: bool = False) -> int:
+        status, _, body = self.request('POST /todos/login', 'POST', '/todos/login', {
+            'email': self.email,
+            'password': self.password,
+            'remember_me': remember_me
+        })
+        if status == 200 and remember_me:
+            self.token = json.loads(body).get('token')
+        return status
+
+    # ------------------------------------------------------------------
+    # login_storm
+    # ------------------------------------------------------------------
+
+    def login_cycle(self) -> None:
+        """Login, verificação da sessão e logout."""
+        if self.login() != 200:
+            return
+        self.request('GET /todos/session', 'GET', '/todos/session')
+        self.request('POST /todos/logout', 'POST', '/todos/logout', {})
+        # Mantém o usuário autenticado para as demais ações
+        self.login()
+
+    def auto_login(self) -> None:
+        if self.token is None:
+            self.login(remember_me=True)
+            return
+        self.request('POST /todos/auto-login', 'POST', '/todos/auto-login', {'token': self.token})
+
+    def register(self) -> None:
+        email = f'bench-new-{uuid.uuid4().hex}@example.com'
+        self.request('POST /todos/register', 'POST', '/todos/register',
+                     {'email': email, 'password': self.password}, expect=(201,))
+
+    def list_sessions(self) -> None:
+        self.request('GET /todos/sessions', 'GET', '/todos/sessions')
+
+    # ------------------------------------------------------------------
+    # read_polling
+    # ------------------------------------------------------------------
+
+    def poll_tasks(self) -> None:
+        """Lista completa com If-None-Match (304 quando nada mudou)."""
+        headers = {'If-None-Match': self.etag} if self.etag else None
+        status, response_headers, _ = self.request('GET /todos', 'GET', '/todos',
+                                                   headers=headers, expect=(200, 304))
+        self.etag = response_headers.get('ETag', self.etag)
+
+    def page_tasks(self) -> None:
+        """Primeira página e, se houver, a seguinte."""
+        status, _, body = self.request('GET /todos?limit', 'GET', '/todos?limit=50')
+        if status != 200:
+            return
+        next_cursor = json.loads(body).get('next_cursor')
+        if next_cursor:
+            self.request('GET /todos?limit', 'GET', f'/todos?limit=50&cursor={next_cursor}')
+
+    def stream_tasks(self) -> None:
+        self.request('GET /todos?stream', 'GET', '/todos?stream=ndjson')
+
+    def check_session(self) -> None:
+        self.request('GET /todos/session', 'GET', '/todos/session')
+
+    # ------------------------------------------------------------------
+    # write_burst
+    # ------------------------------------------------------------------
+
+    def create_task(self) -> None:
+        status, _, body = self.request('POST /todos', 'POST', '/todos',
+                                       {'text': f'Nova tarefa {self.rng.random():.6f}'},
+                                       expect=(201,))
+        if status == 201:
+            self.task_ids.append(json.loads(body)['_id'])
+
+    def update_task(self) -> None:
+        if not self.task_ids:
+            self.create_task()
+            return
+        task_id = self.rng.choice(self.task_ids)
+        self.request('PUT /todos/<id>', 'PUT', f'/todos/{task_id}',
+                     {'done': self.rng.random() < 0.5})
+
+    def delete_task(self) -> None:
+        if not self.task_ids:
+            self.create_task()
+            return
+        task_id = self.task_ids.pop(self.rng.randrange(len(self.task_ids)))
+        self.request('DELETE /todos/<id>', 'DELETE', f'/todos/{task_id}')
+
+    def batch_tasks(self) -> None:
+        """Lote com 5 criações, até 3 atualizações e até 2 remoções."""
+        operations = [{'op': 'create', 'text': f'Lote {i}'} for i in range(5)]
+        known = self.rng.sample(self.task_ids, min(len(self.task_ids), 5))
+        for task_id in known[:3]:
+            operations.append({'op': 'update', '_id': task_id, 'done': True})
+        for task_id in known[3:]:
+            operations.append({'op': 'delete', '_id': task_id})
+            self.task_ids.remove(task_id)
+
+        status, _, body = self.request('POST /todos/batch', 'POST', '/todos/batch',
+                                       {'operations': operations, 'ordered': False})
+        if status == 200:
+            for result in json.loads(body)['results']:
+                if result.get('op') == 'create' and result.get('status') == 'ok':
+                    self.task_ids.append(result['task']['_id'])
+
+    # ------------------------------------------------------------------
+
+    def run_action(self, scenario: str) -> None:
+        """Executa uma ação sorteada conforme os pesos do cenário."""
+        actions = SCENARIOS[scenario]
+        name = self.rng.choices([name for _, name in actions],
+                                weights=[weight for weight, _ in actions])[0]
+        getattr(self, name)()
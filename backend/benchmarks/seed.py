@@ -0,0 +1,79 @@
+"""
+Carga de dados sintéticos para os benchmarks.
+Usuários e tarefas são gravados direto pelo backend de armazenamento,
+com as tarefas em lotes (bulk_apply), sem passar pelas rotas.
+"""
+import sys
+import time
+from typing import List, Tuple
+
+# Todos os usuários sintéticos usam a mesma senha (hash calculado uma vez)
+PASSWORD = 'bench-password'
+
+
+def user_email(index: int) -> str:
+    """Email do usuário sintético de número index."""
+    return f'bench-user-{index}@example.com'
+
+
+def reset_database(storage) -> None:
+    """Apaga os dados do banco do benchmark (nunca use com o banco real)."""
+    if storage.name == 'mongodb':
+        from database import db
+        db.client.drop_database(db.db.name)
+    elif storage.name == 'sqlite':
+        with storage.transaction() as conn:
+            tables = [row['name'] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )]
+            for table in tables:
+                conn.execute(f'DELETE FROM {table}')
+
+
+def seed(storage, users: int, tasks: int, batch_size: int = 1000) -> List[Tuple[str, str]]:
+    """
+    Cria os usuários e distribui as tarefas igualmente entre eles.
+
+    Args:
+        storage: Backend de armazenamento (database.storage)
+        users: Número de usuários
+        tasks: Número total de tarefas
+        batch_size: Tarefas por lote de escrita
+
+    Returns:
+        Lista de (email, senha) dos usuários criados
+    """
+    from services.password_hasher import password_hasher
+
+    started = time.perf_counter()
+    password_hash = password_hasher.hash(PASSWORD)
+
+    credentials = []
+    user_ids = []
+    for index in range(users):
+        email = user_email(index)
+        user_id = storage.users.insert(email, password_hash)
+        if user_id is None:
+            user_id = storage.users.find_by_email(email)['_id']
+        user_ids.append(user_id)
+        credentials.append((email, PASSWORD))
+
+    created = 0
+    for position, user_id in enumerate(user_ids):
+        # As primeiras (tasks % users) contas recebem uma tarefa a mais
+        remaining = tasks // users + (1 if position < tasks % users else 0)
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            operations = [
+                {'op': 'create', 'text': f'Tarefa {created + i}', 'done': (created + i) % 3 == 0}
+                for i in range(size)
+            ]
+            storage.tasks.bulk_apply(user_id, operations, ordered=False)
+            created += size
+            remaining -= size
+        if position % 100 == 99:
+            print(f'  {position + 1}/{users} usuarios, {created} tarefas', file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    print(f'Carga: {users} usuarios e {created} tarefas em {elapsed:.1f}s', file=sys.stderr)
+    return credentials
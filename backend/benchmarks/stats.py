@@ -0,0 +1,91 @@
+"""
+Coleta e resumo das latências por endpoint.
+"""
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+
+class LatencyRecorder:
+    """
+    Latências de um único worker (sem locks: cada thread tem o seu).
+    Os recorders de todos os workers são combinados ao final com merge().
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, status: int, ok: bool) -> None:
+        """Registra uma requisição (ignorada durante o aquecimento)."""
+        if not self.enabled:
+            return
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+        if not ok:
+            self.errors[endpoint] += 1
+
+    @classmethod
+    def merge(cls, recorders: Iterable['LatencyRecorder']) -> 'LatencyRecorder':
+        """Combina os recorders de vários workers."""
+        merged = cls()
+        for recorder in recorders:
+            for endpoint, values in recorder.latencies.items():
+                merged.latencies[endpoint].extend(values)
+            for endpoint, statuses in recorder.statuses.items():
+                for status, count in statuses.items():
+                    merged.statuses[endpoint][status] += count
+            for endpoint, count in recorder.errors.items():
+                merged.errors[endpoint] += count
+        return merged
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil pelo método nearest-rank (valores já ordenados)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder: LatencyRecorder, elapsed: float) -> Dict:
+    """
+    Resume as latências de um cenário.
+
+    Args:
+        recorder: Recorder já combinado (merge)
+        elapsed: Duração medida do cenário, em segundos
+
+    Returns:
+        Dicionário com totais do cenário e estatísticas por endpoint
+        (latências em milissegundos, vazão em requisições por segundo)
+    """
+    endpoints = {}
+    total = 0
+    total_errors = 0
+    for endpoint in sorted(recorder.latencies):
+        values = sorted(recorder.latencies[endpoint])
+        count = len(values)
+        errors = recorder.errors.get(endpoint, 0)
+        total += count
+        total_errors += errors
+        endpoints[endpoint] = {
+            'requests': count,
+            'errors': errors,
+            'statuses': {str(status): n for status, n in sorted(recorder.statuses[endpoint].items())},
+            'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+            'mean_ms': round(sum(values) / count * 1000, 3),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3),
+        }
+    return {
+        'duration_s': round(elapsed, 3),
+        'requests': total,
+        'errors': total_errors,
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'endpoints': endpoints,
+    }
@@ -1,22 +1,273 @@
 # /backend/config.py
+import json
+import os
+import runpy
 import secrets
-import pymongo 
+from typing import List
 
 class Config:
     """Configurações da aplicação Flask."""
     
-    SECRET_KEY = secrets.token_hex(32)
+    # Chave que assina os cookies de sessão: deve ser a mesma em todos os
+    # workers e servidores. Defina TODO_SECRET_KEY (ou TODO_SECRET_KEY_FILE,
+    # um arquivo com a chave); sem ela, cada processo sorteia a sua.
+    SECRET_KEY = None
+    SECRET_KEY_FILE = None
+    SECRET_KEY_EPHEMERAL = False  # preenchido por load_settings()
+    SECRET_KEY_FALLBACKS = []     # chaves anteriores ainda aceitas (rotação)
+    SETTINGS_OVERRIDDEN = []      # nomes definidos por arquivo/ambiente (load_settings())
+    
+    # Origens liberadas no CORS (frontend)
+    CORS_ORIGINS = ['http://localhost:5173', 'http://127.0.0.1:5173']
+    
+    # Servidor de produção (gunicorn -c gunicorn.conf.py wsgi:app)
+    SERVER_BIND = '0.0.0.0:5000'
+    SERVER_WORKERS = 0            # processos; 0 = 2 x núcleos + 1
+    SERVER_THREADS = 8            # threads por worker
+    SERVER_TIMEOUT = 30           # segundos até um worker travado ser reiniciado
+    SERVER_GRACEFUL_TIMEOUT = 30  # segundos para terminar as requisições no reload
+    SERVER_MAX_REQUESTS = 0       # reinicia o worker após N requisições (0 = nunca)
     
     # Configurações do MongoDB
     MONGO_URI = 'mongodb://localhost:27017/'
     DB_NAME = 'todo_db' 
+    DB_APPLY_INDEXES_ON_STARTUP = True  # ou rode "flask --app app db-indexes"
+
+    # Pool de conexões do MongoDB (um cliente por processo, database/clients.py)
+    MONGO_MAX_POOL_SIZE = 50             # conexões por processo (worker)
+    MONGO_MIN_POOL_SIZE = 0
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = 5000   # espera por uma conexão livre antes do erro
+    MONGO_MAX_IDLE_TIME_MS = 60000       # fecha conexões ociosas
+    MONGO_COMPRESSORS = 'zlib'           # ex.: 'zstd,zlib' com o pacote zstandard
+
+    # Backend de armazenamento ('mongodb' ou 'sqlite')
+    # Com 'sqlite' as sessões do Flask-Session vão para SESSION_CACHELIB_DIR
+    STORAGE_BACKEND = 'mongodb'
+    SQLITE_PATH = 'todo.db'          # ':memory:' para testes e benchmarks
+    SQLITE_BUSY_TIMEOUT = 5          # segundos aguardando o lock de escrita
+    SQLITE_CACHED_STATEMENTS = 128   # statements compilados por conexão
+    SQLITE_POOL_SIZE = 8             # conexões mantidas abertas
+    SESSION_CACHELIB_DIR = '/tmp/todo_sessions'
 
     # Configurações de Sessão
-    SESSION_TYPE = 'mongodb' 
-    SESSION_MONGODB = pymongo.MongoClient('mongodb://localhost:27017/')
+    # 'server': sessão no banco (Flask-Session, SESSION_TYPE), lida a cada requisição
+    # 'signed': identidade num cookie assinado (SECRET_KEY) e com validade
+    #           (PERMANENT_SESSION_LIFETIME); o logout invalida pela época do usuário
+    SESSION_MODE = 'server'
+    SESSION_EPOCH_CACHE_TTL = 300          # segundos que a época de um usuário fica em cache
+    SESSION_EPOCH_CACHE_MAX_ENTRIES = 10000
+    SESSION_TYPE = 'mongodb'  # usa o cliente de database/clients.py (MONGO_URI)
     SESSION_MONGODB_DB = 'todo_db'
     SESSION_MONGODB_COLLECT = 'sessions' 
+    SESSION_SERIALIZATION_FORMAT = 'msgpack'  # msgspec: mais rápido que pickle (mesmo formato do modo assíncrono)
+    # Cache local das sessões lidas do MongoDB (modo 'server')
+    SESSION_CACHE_ENABLED = True
+    SESSION_CACHE_TTL = 5                  # segundos que uma sessão fica em cache no worker
+    SESSION_CACHE_MAX_ENTRIES = 10000
+    SESSION_REFRESH_INTERVAL = 300         # segundos entre renovações da validade de uma sessão não modificada
+    SESSION_INFO_IN_SESSION = True         # email, datas e status no documento da sessão (sem sessions_info)
+
+    # Buffer de atividade das sessões (write-behind)
+    SESSION_ACTIVITY_FLUSH_INTERVAL = 5  # segundos entre cada gravação
+    SESSION_ACTIVITY_MAX_BUFFER = 1000   # sessões pendentes antes de forçar a gravação
+    
+    # Hash de senhas (pool de processos)
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'  # hashes com outro método são refeitos no login
+    PASSWORD_HASH_WORKERS = 2          # processos do pool (0 = na própria thread)
+    PASSWORD_HASH_QUEUE_SIZE = 16      # pedidos aguardando antes de responder 503
+    PASSWORD_HASH_TIMEOUT = 10         # segundos
+    PASSWORD_HASH_RETRY_AFTER = 1      # valor do header Retry-After
+    PASSWORD_HASH_MP_CONTEXT = None    # 'fork', 'spawn' ou 'forkserver' (padrão do sistema)
+
+    # Filtro de Bloom dos emails cadastrados (evita consultas no cadastro)
+    EMAIL_FILTER_ENABLED = True
+    EMAIL_FILTER_CAPACITY = 100000     # mínimo; cresce com o número de usuários
+    EMAIL_FILTER_ERROR_RATE = 0.01     # taxa de falso positivo
+
+    # Expiração de tokens e sessões
+    AUTH_TOKEN_RETENTION_DAYS = 7      # dias após expirar até o TTL remover o token
+    SESSION_INFO_RETENTION_DAYS = 7    # dias após expirar até o TTL remover a sessão
+    EXPIRY_REAPER_ENABLED = True       # desativa (is_active: False) os expirados
+    EXPIRY_REAPER_INTERVAL = 300       # segundos entre cada passada
+    EXPIRY_REAPER_BATCH_SIZE = 500     # documentos por lote
+    EXPIRY_REAPER_BATCH_PAUSE = 0.1    # pausa (segundos) entre lotes
+
+    # Cache de tokens validados (auto-login)
+    TOKEN_CACHE_ENABLED = True
+    TOKEN_CACHE_MAX_ENTRIES = 10000
+    TOKEN_CACHE_TTL = 300                  # segundos que um token fica em cache
+    TOKEN_REVOCATION_SYNC_INTERVAL = 1     # segundos entre consultas às revogações
+    TOKEN_LAST_USED_WRITE_INTERVAL = 300   # no máximo 1 escrita de last_used_at por intervalo
+
+    # Listagem e lotes de tarefas
+    TASKS_PAGE_MAX_LIMIT = 500  # tamanho máximo de página em GET /todos
+    TASKS_BATCH_MAX_OPERATIONS = 1000  # operações por requisição em POST /todos/batch
+    
+    # Cache das listas de tarefas ('memory', 'filesystem' ou None para desativar)
+    # As entradas levam a versão da lista, então nenhum worker serve uma lista
+    # velha; com 'memory' cada worker guarda (e recarrega) a sua cópia (o
+    # gunicorn avisa quando o padrão é usado com vários workers).
+    TASK_CACHE_BACKEND = 'memory'
+    TASK_CACHE_TTL = 30            # segundos
+    TASK_CACHE_MAX_ENTRIES = 1024  # usuários em cache
+    TASK_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 0 para limitar só por entradas
+    TASK_CACHE_DIR = '/tmp/todo_task_cache'
+    
+    # Feed de alterações das tarefas (GET /todos/stream, Server-Sent Events)
+    # 'auto' usa o change stream do MongoDB (replica set, 6.0+) quando disponível;
+    # 'local' só entrega as escritas feitas pelo próprio worker
+    TASK_STREAM_ENABLED = True
+    TASK_STREAM_SYNC_ENABLED = False     # no app síncrono cada conexão ocupa uma thread (use o aio)
+    TASK_STREAM_MAX_CONNECTIONS = 0      # conexões por worker; 0 = metade de SERVER_THREADS (sem limite no aio)
+    TASK_STREAM_SOURCE = 'auto'
+    TASK_STREAM_HEARTBEAT = 15           # segundos sem eventos até enviar um comentário
+    TASK_STREAM_MAX_DURATION = 300       # segundos por conexão (o navegador reconecta)
+    TASK_STREAM_RETRY_MS = 3000          # espera do navegador antes de reconectar
+    TASK_STREAM_REPLAY_SIZE = 1000       # eventos guardados para reconexões (Last-Event-ID)
+    TASK_STREAM_MAX_PENDING = 100        # eventos não enviados por conexão antes do "reset"
+    TASK_STREAM_MAX_PENDING_BYTES = 256 * 1024
+    TASK_STREAM_MAX_PER_USER = 5         # conexões simultâneas por usuário e worker
+    
+    # Sincronização incremental (GET /todos/changes)
+    TASK_TOMBSTONE_RETENTION_DAYS = 30  # dias até a lápide de uma tarefa removida ser apagada
+    TASK_SYNC_LAG = 2                   # segundos que o cursor fica atrás do relógio (MongoDB: escritas em andamento)
+    
+    # Métricas (GET /todos/metrics, formato Prometheus)
+    METRICS_ENABLED = True
+    METRICS_TOKEN = None  # se definido, exige "Authorization: Bearer <token>"; sem ele, só localhost
+    METRICS_MULTIPROC_DIR = None  # snapshots somados entre processos (o gunicorn.conf.py define um)
+    METRICS_FLUSH_INTERVAL = 5    # segundos entre as gravações do snapshot de cada processo
+    
+    # Perfil de comandos do banco por requisição (MongoDB ou SQLite; depuração,
+    # custa uma inspeção da pilha por comando). Adiciona os cabeçalhos X-DB-Roundtrips e
+    # Server-Timing e registra um resumo quando o orçamento é excedido.
+    DB_PROFILER_ENABLED = False
+    DB_ROUNDTRIP_BUDGET = 5
+    DB_ROUNDTRIP_BUDGETS = {}  # por endpoint, ex.: {'auth.login': 6}
+    
+    # Logs estruturados (monitoring/log.py): fila em memória + thread de escrita
+    LOG_FORMAT = 'json'        # 'json' (um objeto por linha) ou 'text' ("[OK] mensagem")
+    LOG_LEVEL = 'INFO'
+    LOG_LEVELS = {}            # por logger, ex.: {'services.auth_service': 'WARNING'}
+    LOG_SAMPLE_RATES = {'session.touch_failed': 0.01}  # fração mantida por evento (abaixo de ERROR)
+    LOG_QUEUE_SIZE = 10000     # registros pendentes antes de descartar
     
     # Configurações de Cookie
     SESSION_COOKIE_SAMESITE = 'Lax' 
-    SESSION_COOKIE_SECURE = False 
\ No newline at end of file
+    SESSION_COOKIE_SECURE = False
+
+
+# Prefixo das variáveis de ambiente que sobrescrevem o Config (ex.: TODO_MONGO_URI)
+ENV_PREFIX = 'TODO_'
+
+
+# Textos aceitos para configurações booleanas
+_BOOL_VALUES = {'true': True, '1': True, 'yes': True, 'on': True,
+                'false': False, '0': False, 'no': False, 'off': False}
+
+
+def _parse_value(key: str, raw: str, default):
+    """
+    Converte o texto de uma configuração para o tipo do seu valor padrão.
+
+    Configurações de texto (ou sem padrão, como SECRET_KEY) ficam com o
+    texto original: TODO_SECRET_KEY=123456 continua sendo "123456".
+    Booleanos aceitam true/false/1/0/yes/no/on/off; números, listas e
+    dicionários são lidos como JSON e precisam ter o tipo do padrão.
+
+    Args:
+        key: Nome da configuração (para a mensagem de erro)
+        raw: Texto vindo do ambiente ou do arquivo de configuração
+        default: Valor atual no Config
+
+    Returns:
+        Valor convertido
+
+    Raises:
+        ValueError: Se o texto não for um valor válido para o tipo
+    """
+    if default is None or isinstance(default, str):
+        return raw
+    if isinstance(default, bool):
+        value = _BOOL_VALUES.get(raw.strip().lower())
+        if value is None:
+            raise ValueError(f'{key}: esperado um booleano (true/false), recebido {raw!r}')
+        return value
+
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = None
+    if isinstance(default, (int, float)):
+        expected = (int, float) if isinstance(default, float) else int
+        if isinstance(value, float) and expected is int and value.is_integer():
+            value = int(value)
+    else:
+        expected = type(default)
+    if not isinstance(value, expected) or isinstance(value, bool):
+        raise ValueError(f'{key}: esperado {type(default).__name__}, recebido {raw!r}')
+    return value
+
+
+def session_info_in_session(config=Config) -> bool:
+    """
+    Indica se as informações legíveis das sessões ficam no próprio documento
+    da sessão (SESSION_MONGODB_COLLECT) em vez da coleção sessions_info.
+    Só vale para sessões do Flask-Session no MongoDB.
+    """
+    return (config.SESSION_INFO_IN_SESSION
+            and config.STORAGE_BACKEND == 'mongodb'
+            and config.SESSION_MODE == 'server'
+            and config.SESSION_TYPE == 'mongodb')
+
+
+def load_settings(config=Config, environ=os.environ) -> List[str]:
+    """
+    Aplica ao Config o arquivo de configuração e as variáveis de ambiente.
+
+    A última fonte vence: valores da classe, arquivo indicado em
+    TODO_CONFIG_FILE (.json, ou .py com nomes em maiúsculas) e variáveis
+    TODO_<NOME> (ex.: TODO_SECRET_KEY, TODO_SERVER_WORKERS=4). Textos são
+    convertidos para o tipo do valor padrão (ver _parse_value).
+
+    Args:
+        config: Classe de configuração a alterar
+        environ: Variáveis de ambiente
+
+    Returns:
+        Nomes das configurações alteradas
+
+    Raises:
+        ValueError: Se um valor não for válido para o tipo da configuração
+    """
+    settings = {}
+    path = environ.get(ENV_PREFIX + 'CONFIG_FILE')
+    if path:
+        if path.endswith('.json'):
+            with open(path) as f:
+                settings.update(json.load(f))
+        else:
+            settings.update(runpy.run_path(path))
+    for key, raw in environ.items():
+        if key.startswith(ENV_PREFIX) and key != ENV_PREFIX + 'CONFIG_FILE':
+            settings[key[len(ENV_PREFIX):]] = raw
+
+    changed = []
+    for key, value in settings.items():
+        if key.isupper():
+            if isinstance(value, str):
+                value = _parse_value(key, value, getattr(config, key, None))
+            setattr(config, key, value)
+            changed.append(key)
+
+    config.SETTINGS_OVERRIDDEN = changed
+    if config.SECRET_KEY_FILE:
+        with open(config.SECRET_KEY_FILE) as f:
+            config.SECRET_KEY = f.read().strip()
+    config.SECRET_KEY_EPHEMERAL = not config.SECRET_KEY
+    if config.SECRET_KEY_EPHEMERAL:
+        config.SECRET_KEY = secrets.token_hex(32)
+    return changed
+
+
+load_settings()
@@ -1,11 +1,12 @@
 # /backend/database.py
-from pymongo import MongoClient
+from pymongo import ReturnDocument
 from bson.objectid import ObjectId
 from config import Config
+from database.clients import mongo_clients
 
-client = MongoClient(Config.MONGO_URI)
-db = client[Config.DB_NAME]
-tasks_collection = db.todos 
+
+def tasks_collection():
+    return mongo_clients.get()[Config.DB_NAME].todos
 
 
 
@@ -14,7 +15,7 @@ def get_all_tasks(user_id):
     query_filter = {'user_id': user_id} 
     tasks = []
   
-    cursor = tasks_collection.find(query_filter)
+    cursor = tasks_collection().find(query_filter)
     
     for task in cursor:
         task['_id'] = str(task['_id'])
@@ -27,10 +28,9 @@ def add_task(data, user_id):
    
     data['user_id'] = user_id 
     
-    result = tasks_collection.insert_one(data) 
-    new_task = tasks_collection.find_one({'_id': result.inserted_id})
-    if new_task:
-        new_task['_id'] = str(new_task['_id'])
+    result = tasks_collection().insert_one(data) 
+    new_task = dict(data)
+    new_task['_id'] = str(result.inserted_id)
     return new_task
 
 def update_task(task_id, data, user_id):
@@ -52,15 +52,16 @@ def update_task(task_id, data, user_id):
     if not update_data:
         return None
 
-    result = tasks_collection.update_one(query_filter, {'$set': update_data}) 
+    updated_task = tasks_collection().find_one_and_update(
+        query_filter,
+        {'$set': update_data},
+        return_document=ReturnDocument.AFTER
+    )
     
-    if result.matched_count == 0:
+    if updated_task is None:
         return None 
 
-    updated_task = tasks_collection.find_one({'_id': obj_id})
-    if updated_task:
-        updated_task['_id'] = str(updated_task['_id'])
-        
+    updated_task['_id'] = str(updated_task['_id'])
     return updated_task
 
 def delete_task(task_id, user_id):
@@ -71,5 +72,5 @@ def delete_task(task_id, user_id):
         return False 
 
     query_filter = {'_id': obj_id, 'user_id': user_id}
-    result = tasks_collection.delete_one(query_filter) 
-    return result.deleted_count > 0 
\ No newline at end of file
+    deleted_task = tasks_collection().find_one_and_delete(query_filter, projection={'_id': 1}) 
+    return deleted_task is not None 
\ No newline at end of file
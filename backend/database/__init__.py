@@ -1,8 +1,14 @@
 """
 Módulo de banco de dados - Singleton para conexão MongoDB
+e backend de armazenamento usado pelos modelos e serviços.
 """
+from config import Config
 from .connection import DatabaseConnection
+from .indexes import apply_indexes, INDEX_REGISTRY, INDEX_VERSION
+from .storage import create_storage
 
 # Exporta a instância única do banco de dados
 db = DatabaseConnection.get_instance()
 
+# Backend de armazenamento escolhido em Config.STORAGE_BACKEND
+storage = create_storage(Config, db)
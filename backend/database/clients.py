@@ -0,0 +1,121 @@
+"""
+Registro único dos clientes MongoDB do processo.
+Todos os consumidores (DatabaseConnection, Flask-Session, modo assíncrono)
+compartilham um cliente por URI, em vez de cada um abrir o seu pool.
+
+Os clientes são criados no primeiro uso e com connect=False: nenhum
+socket é aberto antes do fork de um servidor com vários workers (preload).
+No processo filho, os clientes herdados são descartados e recriados.
+"""
+import atexit
+import logging
+import os
+import threading
+from typing import Dict
+from pymongo import AsyncMongoClient, MongoClient
+from config import Config
+from monitoring import mongo_event_listeners
+
+logger = logging.getLogger(__name__)
+
+
+def client_options(config) -> Dict:
+    """
+    Opções do pool de conexões e do protocolo a partir do Config.
+
+    Returns:
+        Argumentos nomeados para MongoClient/AsyncMongoClient
+    """
+    return {
+        'maxPoolSize': config.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': config.MONGO_MIN_POOL_SIZE,
+        'waitQueueTimeoutMS': config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        'maxIdleTimeMS': config.MONGO_MAX_IDLE_TIME_MS,
+        'compressors': config.MONGO_COMPRESSORS,
+        'connect': False,
+        'event_listeners': mongo_event_listeners(config.METRICS_ENABLED,
+                                                 config.DB_PROFILER_ENABLED),
+    }
+
+
+class MongoClientRegistry:
+    """
+    Um MongoClient (e um AsyncMongoClient) por URI e por processo.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, MongoClient] = {}
+        self._async_clients: Dict[str, AsyncMongoClient] = {}
+        self._lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        """
+        No filho, os clientes herdados são abandonados sem close(): seus
+        sockets e threads pertencem ao processo pai.
+        """
+        self._clients = {}
+        self._async_clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, uri: str = None) -> MongoClient:
+        """
+        Retorna o cliente da URI (padrão: Config.MONGO_URI), criando-o no primeiro uso.
+        """
+        uri = uri or Config.MONGO_URI
+        client = self._clients.get(uri)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(uri)
+                if client is None:
+                    client = MongoClient(uri, **client_options(Config))
+                    self._clients[uri] = client
+                    logger.info('Cliente MongoDB criado',
+                                extra={'event': 'mongo.client_created',
+                                       'max_pool_size': Config.MONGO_MAX_POOL_SIZE})
+        return client
+
+    def get_async(self, uri: str = None) -> AsyncMongoClient:
+        """
+        Retorna o cliente assíncrono da URI. Deve ser chamado dentro do
+        event loop do servidor.
+        """
+        uri = uri or Config.MONGO_URI
+        client = self._async_clients.get(uri)
+        if client is None:
+            with self._lock:
+                client = self._async_clients.get(uri)
+                if client is None:
+                    client = AsyncMongoClient(uri, **client_options(Config))
+                    self._async_clients[uri] = client
+                    logger.info('Cliente MongoDB assincrono criado',
+                                extra={'event': 'mongo.async_client_created'})
+        return client
+
+    def close(self) -> None:
+        """Fecha os clientes síncronos (os próximos usos criam novos)."""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            client.close()
+        if clients:
+            logger.info('Conexao MongoDB fechada', extra={'event': 'mongo.client_closed'})
+
+    async def close_async(self) -> None:
+        """Fecha os clientes assíncronos."""
+        with self._lock:
+            clients, self._async_clients = self._async_clients, {}
+        for client in clients.values():
+            await client.close()
+        if clients:
+            logger.info('Conexao MongoDB assincrona fechada',
+                        extra={'event': 'mongo.async_client_closed'})
+
+
+# Registro único do processo
+mongo_clients = MongoClientRegistry()
+
+# Fecha os pools no encerramento (registrado antes dos serviços que
+# gravam no banco ao sair, então roda depois deles)
+atexit.register(mongo_clients.close)
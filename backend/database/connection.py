@@ -1,9 +1,10 @@
 """
 Singleton para gerenciar a conexão com MongoDB.
-Garante que apenas uma instância de conexão seja criada.
+Garante que apenas uma instância de conexão seja criada; o cliente vem do
+registro de clientes (database.clients), recriado após um fork.
 """
-from pymongo import MongoClient
 from config import Config
+from .clients import mongo_clients
 
 
 class DatabaseConnection:
@@ -19,16 +20,8 @@ class DatabaseConnection:
         """Cria uma única instância do DatabaseConnection."""
         if cls._instance is None:
             cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance._initialize()
         return cls._instance
 
-    def _initialize(self):
-        """Inicializa a conexão com MongoDB."""
-        if self._client is None:
-            self._client = MongoClient(Config.MONGO_URI)
-            self._db = self._client[Config.DB_NAME]
-            print(f"[OK] Conexao MongoDB estabelecida: {Config.DB_NAME}")
-
     @classmethod
     def get_instance(cls):
         """Retorna a instância única do DatabaseConnection."""
@@ -38,23 +31,24 @@ class DatabaseConnection:
 
     @property
     def client(self):
-        """Retorna o cliente MongoDB."""
-        return self._client
+        """Retorna o cliente MongoDB (criado no primeiro uso do processo)."""
+        return mongo_clients.get()
 
     @property
     def db(self):
         """Retorna o banco de dados."""
+        client = mongo_clients.get()
+        if client is not self._client:
+            self._client = client
+            self._db = client[Config.DB_NAME]
         return self._db
 
     def get_collection(self, collection_name):
         """Retorna uma coleção específica do banco de dados."""
-        return self._db[collection_name]
+        return self.db[collection_name]
 
     def close(self):
         """Fecha a conexão com MongoDB."""
-        if self._client:
-            self._client.close()
-            self._client = None
-            self._db = None
-            print("[OK] Conexao MongoDB fechada")
-
+        self._client = None
+        self._db = None
+        mongo_clients.close()
@@ -0,0 +1,274 @@
+"""
+Registro declarativo de índices do MongoDB.
+Define os índices de cada coleção e os aplica de forma idempotente,
+com controle de versão para que mudanças sejam implantadas com segurança.
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from config import Config, session_info_in_session
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSpec:
+    """
+    Descrição de um índice gerenciado pela aplicação.
+    """
+
+    def __init__(self, name: str, keys: List[tuple], unique: bool = False,
+                 expire_after_seconds: Optional[int] = None,
+                 partial_filter: Optional[Dict] = None):
+        self.name = name
+        self.keys = keys
+        self.unique = unique
+        self.expire_after_seconds = expire_after_seconds
+        self.partial_filter = partial_filter
+
+    def options(self) -> Dict:
+        """Retorna as opções usadas no create_index."""
+        options = {'name': self.name}
+        if self.unique:
+            options['unique'] = True
+        if self.expire_after_seconds is not None:
+            options['expireAfterSeconds'] = self.expire_after_seconds
+        if self.partial_filter is not None:
+            options['partialFilterExpression'] = self.partial_filter
+        return options
+
+    def describe(self) -> Dict:
+        """Representação estável do índice (usada na impressão digital)."""
+        return {'keys': [list(key) for key in self.keys], **self.options()}
+
+    def same_keys(self, info: Dict) -> bool:
+        """Verifica se um índice existente (index_information) usa as mesmas chaves."""
+        existing_keys = [(field, int(direction)) for field, direction in info.get('key', [])]
+        return existing_keys == [(field, int(direction)) for field, direction in self.keys]
+
+    def matches(self, info: Dict) -> bool:
+        """Verifica se um índice existente (index_information) é igual a este."""
+        return (
+            self.same_keys(info)
+            and bool(info.get('unique', False)) == self.unique
+            and info.get('expireAfterSeconds') == self.expire_after_seconds
+            and info.get('partialFilterExpression') == self.partial_filter
+        )
+
+
+# Incrementar sempre que INDEX_REGISTRY mudar
+INDEX_VERSION = 6
+
+# Índices por coleção
+INDEX_REGISTRY: Dict[str, List[IndexSpec]] = {
+    # User.find_by_email
+    'users': [
+        IndexSpec('email_unique', [('email', ASCENDING)], unique=True),
+    ],
+    # Listagens e paginação de tarefas por usuário; sincronização incremental
+    'todos': [
+        IndexSpec('user_id_id', [('user_id', ASCENDING), ('_id', ASCENDING)]),
+        IndexSpec('user_id_seq', [('user_id', ASCENDING), ('seq', ASCENDING)]),
+    ],
+    # Lápides das tarefas removidas (GET /todos/changes)
+    # O TTL as remove após o período de retenção
+    'todos_tombstones': [
+        IndexSpec('user_id_seq', [('user_id', ASCENDING), ('seq', ASCENDING)]),
+        IndexSpec('deleted_at_ttl', [('deleted_at', ASCENDING)],
+                  expire_after_seconds=Config.TASK_TOMBSTONE_RETENTION_DAYS * 86400),
+    ],
+    # TokenService.validate_token / revoke_all_user_tokens
+    # O TTL remove os tokens após o período de retenção depois de expirarem
+    'auth_tokens': [
+        IndexSpec('token_unique', [('token', ASCENDING)], unique=True),
+        IndexSpec('user_id_is_active', [('user_id', ASCENDING), ('is_active', ASCENDING)]),
+        IndexSpec('expires_at_ttl', [('expires_at', ASCENDING)],
+                  expire_after_seconds=Config.AUTH_TOKEN_RETENTION_DAYS * 86400),
+    ],
+    # Eventos de revogação lidos pelos workers (services/token_cache.py)
+    'token_revocations': [
+        IndexSpec('created_at_ttl', [('created_at', ASCENDING)], expire_after_seconds=86400),
+    ],
+    # SessionService (atualização por session_id e listagem das ativas)
+    # O TTL remove as sessões após o período de retenção depois de expirarem
+    'sessions_info': [
+        IndexSpec('session_id', [('session_id', ASCENDING)]),
+        IndexSpec('is_active_created_at', [('is_active', ASCENDING), ('created_at', DESCENDING)]),
+        IndexSpec('expires_at_ttl', [('expires_at', ASCENDING)],
+                  expire_after_seconds=Config.SESSION_INFO_RETENTION_DAYS * 86400),
+    ],
+    # Sessões do Flask-Session (database/sessions.py): leitura pelo id e
+    # TTL que remove as expiradas (mesmo nome do índice que o Flask-Session
+    # cria por conta própria)
+    Config.SESSION_MONGODB_COLLECT: [
+        IndexSpec('id_unique', [('id', ASCENDING)], unique=True),
+        IndexSpec('expiration_1', [('expiration', ASCENDING)], expire_after_seconds=0),
+    ],
+}
+
+# Índice de que o cadastro em um único insert depende (ver UniqueIndexGuard)
+EMAIL_UNIQUE_INDEX = INDEX_REGISTRY['users'][0]
+
+# Com SESSION_INFO_IN_SESSION, as consultas do SessionService vão para a
+# coleção das sessões
+if session_info_in_session(Config):
+    INDEX_REGISTRY[Config.SESSION_MONGODB_COLLECT] += [
+        IndexSpec('session_id', [('session_id', ASCENDING)]),
+        IndexSpec('is_active_created_at', [('is_active', ASCENDING), ('created_at', DESCENDING)]),
+    ]
+
+class UniqueIndexGuard:
+    """
+    Lembra, por processo, se a coleção tem um índice único do registro.
+    Escritas que dependem dele para detectar duplicidade (ex.: o cadastro
+    em um único insert) consultam o guard e, sem o índice, voltam a buscar
+    antes de inserir. A presença é definitiva; a ausência é reavaliada a
+    cada recheck_interval segundos (o índice pode ser criado depois).
+    """
+
+    def __init__(self, spec: IndexSpec, collection_name: str, recheck_interval: float = 60):
+        self.spec = spec
+        self.collection_name = collection_name
+        self.recheck_interval = recheck_interval
+        self.present = False
+        self._checked_at: Optional[float] = None
+
+    def needs_check(self) -> bool:
+        """Indica se é preciso (re)ler o index_information da coleção."""
+        return not self.present and (
+            self._checked_at is None
+            or time.monotonic() - self._checked_at >= self.recheck_interval
+        )
+
+    def record(self, index_information: Dict) -> bool:
+        """
+        Registra o resultado do index_information da coleção.
+
+        Returns:
+            True se algum índice equivale ao do registro (qualquer nome)
+        """
+        self.present = any(self.spec.matches(info) for info in index_information.values())
+        self._checked_at = time.monotonic()
+        if not self.present:
+            logger.error(f'Indice {self.collection_name}.{self.spec.name} ausente: '
+                         f'duplicidade verificada com uma busca antes de cada insert',
+                         extra={'event': 'db.unique_index_missing',
+                                'index': f'{self.collection_name}.{self.spec.name}'})
+        return self.present
+
+
+# Coleção onde fica registrada a versão aplicada
+MIGRATIONS_COLLECTION_NAME = 'schema_migrations'
+MIGRATION_ID = 'indexes'
+
+
+def registry_fingerprint() -> str:
+    """
+    Impressão digital do registro atual.
+    Muda quando uma definição muda por configuração (ex.: retenção do TTL),
+    mesmo sem alterar INDEX_VERSION.
+    """
+    described = {
+        name: [spec.describe() for spec in specs]
+        for name, specs in sorted(INDEX_REGISTRY.items())
+    }
+    raw = json.dumps(described, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()
+
+
+def apply_indexes(database, force: bool = False, dry_run: bool = False) -> Dict:
+    """
+    Aplica o INDEX_REGISTRY no banco de forma idempotente.
+
+    Cria os índices ausentes, recria os que mudaram de definição e remove
+    os que foram gerenciados por uma versão anterior e saíram do registro.
+    Um índice com as mesmas chaves de um do registro, mas com outro nome
+    (ex.: o user_id_1__id_1 criado antes do registro existir), é recriado
+    com o nome do registro, já que o MongoDB não aceita os dois juntos.
+    Os demais índices que não pertencem ao registro nunca são removidos.
+
+    Args:
+        database: Banco de dados do pymongo
+        force: Aplica mesmo se a versão registrada já for a atual
+        dry_run: Apenas calcula o que seria feito, sem alterar o banco
+
+    Returns:
+        Relatório com version, skipped, created, dropped, unchanged e errors
+    """
+    report = {
+        'version': INDEX_VERSION,
+        'skipped': False,
+        'created': [],
+        'dropped': [],
+        'unchanged': [],
+        'errors': []
+    }
+
+    fingerprint = registry_fingerprint()
+    migrations = database[MIGRATIONS_COLLECTION_NAME]
+    state = migrations.find_one({'_id': MIGRATION_ID}) or {}
+    if (not force and state.get('version') == INDEX_VERSION
+            and state.get('fingerprint') == fingerprint):
+        report['skipped'] = True
+        return report
+
+    previously_managed = state.get('managed', {})
+
+    for collection_name in sorted(set(INDEX_REGISTRY) | set(previously_managed)):
+        collection = database[collection_name]
+        specs = INDEX_REGISTRY.get(collection_name, [])
+        wanted = {spec.name for spec in specs}
+        existing = collection.index_information()
+
+        # Remove índices gerenciados que saíram do registro
+        for name in previously_managed.get(collection_name, []):
+            if name not in wanted and name in existing:
+                if not dry_run:
+                    collection.drop_index(name)
+                report['dropped'].append(f'{collection_name}.{name}')
+
+        for spec in specs:
+            label = f'{collection_name}.{spec.name}'
+            info = existing.get(spec.name)
+
+            if info is not None and spec.matches(info):
+                report['unchanged'].append(label)
+                continue
+
+            # Mesmas chaves com outro nome: seria um IndexOptionsConflict
+            renamed = [name for name, other in existing.items()
+                       if name != '_id_' and name not in wanted and spec.same_keys(other)]
+
+            try:
+                for name in renamed:
+                    if not dry_run:
+                        collection.drop_index(name)
+                    report['dropped'].append(f'{collection_name}.{name}')
+                if info is not None:
+                    # A definição mudou: recria o índice
+                    if not dry_run:
+                        collection.drop_index(spec.name)
+                    report['dropped'].append(label)
+                if not dry_run:
+                    collection.create_index(spec.keys, **spec.options())
+                report['created'].append(label)
+            except OperationFailure as e:
+                report['errors'].append(f'{label}: {e}')
+
+    if not dry_run and not report['errors']:
+        migrations.update_one(
+            {'_id': MIGRATION_ID},
+            {'$set': {
+                'version': INDEX_VERSION,
+                'fingerprint': fingerprint,
+                'managed': {name: [spec.name for spec in specs] for name, specs in INDEX_REGISTRY.items()},
+                'applied_at': datetime.utcnow()
+            }},
+            upsert=True
+        )
+
+    return report
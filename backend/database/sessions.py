@@ -0,0 +1,269 @@
+"""
+Interface de sessão do Flask-Session sobre o registro de clientes.
+O MongoDBSessionInterface original guarda o cliente e a coleção recebidos
+na criação do app; aqui os dois são resolvidos pelo registro a cada uso,
+então um worker criado por fork abre o seu próprio pool.
+
+Na frente da coleção fica um cache local das sessões já desserializadas
+(leitura na falta, gravação junto com o banco). Sessões não modificadas
+só voltam ao banco para renovar a validade, no máximo uma vez por
+SESSION_REFRESH_INTERVAL.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from flask_session.defaults import Defaults
+from flask_session.mongodb import MongoDBSessionInterface
+from itsdangerous import want_bytes
+from .clients import mongo_clients
+
+
+def session_key(store_id: str) -> str:
+    """
+    Chave de uma sessão no cache e nos eventos de revogação (hash do store_id).
+    O ID da sessão autentica o cookie e por isso não é gravado nos eventos.
+    """
+    return hashlib.sha256(store_id.encode('utf-8')).hexdigest()
+
+
+def needs_refresh(expiration: Optional[datetime], lifetime: timedelta,
+                  refresh_interval: timedelta, now: datetime) -> bool:
+    """
+    Indica se uma sessão não modificada deve renovar a validade no banco.
+
+    Args:
+        expiration: Validade gravada no banco (None se desconhecida)
+        lifetime: Duração de uma sessão (PERMANENT_SESSION_LIFETIME)
+        refresh_interval: Intervalo mínimo entre renovações
+        now: Instante atual (UTC)
+    """
+    if expiration is None:
+        return True
+    return now - (expiration - lifetime) >= refresh_interval
+
+
+def session_upsert(store_id: str, encoded: bytes, session: Dict, expiration: datetime,
+                   now: datetime, store_session_info: bool) -> Dict:
+    """
+    Update (com upsert) da gravação de uma sessão no formato do Flask-Session.
+    Com store_session_info, as informações legíveis vão no mesmo documento.
+
+    Args:
+        store_id: Prefixo + ID da sessão
+        encoded: Dados da sessão serializados (msgpack)
+        session: Dados da sessão (para o usuário logado)
+        expiration: Nova validade
+        now: Instante da gravação (UTC)
+        store_session_info: Se True, grava email, datas e status da sessão
+    """
+    fields = {'id': store_id, 'val': encoded, 'expiration': expiration}
+    update = {'$set': fields}
+
+    user = session.get('user')
+    if store_session_info and user:
+        fields.update({
+            'session_id': session.sid,
+            'email': user['email'],
+            'user_id': user['_id'],
+            'updated_at': now,
+            'expires_at': expiration,
+            'is_active': True
+        })
+        update['$setOnInsert'] = {'created_at': now}
+    return update
+
+
+class SessionCache:
+    """
+    Cache LRU das sessões lidas ou gravadas por este worker
+    (hash do store_id -> (dados, expiration do documento)).
+    As entradas valem por ttl segundos; a remoção de uma sessão (logout) é
+    publicada no canal para que os outros workers descartem a sua cópia.
+    O canal recebe só o hash: o ID da sessão (que autentica o cookie) não
+    é gravado nos eventos de revogação.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 5, channel=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.channel = channel
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, store_id: str) -> Optional[Tuple[Dict, datetime]]:
+        if self.channel is not None:
+            self.channel.poll(self)
+
+        key = session_key(store_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, expiration, cached_until = entry
+            if time.monotonic() >= cached_until or (
+                    expiration is not None and datetime.utcnow() >= expiration):
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return data, expiration
+
+    def get(self, store_id: str) -> Optional[Dict]:
+        """
+        Retorna uma cópia dos dados da sessão em cache.
+
+        Returns:
+            Dados da sessão, ou None se ausente/expirada
+        """
+        entry = self._entry(store_id)
+        return copy.deepcopy(entry[0]) if entry is not None else None
+
+    def expiration(self, store_id: str) -> Optional[datetime]:
+        """Validade gravada no banco para a sessão em cache (None se ausente)."""
+        entry = self._entry(store_id)
+        return entry[1] if entry is not None else None
+
+    def put(self, store_id: str, data: Dict, expiration: Optional[datetime]) -> None:
+        key = session_key(store_id)
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(data), expiration,
+                                  time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, store_id: str) -> None:
+        """Remove a sessão deste cache e avisa os outros workers (pelo hash)."""
+        key = session_key(store_id)
+        self.invalidate(key)
+        if self.channel is not None:
+            self.channel.publish(token=key)
+
+    def invalidate(self, key: str) -> None:
+        """Remove uma sessão pela chave (hash do store_id), como publicada no canal."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Remove as sessões do usuário (percorre o cache; evento raro)."""
+        with self._lock:
+            for key in [key for key, (data, _, _) in self._entries.items()
+                        if (data.get('user') or {}).get('_id') == user_id]:
+                del self._entries[key]
+
+
+class MongoSessionInterface(MongoDBSessionInterface):
+    """
+    Sessões no MongoDB usando o cliente do registro (database.clients).
+    Nenhuma conexão é aberta na criação do app: o índice TTL da coleção
+    (que o MongoDBSessionInterface cria no __init__) é garantido no primeiro
+    acesso à coleção, mesmo com DB_APPLY_INDEXES_ON_STARTUP desligado.
+
+    Com store_session_info, o email, as datas e o status da sessão são
+    gravados no próprio documento da sessão (no mesmo upsert do login),
+    no lugar da coleção sessions_info.
+    """
+
+    def __init__(self, app, db: str, collection: str, cache: Optional[SessionCache] = None,
+                 refresh_interval: float = 0, store_session_info: bool = False, **kwargs):
+        self.db_name = db
+        self.collection_name = collection
+        self.cache = cache
+        self.refresh_interval = timedelta(seconds=refresh_interval)
+        self.stores_session_info = store_session_info
+        self._ttl_index_ready = False
+        # Pula o __init__ do MongoDBSessionInterface (cliente fixo e create_index)
+        super(MongoDBSessionInterface, self).__init__(app, **kwargs)
+        self.use_deprecated_method = False
+
+    @classmethod
+    def from_config(cls, app, channel=None) -> 'MongoSessionInterface':
+        """
+        Cria a interface com as mesmas chaves SESSION_* do Flask-Session.
+
+        Args:
+            app: Aplicação Flask
+            channel: Canal de invalidação entre workers usado pelo cache (opcional)
+        """
+        config = app.config
+        cache = None
+        if config.get('SESSION_CACHE_ENABLED', False):
+            cache = SessionCache(
+                max_entries=config['SESSION_CACHE_MAX_ENTRIES'],
+                ttl=config['SESSION_CACHE_TTL'],
+                channel=channel
+            )
+        return cls(
+            app,
+            db=config.get('SESSION_MONGODB_DB', Defaults.SESSION_MONGODB_DB),
+            collection=config.get('SESSION_MONGODB_COLLECT', Defaults.SESSION_MONGODB_COLLECT),
+            cache=cache,
+            refresh_interval=config.get('SESSION_REFRESH_INTERVAL', 0),
+            store_session_info=config.get('SESSION_INFO_IN_SESSION', False),
+            key_prefix=config.get('SESSION_KEY_PREFIX', Defaults.SESSION_KEY_PREFIX),
+            use_signer=config.get('SESSION_USE_SIGNER', Defaults.SESSION_USE_SIGNER),
+            permanent=config.get('SESSION_PERMANENT', Defaults.SESSION_PERMANENT),
+            sid_length=config.get('SESSION_ID_LENGTH', Defaults.SESSION_ID_LENGTH),
+            serialization_format=config.get('SESSION_SERIALIZATION_FORMAT',
+                                            Defaults.SESSION_SERIALIZATION_FORMAT),
+        )
+
+    @property
+    def client(self):
+        return mongo_clients.get()
+
+    @property
+    def store(self):
+        store = mongo_clients.get()[self.db_name][self.collection_name]
+        if not self._ttl_index_ready:
+            # Mesmo nome e opções do registro de índices (create_index é idempotente)
+            store.create_index('expiration', name='expiration_1', expireAfterSeconds=0)
+            self._ttl_index_ready = True
+        return store
+
+    def _retrieve_session_data(self, store_id: str) -> Optional[dict]:
+        if self.cache is not None:
+            data = self.cache.get(store_id)
+            if data is not None:
+                return data
+
+        # Só os campos da sessão (o documento também pode ter as informações legíveis)
+        document = self.store.find_one({'id': store_id}, {'val': 1, 'expiration': 1})
+        if document is None:
+            return None
+        data = self.serializer.decode(want_bytes(document['val']))
+        if self.cache is not None:
+            self.cache.put(store_id, data, document.get('expiration'))
+        return data
+
+    def should_set_storage(self, app, session) -> bool:
+        """
+        Sessões modificadas são sempre gravadas. As demais só renovam a
+        validade quando a última gravação conhecida tem mais de
+        SESSION_REFRESH_INTERVAL segundos.
+        """
+        if session.modified or not app.config['SESSION_REFRESH_EACH_REQUEST']:
+            return session.modified
+        if self.cache is None or not self.refresh_interval:
+            return True
+
+        expiration = self.cache.expiration(self._get_store_id(session.sid))
+        return needs_refresh(expiration, app.permanent_session_lifetime,
+                             self.refresh_interval, datetime.utcnow())
+
+    def _upsert_session(self, session_lifetime: timedelta, session, store_id: str) -> None:
+        now = datetime.utcnow()
+        expiration = now + session_lifetime
+        update = session_upsert(store_id, self.serializer.encode(session), session,
+                                expiration, now, self.stores_session_info)
+        self.store.update_one({'id': store_id}, update, upsert=True)
+        if self.cache is not None:
+            self.cache.put(store_id, dict(session), expiration)
+
+    def _delete_session(self, store_id: str) -> None:
+        super()._delete_session(store_id)
+        if self.cache is not None:
+            self.cache.discard(store_id)
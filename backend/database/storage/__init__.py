@@ -0,0 +1,45 @@
+"""
+Backends de armazenamento plugáveis ('mongodb' ou 'sqlite').
+"""
+from datetime import timedelta
+from config import session_info_in_session
+from .base import StorageBackend, TaskStore, UserStore, TokenStore, SessionInfoStore
+
+
+def create_storage(config, connection=None) -> StorageBackend:
+    """
+    Cria o backend de armazenamento a partir da configuração.
+
+    Args:
+        config: Objeto de configuração (Config)
+        connection: Conexão MongoDB (DatabaseConnection), usada pela engine 'mongodb'
+
+    Returns:
+        Instância do backend escolhido em STORAGE_BACKEND
+    """
+    backend_name = getattr(config, 'STORAGE_BACKEND', 'mongodb')
+
+    if backend_name == 'mongodb':
+        from .mongo import MongoStorage, MongoSessionInfoStore
+        sessions_collection = MongoSessionInfoStore.COLLECTION_NAME
+        if session_info_in_session(config):
+            sessions_collection = config.SESSION_MONGODB_COLLECT
+        return MongoStorage(connection, sessions_collection,
+                            sync_lag=config.TASK_SYNC_LAG)
+    if backend_name == 'sqlite':
+        from .sqlite import SQLiteStorage
+        trace_callback = None
+        if config.DB_PROFILER_ENABLED:
+            from monitoring.profiler import trace_sqlite_statement
+            trace_callback = trace_sqlite_statement
+        return SQLiteStorage(
+            config.SQLITE_PATH,
+            busy_timeout=config.SQLITE_BUSY_TIMEOUT,
+            cached_statements=config.SQLITE_CACHED_STATEMENTS,
+            pool_size=config.SQLITE_POOL_SIZE,
+            token_retention=timedelta(days=config.AUTH_TOKEN_RETENTION_DAYS),
+            session_retention=timedelta(days=config.SESSION_INFO_RETENTION_DAYS),
+            tombstone_retention=timedelta(days=config.TASK_TOMBSTONE_RETENTION_DAYS),
+            trace_callback=trace_callback
+        )
+    raise ValueError(f'Backend de armazenamento desconhecido: {backend_name}')
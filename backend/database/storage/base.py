@@ -0,0 +1,302 @@
+"""
+Interface dos backends de armazenamento.
+Define as operações que os modelos e serviços usam, agrupadas por
+entidade (tarefas, usuários, tokens e sessões). Cada engine implementa
+estas classes; o código da aplicação não conhece o banco por trás.
+
+Convenções comuns a todas as engines:
+    - IDs são strings hexadecimais de ObjectId (24 caracteres)
+    - Datas são datetime "naive" em UTC
+    - Tarefas em listagens têm o formato {'_id', 'text', 'done'}
+"""
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+
+class TaskStore:
+    """
+    Operações sobre as tarefas (coleção/tabela todos).
+
+    Toda escrita grava na tarefa uma sequência (seq) crescente do usuário e
+    incrementa a versão da lista; as remoções deixam uma lápide com a sua
+    sequência. A sincronização incremental lê o que mudou depois de uma
+    sequência (changes_since). Sequências podem ter lacunas e, em engines
+    sem contador transacional, empates.
+    """
+
+    def find(self, task_id: str, user_id: str) -> Optional[Dict]:
+        """
+        Busca uma tarefa do usuário.
+
+        Returns:
+            Dicionário com _id, text, done e user_id, ou None
+        """
+        raise NotImplementedError
+
+    def find_page(self, user_id: str, limit: int = None, after_id: str = None) -> List[Dict]:
+        """
+        Busca tarefas do usuário em ordem de _id (paginação por chave).
+
+        Args:
+            user_id: ID do usuário
+            limit: Número máximo de tarefas (opcional)
+            after_id: Retorna apenas tarefas com _id maior que este (opcional)
+        """
+        raise NotImplementedError
+
+    def iter_by_user(self, user_id: str, batch_size: int = 500) -> Iterator[Dict]:
+        """Itera sobre as tarefas do usuário em ordem de _id, em lotes."""
+        raise NotImplementedError
+
+    def insert(self, user_id: str, text: str, done: bool = False) -> str:
+        """Cria uma tarefa e retorna o seu ID."""
+        raise NotImplementedError
+
+    def update(self, task_id: str, user_id: str, fields: Dict) -> Optional[Dict]:
+        """
+        Atualiza campos de uma tarefa do usuário.
+
+        Returns:
+            Tarefa atualizada (formato de listagem) ou None se não encontrada
+        """
+        raise NotImplementedError
+
+    def delete(self, task_id: str, user_id: str) -> bool:
+        """Deleta uma tarefa do usuário. Retorna True se existia."""
+        raise NotImplementedError
+
+    def bulk_apply(self, user_id: str, operations: List[Dict], ordered: bool = True) -> List[Dict]:
+        """
+        Executa várias operações de tarefas de uma vez.
+
+        Args:
+            user_id: ID do usuário
+            operations: Operações já validadas, no formato
+                {'op': 'create', 'text': str, 'done': bool},
+                {'op': 'update', '_id': str, 'fields': dict} ou
+                {'op': 'delete', '_id': str}
+            ordered: Se True, para na primeira falha (as demais são ignoradas)
+
+        Returns:
+            Lista de resultados, um por operação, na mesma ordem
+        """
+        raise NotImplementedError
+
+    def get_list_version(self, user_id: str) -> int:
+        """Retorna a versão da lista de tarefas do usuário (0 se nunca alterada)."""
+        raise NotImplementedError
+
+    def bump_list_version(self, user_id: str) -> None:
+        """Incrementa a versão da lista de tarefas do usuário."""
+        raise NotImplementedError
+
+    def get_sync_seq(self, user_id: str) -> int:
+        """
+        Retorna a sequência até a qual todas as alterações do usuário já
+        podem ser lidas (escritas em andamento ficam depois dela).
+        """
+        raise NotImplementedError
+
+    def changes_since(self, user_id: str, since: int, limit: int) -> List[Dict]:
+        """
+        Busca as tarefas alteradas e as lápides com sequência maior que since.
+
+        Args:
+            user_id: ID do usuário
+            since: Sequência já sincronizada pelo cliente
+            limit: Número máximo de itens
+
+        Returns:
+            Itens em ordem de sequência, no formato
+            {'seq': int, 'task': dict} ou {'seq': int, 'deleted': task_id}
+        """
+        raise NotImplementedError
+
+    def purge_tombstones(self, now: datetime) -> int:
+        """
+        Remove as lápides que passaram da retenção (backends sem TTL).
+        Retorna quantas lápides foram removidas.
+        """
+        raise NotImplementedError
+
+    def watch(self, resume_after: Dict = None) -> Iterator[Dict]:
+        """
+        Acompanha as alterações das tarefas de todos os usuários.
+        O fluxo é aberto na chamada: falha logo se o banco não o oferecer.
+
+        Args:
+            resume_after: Token de retomada do último evento processado (opcional)
+
+        Returns:
+            Iterador (bloqueante) de eventos no formato
+            {'id': str, 'resume_token': dict, 'type': 'created'|'updated'|'deleted',
+             'user_id': str, 'task': dict}
+
+        Raises:
+            NotImplementedError: Se o backend não oferecer um fluxo de alterações
+        """
+        raise NotImplementedError
+
+
+class UserStore:
+    """Operações sobre os usuários."""
+
+    def find_by_email(self, email: str) -> Optional[Dict]:
+        """Busca um usuário pelo email ({'_id', 'email', 'password'} ou None)."""
+        raise NotImplementedError
+
+    def find_by_id(self, user_id: str) -> Optional[Dict]:
+        """Busca um usuário pelo ID ({'_id', 'email', 'password'} ou None)."""
+        raise NotImplementedError
+
+    def insert(self, email: str, password_hash: str) -> Optional[str]:
+        """
+        Cria um usuário em uma única escrita.
+
+        Returns:
+            ID do usuário criado ou None se o email já existir
+        """
+        raise NotImplementedError
+
+    def update_password(self, user_id: str, password_hash: str) -> bool:
+        """Atualiza o hash da senha. Retorna True se o usuário existe."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """Retorna o número (estimado) de usuários."""
+        raise NotImplementedError
+
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        """Itera sobre os emails de todos os usuários."""
+        raise NotImplementedError
+
+    def get_session_epoch(self, user_id: str) -> int:
+        """Retorna a época das sessões assinadas do usuário (0 se nunca revogadas)."""
+        raise NotImplementedError
+
+    def bump_session_epoch(self, user_id: str) -> int:
+        """Incrementa a época (invalida as sessões assinadas) e retorna a nova."""
+        raise NotImplementedError
+
+
+class TokenStore:
+    """Operações sobre os tokens de autenticação e eventos de revogação."""
+
+    def insert(self, token_data: Dict) -> None:
+        """Grava um token (token, user_id, email, created_at, expires_at, is_active)."""
+        raise NotImplementedError
+
+    def find_active(self, token: str) -> Optional[Dict]:
+        """Busca um token ativo ({'token', 'user_id', 'email', 'expires_at'} ou None)."""
+        raise NotImplementedError
+
+    def deactivate(self, token: str) -> None:
+        """Marca um token como inativo (ex.: expirado)."""
+        raise NotImplementedError
+
+    def touch_last_used(self, token: str, when: datetime) -> None:
+        """Grava a última data de uso do token."""
+        raise NotImplementedError
+
+    def revoke(self, token: str, when: datetime) -> bool:
+        """Revoga um token. Retorna True se ele estava ativo."""
+        raise NotImplementedError
+
+    def revoke_user(self, user_id: str, when: datetime) -> int:
+        """Revoga os tokens ativos de um usuário. Retorna quantos foram revogados."""
+        raise NotImplementedError
+
+    def publish_revocation(self, event: Dict) -> None:
+        """Grava um evento de revogação ({'created_at', 'token'?, 'user_id'?})."""
+        raise NotImplementedError
+
+    def revocations_since(self, since: datetime) -> Iterator[Dict]:
+        """Itera sobre os eventos de revogação criados a partir de since."""
+        raise NotImplementedError
+
+    def deactivate_expired(self, now: datetime, limit: int) -> int:
+        """Desativa até limit tokens expirados. Retorna quantos foram desativados."""
+        raise NotImplementedError
+
+    def purge_expired(self, now: datetime) -> int:
+        """Remove definitivamente os tokens além da retenção (sem índice TTL)."""
+        raise NotImplementedError
+
+
+class SessionInfoStore:
+    """Operações sobre as informações legíveis das sessões (sessions_info)."""
+
+    def insert(self, session_info: Dict) -> None:
+        """Grava as informações de uma sessão."""
+        raise NotImplementedError
+
+    def touch(self, session_id: str, when: datetime) -> bool:
+        """Atualiza o updated_at de uma sessão ativa. Retorna True se existia."""
+        raise NotImplementedError
+
+    def touch_many(self, pending: Dict[str, datetime]) -> None:
+        """Atualiza em lote o updated_at (nunca retrocede) de várias sessões ativas."""
+        raise NotImplementedError
+
+    def deactivate(self, session_id: str, when: datetime) -> bool:
+        """Desativa uma sessão (logout). Retorna True se foi alterada."""
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Busca as informações de uma sessão."""
+        raise NotImplementedError
+
+    def list_active(self) -> List[Dict]:
+        """Retorna as sessões ativas, das mais recentes para as mais antigas."""
+        raise NotImplementedError
+
+    def deactivate_expired(self, now: datetime, limit: int) -> int:
+        """Desativa até limit sessões expiradas. Retorna quantas foram desativadas."""
+        raise NotImplementedError
+
+    def purge_expired(self, now: datetime) -> int:
+        """Remove definitivamente as sessões além da retenção (sem índice TTL)."""
+        raise NotImplementedError
+
+
+class StorageBackend:
+    """
+    Backend de armazenamento: agrupa os stores de cada entidade.
+    """
+    name = ''
+
+    tasks: TaskStore
+    users: UserStore
+    tokens: TokenStore
+    sessions: SessionInfoStore
+
+    def ensure_schema(self, force: bool = False, dry_run: bool = False) -> Dict:
+        """
+        Cria/atualiza o esquema (índices, tabelas) do backend.
+
+        Returns:
+            Relatório com as chaves version, skipped, created, dropped,
+            unchanged e errors (mesmo formato de apply_indexes)
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Fecha as conexões abertas pelo backend."""
+        raise NotImplementedError
+
+
+def task_doc_to_dict(task_doc: Dict) -> Dict:
+    """Converte um documento/registro de tarefa para o formato de resposta."""
+    return {
+        '_id': str(task_doc['_id']),
+        'text': task_doc['text'],
+        'done': task_doc.get('done', False)
+    }
+
+
+def finish_bulk(results: List[Optional[Dict]]) -> List[Dict]:
+    """Marca como ignoradas as operações que não foram executadas."""
+    return [
+        result if result is not None else {'status': 'skipped'}
+        for result in results
+    ]
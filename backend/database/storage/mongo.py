@@ -0,0 +1,659 @@
+"""
+Engine MongoDB do backend de armazenamento.
+Usa a conexão única de database.connection e o registro de índices
+de database.indexes (expiração feita pelos índices TTL).
+"""
+import heapq
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, InsertOne, UpdateOne, DeleteOne, ReplaceOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from database.indexes import EMAIL_UNIQUE_INDEX, UniqueIndexGuard, apply_indexes
+from database.storage.base import (
+    StorageBackend, TaskStore, UserStore, TokenStore, SessionInfoStore, finish_bulk,
+    task_doc_to_dict
+)
+
+# Campos retornados nas listagens de tarefas (evita trazer o documento inteiro)
+TASK_LIST_PROJECTION = {'text': 1, 'done': 1}
+
+# Change stream das tarefas: só as operações e os campos usados pelo feed.
+# A pré-imagem (documento antes da remoção) fornece o user_id das remoções.
+TASK_CHANGE_PIPELINE = [
+    {'$match': {'operationType': {'$in': ['insert', 'update', 'replace', 'delete']}}},
+    {'$project': {'operationType': 1, 'documentKey': 1, 'fullDocument': 1,
+                  'fullDocumentBeforeChange.user_id': 1}},
+]
+# Tipo do evento do feed para cada operação do change stream
+TASK_CHANGE_TYPES = {'insert': 'created', 'update': 'updated', 'replace': 'updated',
+                     'delete': 'deleted'}
+# Código do erro "coleção não existe" (collMod antes da primeira tarefa)
+NAMESPACE_NOT_FOUND = 26
+
+# Lápides das tarefas removidas (sincronização incremental; apagadas pelo TTL)
+TOMBSTONES_COLLECTION_NAME = 'todos_tombstones'
+# Campos lidos pela sincronização incremental
+TASK_CHANGES_PROJECTION = {'text': 1, 'done': 1, 'seq': 1}
+# Opções do find_one_and_update de uma tarefa (retorna o documento novo)
+TASK_UPDATE_OPTIONS = {'projection': TASK_LIST_PROJECTION, 'return_document': ReturnDocument.AFTER}
+# Campos lidos dos eventos de revogação (services/token_cache.RevocationChannel)
+REVOCATION_PROJECTION = {'_id': 0, 'token': 1, 'user_id': 1}
+# Campos lidos na validação de um token
+TOKEN_PROJECTION = {'_id': 0, 'token': 1, 'user_id': 1, 'email': 1, 'expires_at': 1}
+
+
+def _object_id(value: str) -> Optional[ObjectId]:
+    """Converte um ID em ObjectId (None se inválido)."""
+    try:
+        return ObjectId(value)
+    except Exception:
+        return None
+
+
+def page_filter(user_id: str, after_id: str = None) -> Dict:
+    """Tarefas do usuário depois do _id (paginação em ordem de _id)."""
+    query_filter = {'user_id': user_id}
+    if after_id is not None:
+        query_filter['_id'] = {'$gt': ObjectId(after_id)}
+    return query_filter
+
+
+def new_task_doc(user_id: str, text: str, done: bool, seq: int) -> Dict:
+    """Documento de uma tarefa nova (o _id é gerado localmente)."""
+    return {'_id': ObjectId(), 'text': text, 'done': done, 'user_id': user_id, 'seq': seq}
+
+
+def task_update(task_id: ObjectId, user_id: str, fields: Dict, seq: int) -> tuple:
+    """Filtro e update de uma alteração (só os campos enviados, mais a sequência)."""
+    return {'_id': task_id, 'user_id': user_id}, {'$set': {**fields, 'seq': seq}}
+
+
+def seq_now() -> int:
+    """
+    Sequência de uma escrita: o instante atual em microssegundos.
+    Gerada pela aplicação, sem ida ao banco; escritas simultâneas podem
+    empatar (ver TaskService.format_changes).
+    """
+    return time.time_ns() // 1000
+
+
+def sync_seq(lag: float) -> int:
+    """
+    Sequência até a qual as escritas já estão visíveis: o instante atual
+    menos lag segundos (tempo de uma escrita e diferença entre os relógios
+    dos servidores). Escritas mais recentes entram no cursor seguinte.
+    """
+    return seq_now() - int(lag * 1_000_000)
+
+
+def version_bump(user_id: str) -> tuple:
+    """Filtro e update (com upsert) que incrementam a versão da lista."""
+    return {'_id': user_id}, {'$inc': {'version': 1}}
+
+
+def changes_filter(user_id: str, since: int) -> Dict:
+    """Tarefas/lápides do usuário depois da sequência (índices (user_id, seq))."""
+    return {'user_id': user_id, 'seq': {'$gt': since}}
+
+
+def tombstone_doc(task_id: ObjectId, user_id: str, seq: int, deleted_at: datetime) -> Dict:
+    """Lápide de uma tarefa removida (só o necessário para a sincronização)."""
+    return {'_id': task_id, 'user_id': user_id, 'seq': seq, 'deleted_at': deleted_at}
+
+
+def referenced_ids(operations: List[Dict]) -> List[ObjectId]:
+    """Retorna os _id das tarefas referenciadas por update/delete."""
+    return [ObjectId(op['_id']) for op in operations if op['op'] != 'create']
+
+
+def owned_filter(user_id: str, task_ids: List[ObjectId]) -> Dict:
+    """Tarefas do usuário entre os IDs (coberta pelo índice de _id)."""
+    return {'_id': {'$in': task_ids}, 'user_id': user_id}
+
+
+def plan_bulk(user_id: str, operations: List[Dict], existing: set, ordered: bool,
+              first_seq: int, deleted_at: datetime) -> tuple:
+    """
+    Monta as requisições do bulk_write a partir das operações validadas.
+
+    Args:
+        user_id: ID do usuário
+        operations: Operações validadas (ver TaskStore.bulk_apply)
+        existing: IDs (str) das tarefas referenciadas que existem
+        ordered: Se True, para na primeira operação sem tarefa
+        first_seq: Sequência da primeira operação (a operação i usa first_seq + i)
+        deleted_at: Momento gravado nas lápides das remoções
+
+    Returns:
+        Tupla (requests, índice da operação de cada request, resultados,
+        lápides das remoções como (índice da operação, documento))
+    """
+    results: List[Optional[Dict]] = [None] * len(operations)
+    requests = []
+    request_index = []  # posição da operação original de cada request
+    tombstones = []
+    for index, op in enumerate(operations):
+        seq = first_seq + index
+        if op['op'] == 'create':
+            task_doc = new_task_doc(user_id, op['text'], op.get('done', False), seq)
+            requests.append(InsertOne(task_doc))
+            results[index] = {'status': 'ok', 'task': task_doc_to_dict(task_doc)}
+        elif op['_id'] not in existing:
+            results[index] = {'status': 'not_found', '_id': op['_id']}
+            if ordered:
+                break
+            continue
+        elif op['op'] == 'update':
+            requests.append(UpdateOne(*task_update(ObjectId(op['_id']), user_id, op['fields'], seq)))
+            # A tarefa completa é relida depois do bulk_write (ver merge_updated)
+            results[index] = {'status': 'ok', '_id': op['_id']}
+        else:
+            requests.append(DeleteOne({'_id': ObjectId(op['_id']), 'user_id': user_id}))
+            results[index] = {'status': 'ok', '_id': op['_id']}
+            tombstones.append((index, tombstone_doc(ObjectId(op['_id']), user_id, seq, deleted_at)))
+        request_index.append(index)
+    return requests, request_index, results, tombstones
+
+
+def tombstone_requests(tombstones: List[tuple], results: List[Optional[Dict]]) -> List[ReplaceOne]:
+    """
+    Gravação das lápides das remoções que o bulk_write executou.
+    Upsert: uma remoção concorrente da mesma tarefa só atualiza a lápide.
+    """
+    return [
+        ReplaceOne({'_id': task_doc['_id']}, task_doc, upsert=True)
+        for index, task_doc in tombstones
+        if results[index] is not None and results[index]['status'] == 'ok'
+    ]
+
+
+def updated_ids(operations: List[Dict], results: List[Optional[Dict]]) -> List[ObjectId]:
+    """IDs das atualizações executadas, para reler as tarefas completas."""
+    return [
+        ObjectId(op['_id']) for op, result in zip(operations, results)
+        if op['op'] == 'update' and result is not None and result['status'] == 'ok'
+    ]
+
+
+def merge_updated(operations: List[Dict], results: List[Optional[Dict]], task_docs) -> None:
+    """
+    Coloca nos resultados das atualizações a tarefa completa relida (o
+    mesmo formato do PUT). Uma tarefa removida no meio vira not_found.
+    """
+    tasks = {str(task_doc['_id']): task_doc_to_dict(task_doc) for task_doc in task_docs}
+    for index, op in enumerate(operations):
+        result = results[index]
+        if op['op'] != 'update' or result is None or result['status'] != 'ok':
+            continue
+        task = tasks.get(op['_id'])
+        results[index] = ({'status': 'ok', 'task': task} if task is not None
+                          else {'status': 'not_found', '_id': op['_id']})
+
+
+def any_applied(results: List[Optional[Dict]]) -> bool:
+    """Se alguma operação do lote foi executada (a versão da lista muda)."""
+    return any(result and result['status'] == 'ok' for result in results)
+
+
+def merge_changes(task_docs, tombstone_docs, limit: int) -> List[Dict]:
+    """Intercala tarefas e lápides (ambas em ordem de seq) até limit itens."""
+    changes = heapq.merge(
+        ({'seq': task_doc['seq'], 'task': task_doc_to_dict(task_doc)} for task_doc in task_docs),
+        ({'seq': task_doc['seq'], 'deleted': str(task_doc['_id'])} for task_doc in tombstone_docs),
+        key=lambda change: change['seq']
+    )
+    return [change for change, _ in zip(changes, range(limit))]
+
+
+def merge_bulk_errors(results: List[Optional[Dict]], request_index: List[int],
+                      details: Dict, ordered: bool) -> None:
+    """Aplica nos resultados os erros de um BulkWriteError."""
+    failed = {}
+    for error in details.get('writeErrors', []):
+        failed[request_index[error['index']]] = error.get('errmsg', 'Erro de escrita')
+    for index, message in failed.items():
+        results[index] = {'status': 'error', 'error': message}
+    if ordered and failed:
+        # Em modo ordenado nada após a primeira falha é executado
+        first_failure = min(failed)
+        for index in request_index:
+            if index > first_failure:
+                results[index] = None
+
+
+class MongoTaskStore(TaskStore):
+    """
+    Tarefas na coleção todos; versões das listas e sequências em
+    todos_versions; lápides das removidas em todos_tombstones.
+
+    A sequência de cada escrita é o instante em que ela é feita (seq_now),
+    gravado na mesma escrita da tarefa; a versão da lista só é incrementada
+    depois, e só se algo mudou. Uma alteração ou remoção de tarefa
+    inexistente custa uma única ida ao banco. O cursor da sincronização
+    fica sync_lag segundos atrás do relógio (ver sync_seq), o que cobre as
+    escritas ainda em andamento sem marcas no banco.
+    """
+    COLLECTION_NAME = 'todos'
+    VERSIONS_COLLECTION_NAME = 'todos_versions'
+    TOMBSTONES_COLLECTION_NAME = TOMBSTONES_COLLECTION_NAME
+
+    def __init__(self, connection, sync_lag: float = 2):
+        self._connection = connection
+        self.sync_lag = sync_lag
+
+    @property
+    def collection(self):
+        return self._connection.get_collection(self.COLLECTION_NAME)
+
+    @property
+    def versions(self):
+        return self._connection.get_collection(self.VERSIONS_COLLECTION_NAME)
+
+    @property
+    def tombstones(self):
+        return self._connection.get_collection(self.TOMBSTONES_COLLECTION_NAME)
+
+    def find(self, task_id: str, user_id: str) -> Optional[Dict]:
+        obj_id = _object_id(task_id)
+        if obj_id is None:
+            return None
+        task_doc = self.collection.find_one({'_id': obj_id, 'user_id': user_id})
+        if task_doc is None:
+            return None
+        return {**task_doc_to_dict(task_doc), 'user_id': task_doc.get('user_id')}
+
+    def find_page(self, user_id: str, limit: int = None, after_id: str = None) -> List[Dict]:
+        cursor = self.collection.find(page_filter(user_id, after_id), TASK_LIST_PROJECTION)
+        cursor = cursor.sort('_id', ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        return [task_doc_to_dict(task_doc) for task_doc in cursor]
+
+    def iter_by_user(self, user_id: str, batch_size: int = 500) -> Iterator[Dict]:
+        cursor = self.collection.find({'user_id': user_id}, TASK_LIST_PROJECTION)
+        cursor = cursor.sort('_id', ASCENDING).batch_size(batch_size)
+        try:
+            for task_doc in cursor:
+                yield task_doc_to_dict(task_doc)
+        finally:
+            cursor.close()
+
+    def insert(self, user_id: str, text: str, done: bool = False) -> str:
+        task_doc = new_task_doc(user_id, text, done, seq_now())
+        self.collection.insert_one(task_doc)
+        self.bump_list_version(user_id)
+        return str(task_doc['_id'])
+
+    def update(self, task_id: str, user_id: str, fields: Dict) -> Optional[Dict]:
+        obj_id = _object_id(task_id)
+        if obj_id is None:
+            return None
+        # O filtro por _id e user_id já valida o dono: uma tarefa alheia ou
+        # inexistente não grava nada
+        task_doc = self.collection.find_one_and_update(
+            *task_update(obj_id, user_id, fields, seq_now()), **TASK_UPDATE_OPTIONS
+        )
+        if task_doc is None:
+            return None
+        self.bump_list_version(user_id)
+        return task_doc_to_dict(task_doc)
+
+    def delete(self, task_id: str, user_id: str) -> bool:
+        obj_id = _object_id(task_id)
+        if obj_id is None:
+            return False
+        task_doc = self.collection.find_one_and_delete(
+            {'_id': obj_id, 'user_id': user_id},
+            projection={'_id': 1}
+        )
+        if task_doc is None:
+            return False
+        # Sequência tirada depois da remoção: a lápide nunca fica antes dela
+        tombstone = tombstone_doc(obj_id, user_id, seq_now(), datetime.utcnow())
+        self.tombstones.replace_one({'_id': obj_id}, tombstone, upsert=True)
+        self.bump_list_version(user_id)
+        return True
+
+    def bulk_apply(self, user_id: str, operations: List[Dict], ordered: bool = True) -> List[Dict]:
+        if not operations:
+            return []
+        collection = self.collection
+
+        # Uma única consulta (coberta pelo índice de _id) descobre quais
+        # tarefas referenciadas existem e pertencem ao usuário
+        referenced = referenced_ids(operations)
+        existing = set()
+        if referenced:
+            cursor = collection.find(owned_filter(user_id, referenced), {'_id': 1})
+            existing = {str(task_doc['_id']) for task_doc in cursor}
+
+        requests, request_index, results, tombstones = plan_bulk(
+            user_id, operations, existing, ordered, seq_now(), datetime.utcnow()
+        )
+
+        if requests:
+            try:
+                collection.bulk_write(requests, ordered=ordered)
+            except BulkWriteError as e:
+                merge_bulk_errors(results, request_index, e.details, ordered)
+
+        deleted = tombstone_requests(tombstones, results)
+        if deleted:
+            self.tombstones.bulk_write(deleted, ordered=False)
+        if any_applied(results):
+            self.bump_list_version(user_id)
+
+        updated = updated_ids(operations, results)
+        if updated:
+            merge_updated(operations, results,
+                          collection.find(owned_filter(user_id, updated), TASK_LIST_PROJECTION))
+        return finish_bulk(results)
+
+    def get_list_version(self, user_id: str) -> int:
+        collection = self._connection.get_collection(self.VERSIONS_COLLECTION_NAME)
+        version_doc = collection.find_one({'_id': user_id}, {'version': 1})
+        return version_doc.get('version', 0) if version_doc else 0
+
+    def bump_list_version(self, user_id: str) -> None:
+        self.versions.update_one(*version_bump(user_id), upsert=True)
+
+    def get_sync_seq(self, user_id: str) -> int:
+        return sync_seq(self.sync_lag)
+
+    def changes_since(self, user_id: str, since: int, limit: int) -> List[Dict]:
+        query_filter = changes_filter(user_id, since)
+        task_docs = self.collection.find(query_filter, TASK_CHANGES_PROJECTION)
+        tombstone_docs = self.tombstones.find(query_filter, {'seq': 1})
+        return merge_changes(
+            task_docs.sort('seq', ASCENDING).limit(limit),
+            tombstone_docs.sort('seq', ASCENDING).limit(limit),
+            limit
+        )
+
+    def purge_tombstones(self, now: datetime) -> int:
+        # As lápides saem pelo índice TTL
+        return 0
+
+    def watch(self, resume_after: Dict = None) -> Iterator[Dict]:
+        # Exige replica set (ou sharded cluster) e MongoDB 6.0+ (pré-imagens)
+        self._enable_pre_images()
+        stream = self.collection.watch(
+            TASK_CHANGE_PIPELINE,
+            full_document='updateLookup',
+            full_document_before_change='whenAvailable',
+            resume_after=resume_after
+        )
+        return self._iter_changes(stream)
+
+    def _enable_pre_images(self) -> None:
+        """Liga as pré-imagens da coleção (necessárias para rotear as remoções)."""
+        db = self._connection.db
+        try:
+            db.command('collMod', self.COLLECTION_NAME,
+                       changeStreamPreAndPostImages={'enabled': True})
+        except OperationFailure as e:
+            if e.code != NAMESPACE_NOT_FOUND:
+                raise
+            db.create_collection(self.COLLECTION_NAME,
+                                 changeStreamPreAndPostImages={'enabled': True})
+
+    @staticmethod
+    def _iter_changes(stream) -> Iterator[Dict]:
+        with stream:
+            for change in stream:
+                event_type = TASK_CHANGE_TYPES[change['operationType']]
+                if event_type == 'deleted':
+                    # Sem pré-imagem não há como saber o dono da tarefa
+                    task_doc = change.get('fullDocumentBeforeChange')
+                    task = {'_id': str(change['documentKey']['_id'])}
+                else:
+                    # Tarefa já removida quando o update foi lido
+                    task_doc = change.get('fullDocument')
+                    task = task_doc_to_dict(task_doc) if task_doc else None
+                if not task_doc or 'user_id' not in task_doc:
+                    continue
+                yield {
+                    'id': change['_id']['_data'],
+                    'resume_token': change['_id'],
+                    'type': event_type,
+                    'user_id': task_doc['user_id'],
+                    'task': task
+                }
+
+
+class MongoUserStore(UserStore):
+    """
+    Usuários na coleção users (email único pelo índice).
+    Sem o índice (banco antigo com emails duplicados, índices não aplicados),
+    o insert volta a buscar o email antes de inserir.
+    """
+    COLLECTION_NAME = 'users'
+    EPOCHS_COLLECTION_NAME = 'session_epochs'
+
+    def __init__(self, connection):
+        self._connection = connection
+        self.email_index = UniqueIndexGuard(EMAIL_UNIQUE_INDEX, self.COLLECTION_NAME)
+
+    @property
+    def collection(self):
+        return self._connection.get_collection(self.COLLECTION_NAME)
+
+    @staticmethod
+    def _to_dict(user_doc: Optional[Dict]) -> Optional[Dict]:
+        if user_doc is None:
+            return None
+        return {
+            '_id': str(user_doc['_id']),
+            'email': user_doc['email'],
+            'password': user_doc.get('password')
+        }
+
+    def find_by_email(self, email: str) -> Optional[Dict]:
+        return self._to_dict(self.collection.find_one({'email': email}))
+
+    def find_by_id(self, user_id: str) -> Optional[Dict]:
+        obj_id = _object_id(user_id)
+        if obj_id is None:
+            return None
+        return self._to_dict(self.collection.find_one({'_id': obj_id}))
+
+    def insert(self, email: str, password_hash: str) -> Optional[str]:
+        if self.email_index.needs_check():
+            self.email_index.record(self.collection.index_information())
+        if not self.email_index.present and self.find_by_email(email) is not None:
+            return None
+        try:
+            result = self.collection.insert_one({'email': email, 'password': password_hash})
+        except DuplicateKeyError:
+            return None
+        return str(result.inserted_id)
+
+    def update_password(self, user_id: str, password_hash: str) -> bool:
+        obj_id = _object_id(user_id)
+        if obj_id is None:
+            return False
+        result = self.collection.update_one({'_id': obj_id}, {'$set': {'password': password_hash}})
+        return result.matched_count > 0
+
+    def count(self) -> int:
+        return self.collection.estimated_document_count()
+
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        cursor = self.collection.find({}, {'_id': 0, 'email': 1}).batch_size(batch_size)
+        for user_doc in cursor:
+            if 'email' in user_doc:
+                yield user_doc['email']
+
+    def get_session_epoch(self, user_id: str) -> int:
+        collection = self._connection.get_collection(self.EPOCHS_COLLECTION_NAME)
+        epoch_doc = collection.find_one({'_id': user_id}, {'epoch': 1})
+        return epoch_doc.get('epoch', 0) if epoch_doc else 0
+
+    def bump_session_epoch(self, user_id: str) -> int:
+        collection = self._connection.get_collection(self.EPOCHS_COLLECTION_NAME)
+        epoch_doc = collection.find_one_and_update(
+            {'_id': user_id}, {'$inc': {'epoch': 1}},
+            projection={'epoch': 1}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return epoch_doc['epoch']
+
+
+def token_revocation(when: datetime) -> Dict:
+    """Update que revoga tokens (inativos, com a data da revogação)."""
+    return {'$set': {'is_active': False, 'revoked_at': when}}
+
+
+def session_deactivation(when: datetime) -> Dict:
+    """Update que desativa as informações de uma sessão (logout)."""
+    return {'$set': {'is_active': False, 'updated_at': when}}
+
+
+def _deactivate_expired(collection, now: datetime, limit: int) -> int:
+    """Desativa um lote de documentos expirados (is_active + expires_at)."""
+    ids = [
+        doc['_id'] for doc in collection.find(
+            {'is_active': True, 'expires_at': {'$lt': now}},
+            {'_id': 1}
+        ).limit(limit)
+    ]
+    if not ids:
+        return 0
+    result = collection.update_many(
+        {'_id': {'$in': ids}, 'is_active': True},
+        {'$set': {'is_active': False, 'deactivated_at': now}}
+    )
+    return result.modified_count
+
+
+class MongoTokenStore(TokenStore):
+    """Tokens em auth_tokens; eventos de revogação em token_revocations."""
+    COLLECTION_NAME = 'auth_tokens'
+    REVOCATIONS_COLLECTION_NAME = 'token_revocations'
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    @property
+    def collection(self):
+        return self._connection.get_collection(self.COLLECTION_NAME)
+
+    def insert(self, token_data: Dict) -> None:
+        self.collection.insert_one(dict(token_data))
+
+    def find_active(self, token: str) -> Optional[Dict]:
+        return self.collection.find_one({'token': token, 'is_active': True}, TOKEN_PROJECTION)
+
+    def deactivate(self, token: str) -> None:
+        self.collection.update_one({'token': token}, {'$set': {'is_active': False}})
+
+    def touch_last_used(self, token: str, when: datetime) -> None:
+        self.collection.update_one({'token': token}, {'$set': {'last_used_at': when}})
+
+    def revoke(self, token: str, when: datetime) -> bool:
+        result = self.collection.update_one({'token': token}, token_revocation(when))
+        return result.modified_count > 0
+
+    def revoke_user(self, user_id: str, when: datetime) -> int:
+        result = self.collection.update_many({'user_id': user_id, 'is_active': True},
+                                             token_revocation(when))
+        return result.modified_count
+
+    def publish_revocation(self, event: Dict) -> None:
+        self._connection.get_collection(self.REVOCATIONS_COLLECTION_NAME).insert_one(dict(event))
+
+    def revocations_since(self, since: datetime) -> Iterator[Dict]:
+        return self._connection.get_collection(self.REVOCATIONS_COLLECTION_NAME).find(
+            {'created_at': {'$gte': since}}, REVOCATION_PROJECTION
+        )
+
+    def deactivate_expired(self, now: datetime, limit: int) -> int:
+        return _deactivate_expired(self.collection, now, limit)
+
+    def purge_expired(self, now: datetime) -> int:
+        # A remoção fica a cargo dos índices TTL
+        return 0
+
+
+class MongoSessionInfoStore(SessionInfoStore):
+    """
+    Informações legíveis das sessões na coleção sessions_info ou, com
+    SESSION_INFO_IN_SESSION, nos próprios documentos do Flask-Session.
+    """
+    COLLECTION_NAME = 'sessions_info'
+    # Campos do Flask-Session que não fazem parte das informações legíveis
+    PROJECTION = {'id': 0, 'val': 0, 'expiration': 0}
+
+    def __init__(self, connection, collection_name: str = COLLECTION_NAME):
+        self._connection = connection
+        self.collection_name = collection_name
+
+    @property
+    def collection(self):
+        return self._connection.get_collection(self.collection_name)
+
+    def insert(self, session_info: Dict) -> None:
+        self.collection.insert_one(dict(session_info))
+
+    def touch(self, session_id: str, when: datetime) -> bool:
+        result = self.collection.update_one(
+            {'session_id': session_id, 'is_active': True},
+            {'$set': {'updated_at': when}}
+        )
+        return result.modified_count > 0
+
+    def touch_many(self, pending: Dict[str, datetime]) -> None:
+        operations = [
+            UpdateOne(
+                {'session_id': session_id, 'is_active': True},
+                {'$max': {'updated_at': timestamp}}
+            )
+            for session_id, timestamp in pending.items()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def deactivate(self, session_id: str, when: datetime) -> bool:
+        result = self.collection.update_one({'session_id': session_id}, session_deactivation(when))
+        return result.modified_count > 0
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        return self.collection.find_one({'session_id': session_id}, self.PROJECTION)
+
+    def list_active(self) -> List[Dict]:
+        return list(self.collection.find({'is_active': True}, self.PROJECTION)
+                    .sort('created_at', DESCENDING))
+
+    def deactivate_expired(self, now: datetime, limit: int) -> int:
+        return _deactivate_expired(self.collection, now, limit)
+
+    def purge_expired(self, now: datetime) -> int:
+        # A remoção fica a cargo dos índices TTL
+        return 0
+
+
+class MongoStorage(StorageBackend):
+    """
+    Backend MongoDB (padrão).
+
+    Args:
+        connection: Conexão com get_collection() e db (DatabaseConnection)
+        sessions_collection: Coleção das informações legíveis das sessões
+        sync_lag: Segundos que o cursor da sincronização fica atrás do relógio
+    """
+    name = 'mongodb'
+
+    def __init__(self, connection, sessions_collection: str = MongoSessionInfoStore.COLLECTION_NAME,
+                 sync_lag: float = 2):
+        self._connection = connection
+        self.tasks = MongoTaskStore(connection, sync_lag)
+        self.users = MongoUserStore(connection)
+        self.tokens = MongoTokenStore(connection)
+        self.sessions = MongoSessionInfoStore(connection, sessions_collection)
+
+    def ensure_schema(self, force: bool = False, dry_run: bool = False) -> Dict:
+        return apply_indexes(self._connection.db, force=force, dry_run=dry_run)
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,714 @@
+"""
+Engine SQLite do backend de armazenamento.
+Banco embutido em um arquivo local, em modo WAL (leituras não bloqueiam a
+escrita), para instalações pequenas de um único nó, testes e benchmarks.
+
+Cada consulta é uma string SQL constante com parâmetros: o sqlite3 mantém
+os statements compilados em cache por conexão (cached_statements), então
+a partir da segunda execução nada é recompilado.
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+from bson import ObjectId
+from database.storage.base import (
+    StorageBackend, TaskStore, UserStore, TokenStore, SessionInfoStore, finish_bulk
+)
+
+logger = logging.getLogger(__name__)
+
+# Incrementar sempre que SCHEMA mudar (gravado em PRAGMA user_version)
+SCHEMA_VERSION = 3
+
+# Tabelas, colunas e índices: (rótulo, SQL). Os índices espelham database/indexes.py
+SCHEMA = [
+    ('users', """
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            email TEXT NOT NULL,
+            password TEXT
+        )"""),
+    ('users.email_unique',
+     'CREATE UNIQUE INDEX IF NOT EXISTS users_email_unique ON users (email)'),
+    ('session_epochs', """
+        CREATE TABLE IF NOT EXISTS session_epochs (
+            user_id TEXT PRIMARY KEY,
+            epoch INTEGER NOT NULL
+        ) WITHOUT ROWID"""),
+    ('todos', """
+        CREATE TABLE IF NOT EXISTS todos (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            text TEXT NOT NULL,
+            done INTEGER NOT NULL DEFAULT 0
+        )"""),
+    ('todos.user_id_id',
+     'CREATE INDEX IF NOT EXISTS todos_user_id_id ON todos (user_id, id)'),
+    ('todos.seq', 'ALTER TABLE todos ADD COLUMN seq INTEGER NOT NULL DEFAULT 0'),
+    ('todos.user_id_seq',
+     'CREATE INDEX IF NOT EXISTS todos_user_id_seq ON todos (user_id, seq)'),
+    ('todos_versions', """
+        CREATE TABLE IF NOT EXISTS todos_versions (
+            user_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID"""),
+    ('todos_versions.seq', 'ALTER TABLE todos_versions ADD COLUMN seq INTEGER NOT NULL DEFAULT 0'),
+    ('todos_tombstones', """
+        CREATE TABLE IF NOT EXISTS todos_tombstones (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            deleted_at TEXT NOT NULL
+        ) WITHOUT ROWID"""),
+    ('todos_tombstones.user_id_seq',
+     'CREATE INDEX IF NOT EXISTS todos_tombstones_user_id_seq ON todos_tombstones (user_id, seq)'),
+    ('todos_tombstones.deleted_at',
+     'CREATE INDEX IF NOT EXISTS todos_tombstones_deleted_at ON todos_tombstones (deleted_at)'),
+    ('auth_tokens', """
+        CREATE TABLE IF NOT EXISTS auth_tokens (
+            id TEXT PRIMARY KEY,
+            token TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            email TEXT,
+            created_at TEXT NOT NULL,
+            expires_at TEXT,
+            is_active INTEGER NOT NULL DEFAULT 1,
+            last_used_at TEXT,
+            revoked_at TEXT,
+            deactivated_at TEXT
+        )"""),
+    ('auth_tokens.token_unique',
+     'CREATE UNIQUE INDEX IF NOT EXISTS auth_tokens_token_unique ON auth_tokens (token)'),
+    ('auth_tokens.user_id_is_active',
+     'CREATE INDEX IF NOT EXISTS auth_tokens_user_id_is_active ON auth_tokens (user_id, is_active)'),
+    ('auth_tokens.is_active_expires_at',
+     'CREATE INDEX IF NOT EXISTS auth_tokens_is_active_expires_at ON auth_tokens (is_active, expires_at)'),
+    ('token_revocations', """
+        CREATE TABLE IF NOT EXISTS token_revocations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token TEXT,
+            user_id TEXT,
+            created_at TEXT NOT NULL
+        )"""),
+    ('token_revocations.created_at',
+     'CREATE INDEX IF NOT EXISTS token_revocations_created_at ON token_revocations (created_at)'),
+    ('sessions_info', """
+        CREATE TABLE IF NOT EXISTS sessions_info (
+            id TEXT PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            email TEXT,
+            user_id TEXT,
+            created_at TEXT,
+            updated_at TEXT,
+            expires_at TEXT,
+            is_active INTEGER NOT NULL DEFAULT 1,
+            deactivated_at TEXT
+        )"""),
+    ('sessions_info.session_id',
+     'CREATE INDEX IF NOT EXISTS sessions_info_session_id ON sessions_info (session_id)'),
+    ('sessions_info.is_active_created_at',
+     'CREATE INDEX IF NOT EXISTS sessions_info_is_active_created_at '
+     'ON sessions_info (is_active, created_at DESC)'),
+    ('sessions_info.is_active_expires_at',
+     'CREATE INDEX IF NOT EXISTS sessions_info_is_active_expires_at '
+     'ON sessions_info (is_active, expires_at)'),
+]
+
+# Mesmo prazo do índice TTL de token_revocations no MongoDB
+REVOCATION_RETENTION = timedelta(days=1)
+
+# Tarefas
+SQL_TASK_FIND = 'SELECT id, text, done, user_id FROM todos WHERE id = ? AND user_id = ?'
+SQL_TASK_PAGE = ('SELECT id, text, done FROM todos WHERE user_id = ? AND id > ? '
+                 'ORDER BY id LIMIT ?')
+SQL_TASK_INSERT = 'INSERT INTO todos (id, user_id, text, done, seq) VALUES (?, ?, ?, ?, ?)'
+SQL_TASK_UPDATE = ('UPDATE todos SET text = COALESCE(?, text), done = COALESCE(?, done), seq = ? '
+                   'WHERE id = ? AND user_id = ?')
+SQL_TASK_DELETE = 'DELETE FROM todos WHERE id = ? AND user_id = ?'
+SQL_VERSION_GET = 'SELECT version FROM todos_versions WHERE user_id = ?'
+SQL_VERSION_BUMP = ('INSERT INTO todos_versions (user_id, version) VALUES (?, 1) '
+                    'ON CONFLICT (user_id) DO UPDATE SET version = version + 1')
+# Sequências: lidas e gravadas na mesma transação da escrita
+SQL_SEQ_GET = 'SELECT seq FROM todos_versions WHERE user_id = ?'
+SQL_SEQ_COMMIT = ('INSERT INTO todos_versions (user_id, version, seq) VALUES (?, 1, ?) '
+                  'ON CONFLICT (user_id) DO UPDATE SET version = version + 1, seq = excluded.seq')
+SQL_TOMBSTONE_INSERT = ('INSERT OR REPLACE INTO todos_tombstones (id, user_id, seq, deleted_at) '
+                        'VALUES (?, ?, ?, ?)')
+SQL_TOMBSTONE_PURGE = 'DELETE FROM todos_tombstones WHERE deleted_at < ?'
+SQL_TASK_CHANGES = ('SELECT id, text, done, seq, 0 AS deleted FROM todos WHERE user_id = ? AND seq > ? '
+                    'UNION ALL '
+                    'SELECT id, NULL, NULL, seq, 1 FROM todos_tombstones WHERE user_id = ? AND seq > ? '
+                    'ORDER BY seq LIMIT ?')
+
+# Usuários
+SQL_USER_BY_EMAIL = 'SELECT id, email, password FROM users WHERE email = ?'
+SQL_USER_BY_ID = 'SELECT id, email, password FROM users WHERE id = ?'
+SQL_USER_INSERT = 'INSERT INTO users (id, email, password) VALUES (?, ?, ?)'
+SQL_USER_PASSWORD = 'UPDATE users SET password = ? WHERE id = ?'
+SQL_USER_COUNT = 'SELECT COUNT(*) FROM users'
+SQL_USER_EMAILS = 'SELECT id, email FROM users WHERE id > ? ORDER BY id LIMIT ?'
+SQL_EPOCH_GET = 'SELECT epoch FROM session_epochs WHERE user_id = ?'
+SQL_EPOCH_BUMP = ('INSERT INTO session_epochs (user_id, epoch) VALUES (?, 1) '
+                  'ON CONFLICT (user_id) DO UPDATE SET epoch = epoch + 1')
+
+# Tokens
+SQL_TOKEN_INSERT = ('INSERT INTO auth_tokens (id, token, user_id, email, created_at, expires_at, is_active) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)')
+SQL_TOKEN_FIND_ACTIVE = ('SELECT token, user_id, email, expires_at FROM auth_tokens '
+                         'WHERE token = ? AND is_active = 1')
+SQL_TOKEN_DEACTIVATE = 'UPDATE auth_tokens SET is_active = 0 WHERE token = ?'
+SQL_TOKEN_TOUCH = 'UPDATE auth_tokens SET last_used_at = ? WHERE token = ?'
+SQL_TOKEN_REVOKE = ('UPDATE auth_tokens SET is_active = 0, revoked_at = ? '
+                    'WHERE token = ? AND is_active = 1')
+SQL_TOKEN_REVOKE_USER = ('UPDATE auth_tokens SET is_active = 0, revoked_at = ? '
+                         'WHERE user_id = ? AND is_active = 1')
+SQL_TOKEN_EXPIRE = ('UPDATE auth_tokens SET is_active = 0, deactivated_at = ? WHERE id IN ('
+                    'SELECT id FROM auth_tokens WHERE is_active = 1 AND expires_at < ? LIMIT ?)')
+SQL_TOKEN_PURGE = 'DELETE FROM auth_tokens WHERE expires_at < ?'
+SQL_REVOCATION_INSERT = 'INSERT INTO token_revocations (token, user_id, created_at) VALUES (?, ?, ?)'
+SQL_REVOCATION_SINCE = 'SELECT token, user_id FROM token_revocations WHERE created_at >= ?'
+SQL_REVOCATION_PURGE = 'DELETE FROM token_revocations WHERE created_at < ?'
+
+# Sessões
+SQL_SESSION_INSERT = ('INSERT INTO sessions_info (id, session_id, email, user_id, created_at, '
+                      'updated_at, expires_at, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)')
+SQL_SESSION_TOUCH = ('UPDATE sessions_info SET updated_at = ? '
+                     'WHERE session_id = ? AND is_active = 1')
+SQL_SESSION_TOUCH_MAX = ('UPDATE sessions_info SET updated_at = MAX(COALESCE(updated_at, ?), ?) '
+                         'WHERE session_id = ? AND is_active = 1')
+SQL_SESSION_DEACTIVATE = ('UPDATE sessions_info SET is_active = 0, updated_at = ? '
+                          'WHERE session_id = ? AND is_active = 1')
+SQL_SESSION_GET = 'SELECT * FROM sessions_info WHERE session_id = ?'
+SQL_SESSION_ACTIVE = 'SELECT * FROM sessions_info WHERE is_active = 1 ORDER BY created_at DESC'
+SQL_SESSION_EXPIRE = ('UPDATE sessions_info SET is_active = 0, deactivated_at = ? WHERE id IN ('
+                      'SELECT id FROM sessions_info WHERE is_active = 1 AND expires_at < ? LIMIT ?)')
+SQL_SESSION_PURGE = 'DELETE FROM sessions_info WHERE expires_at < ?'
+
+
+def _ts(value: Optional[datetime]) -> Optional[str]:
+    """Datetime -> texto ISO de largura fixa (a ordem do texto é a ordem das datas)."""
+    return value.isoformat(timespec='microseconds') if value is not None else None
+
+
+def _dt(value: Optional[str]) -> Optional[datetime]:
+    """Texto ISO -> datetime."""
+    return datetime.fromisoformat(value) if value else None
+
+
+def _task_row_to_dict(row) -> Dict:
+    return {'_id': row['id'], 'text': row['text'], 'done': bool(row['done'])}
+
+
+def _user_row_to_dict(row) -> Optional[Dict]:
+    if row is None:
+        return None
+    return {'_id': row['id'], 'email': row['email'], 'password': row['password']}
+
+
+def _session_row_to_dict(row) -> Dict:
+    session_info = {
+        '_id': row['id'],
+        'session_id': row['session_id'],
+        'email': row['email'],
+        'user_id': row['user_id'],
+        'created_at': _dt(row['created_at']),
+        'updated_at': _dt(row['updated_at']),
+        'expires_at': _dt(row['expires_at']),
+        'is_active': bool(row['is_active'])
+    }
+    if row['deactivated_at'] is not None:
+        session_info['deactivated_at'] = _dt(row['deactivated_at'])
+    return session_info
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    Tarefas na tabela todos; versões das listas e sequências em
+    todos_versions; lápides das removidas em todos_tombstones.
+    A sequência é lida e gravada na transação da escrita (BEGIN IMMEDIATE
+    serializa as escritas), então nunca há sequência em andamento.
+    """
+
+    def __init__(self, storage: 'SQLiteStorage', tombstone_retention: timedelta = timedelta(days=30)):
+        self._storage = storage
+        self.tombstone_retention = tombstone_retention
+
+    @staticmethod
+    def _next_seq(conn: sqlite3.Connection, user_id: str) -> int:
+        row = conn.execute(SQL_SEQ_GET, (user_id,)).fetchone()
+        return (row['seq'] if row else 0) + 1
+
+    def find(self, task_id: str, user_id: str) -> Optional[Dict]:
+        with self._storage.connection() as conn:
+            row = conn.execute(SQL_TASK_FIND, (task_id, user_id)).fetchone()
+        if row is None:
+            return None
+        return {**_task_row_to_dict(row), 'user_id': row['user_id']}
+
+    def find_page(self, user_id: str, limit: int = None, after_id: str = None) -> List[Dict]:
+        # LIMIT -1 = sem limite; todo ID é maior que ''
+        params = (user_id, after_id or '', limit or -1)
+        with self._storage.connection() as conn:
+            return [_task_row_to_dict(row) for row in conn.execute(SQL_TASK_PAGE, params)]
+
+    def iter_by_user(self, user_id: str, batch_size: int = 500) -> Iterator[Dict]:
+        # Paginação por chave: nenhuma conexão fica presa entre os lotes
+        after_id = None
+        while True:
+            page = self.find_page(user_id, limit=batch_size, after_id=after_id)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after_id = page[-1]['_id']
+
+    def insert(self, user_id: str, text: str, done: bool = False) -> str:
+        task_id = str(ObjectId())
+        with self._storage.transaction() as conn:
+            seq = self._next_seq(conn, user_id)
+            conn.execute(SQL_TASK_INSERT, (task_id, user_id, text, int(done), seq))
+            conn.execute(SQL_SEQ_COMMIT, (user_id, seq))
+        return task_id
+
+    def update(self, task_id: str, user_id: str, fields: Dict) -> Optional[Dict]:
+        done = fields.get('done')
+        with self._storage.transaction() as conn:
+            seq = self._next_seq(conn, user_id)
+            params = (fields.get('text'), int(done) if done is not None else None, seq, task_id, user_id)
+            if conn.execute(SQL_TASK_UPDATE, params).rowcount == 0:
+                return None
+            conn.execute(SQL_SEQ_COMMIT, (user_id, seq))
+            row = conn.execute(SQL_TASK_FIND, (task_id, user_id)).fetchone()
+        return _task_row_to_dict(row)
+
+    def delete(self, task_id: str, user_id: str) -> bool:
+        with self._storage.transaction() as conn:
+            if conn.execute(SQL_TASK_DELETE, (task_id, user_id)).rowcount == 0:
+                return False
+            seq = self._next_seq(conn, user_id)
+            conn.execute(SQL_TOMBSTONE_INSERT, (task_id, user_id, seq, _ts(datetime.utcnow())))
+            conn.execute(SQL_SEQ_COMMIT, (user_id, seq))
+        return True
+
+    def bulk_apply(self, user_id: str, operations: List[Dict], ordered: bool = True) -> List[Dict]:
+        results: List[Optional[Dict]] = [None] * len(operations)
+        deleted_at = _ts(datetime.utcnow())
+
+        # Uma única transação: um só fsync para o lote inteiro
+        with self._storage.transaction() as conn:
+            seq = self._next_seq(conn, user_id)
+            for index, op in enumerate(operations):
+                try:
+                    if op['op'] == 'create':
+                        task = {'_id': str(ObjectId()), 'text': op['text'], 'done': op.get('done', False)}
+                        conn.execute(SQL_TASK_INSERT, (task['_id'], user_id, task['text'],
+                                                       int(task['done']), seq))
+                        results[index] = {'status': 'ok', 'task': task}
+                        seq += 1
+                        continue
+
+                    if op['op'] == 'update':
+                        fields = op['fields']
+                        done = fields.get('done')
+                        cursor = conn.execute(SQL_TASK_UPDATE, (
+                            fields.get('text'), int(done) if done is not None else None,
+                            seq, op['_id'], user_id
+                        ))
+                        if cursor.rowcount:
+                            # A tarefa completa, no mesmo formato do PUT
+                            row = conn.execute(SQL_TASK_FIND, (op['_id'], user_id)).fetchone()
+                            result = {'status': 'ok', 'task': _task_row_to_dict(row)}
+                    else:
+                        cursor = conn.execute(SQL_TASK_DELETE, (op['_id'], user_id))
+                        if cursor.rowcount:
+                            conn.execute(SQL_TOMBSTONE_INSERT, (op['_id'], user_id, seq, deleted_at))
+                        result = {'status': 'ok', '_id': op['_id']}
+
+                    if cursor.rowcount == 0:
+                        results[index] = {'status': 'not_found', '_id': op['_id']}
+                        if ordered:
+                            break
+                        continue
+                    results[index] = result
+                    seq += 1
+                except sqlite3.Error as e:
+                    # Só o statement que falhou é desfeito
+                    results[index] = {'status': 'error', 'error': str(e)}
+                    if ordered:
+                        break
+
+            if any(result and result['status'] == 'ok' for result in results):
+                conn.execute(SQL_SEQ_COMMIT, (user_id, seq - 1))
+
+        return finish_bulk(results)
+
+    def get_list_version(self, user_id: str) -> int:
+        with self._storage.connection() as conn:
+            row = conn.execute(SQL_VERSION_GET, (user_id,)).fetchone()
+        return row['version'] if row else 0
+
+    def bump_list_version(self, user_id: str) -> None:
+        with self._storage.connection() as conn:
+            conn.execute(SQL_VERSION_BUMP, (user_id,))
+
+    def get_sync_seq(self, user_id: str) -> int:
+        with self._storage.connection() as conn:
+            row = conn.execute(SQL_SEQ_GET, (user_id,)).fetchone()
+        return row['seq'] if row else 0
+
+    def changes_since(self, user_id: str, since: int, limit: int) -> List[Dict]:
+        with self._storage.connection() as conn:
+            rows = conn.execute(SQL_TASK_CHANGES, (user_id, since, user_id, since, limit)).fetchall()
+        return [
+            {'seq': row['seq'], 'deleted': row['id']} if row['deleted']
+            else {'seq': row['seq'], 'task': _task_row_to_dict(row)}
+            for row in rows
+        ]
+
+    def purge_tombstones(self, now: datetime) -> int:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_TOMBSTONE_PURGE, (_ts(now - self.tombstone_retention),)).rowcount
+
+
+class SQLiteUserStore(UserStore):
+    """Usuários na tabela users (email único pelo índice)."""
+
+    def __init__(self, storage: 'SQLiteStorage'):
+        self._storage = storage
+
+    def find_by_email(self, email: str) -> Optional[Dict]:
+        with self._storage.connection() as conn:
+            return _user_row_to_dict(conn.execute(SQL_USER_BY_EMAIL, (email,)).fetchone())
+
+    def find_by_id(self, user_id: str) -> Optional[Dict]:
+        with self._storage.connection() as conn:
+            return _user_row_to_dict(conn.execute(SQL_USER_BY_ID, (user_id,)).fetchone())
+
+    def insert(self, email: str, password_hash: str) -> Optional[str]:
+        user_id = str(ObjectId())
+        try:
+            with self._storage.connection() as conn:
+                conn.execute(SQL_USER_INSERT, (user_id, email, password_hash))
+        except sqlite3.IntegrityError:
+            return None
+        return user_id
+
+    def update_password(self, user_id: str, password_hash: str) -> bool:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_USER_PASSWORD, (password_hash, user_id)).rowcount > 0
+
+    def count(self) -> int:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_USER_COUNT).fetchone()[0]
+
+    def iter_emails(self, batch_size: int = 5000) -> Iterator[str]:
+        after_id = ''
+        while True:
+            with self._storage.connection() as conn:
+                rows = conn.execute(SQL_USER_EMAILS, (after_id, batch_size)).fetchall()
+            for row in rows:
+                yield row['email']
+            if len(rows) < batch_size:
+                return
+            after_id = rows[-1]['id']
+
+    def get_session_epoch(self, user_id: str) -> int:
+        with self._storage.connection() as conn:
+            row = conn.execute(SQL_EPOCH_GET, (user_id,)).fetchone()
+        return row['epoch'] if row else 0
+
+    def bump_session_epoch(self, user_id: str) -> int:
+        with self._storage.transaction() as conn:
+            conn.execute(SQL_EPOCH_BUMP, (user_id,))
+            return conn.execute(SQL_EPOCH_GET, (user_id,)).fetchone()['epoch']
+
+
+class SQLiteTokenStore(TokenStore):
+    """Tokens em auth_tokens; eventos de revogação em token_revocations."""
+
+    def __init__(self, storage: 'SQLiteStorage', retention: timedelta):
+        self._storage = storage
+        self.retention = retention
+
+    def insert(self, token_data: Dict) -> None:
+        with self._storage.connection() as conn:
+            conn.execute(SQL_TOKEN_INSERT, (
+                str(ObjectId()),
+                token_data['token'],
+                token_data['user_id'],
+                token_data.get('email'),
+                _ts(token_data['created_at']),
+                _ts(token_data.get('expires_at')),
+                int(token_data.get('is_active', True))
+            ))
+
+    def find_active(self, token: str) -> Optional[Dict]:
+        with self._storage.connection() as conn:
+            row = conn.execute(SQL_TOKEN_FIND_ACTIVE, (token,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'token': row['token'],
+            'user_id': row['user_id'],
+            'email': row['email'],
+            'expires_at': _dt(row['expires_at'])
+        }
+
+    def deactivate(self, token: str) -> None:
+        with self._storage.connection() as conn:
+            conn.execute(SQL_TOKEN_DEACTIVATE, (token,))
+
+    def touch_last_used(self, token: str, when: datetime) -> None:
+        with self._storage.connection() as conn:
+            conn.execute(SQL_TOKEN_TOUCH, (_ts(when), token))
+
+    def revoke(self, token: str, when: datetime) -> bool:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_TOKEN_REVOKE, (_ts(when), token)).rowcount > 0
+
+    def revoke_user(self, user_id: str, when: datetime) -> int:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_TOKEN_REVOKE_USER, (_ts(when), user_id)).rowcount
+
+    def publish_revocation(self, event: Dict) -> None:
+        with self._storage.connection() as conn:
+            conn.execute(SQL_REVOCATION_INSERT, (
+                event.get('token'), event.get('user_id'), _ts(event['created_at'])
+            ))
+
+    def revocations_since(self, since: datetime) -> Iterator[Dict]:
+        with self._storage.connection() as conn:
+            rows = conn.execute(SQL_REVOCATION_SINCE, (_ts(since),)).fetchall()
+        for row in rows:
+            yield {key: row[key] for key in ('token', 'user_id') if row[key] is not None}
+
+    def deactivate_expired(self, now: datetime, limit: int) -> int:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_TOKEN_EXPIRE, (_ts(now), _ts(now), limit)).rowcount
+
+    def purge_expired(self, now: datetime) -> int:
+        with self._storage.transaction() as conn:
+            conn.execute(SQL_REVOCATION_PURGE, (_ts(now - REVOCATION_RETENTION),))
+            return conn.execute(SQL_TOKEN_PURGE, (_ts(now - self.retention),)).rowcount
+
+
+class SQLiteSessionInfoStore(SessionInfoStore):
+    """Informações legíveis das sessões na tabela sessions_info."""
+
+    def __init__(self, storage: 'SQLiteStorage', retention: timedelta):
+        self._storage = storage
+        self.retention = retention
+
+    def insert(self, session_info: Dict) -> None:
+        with self._storage.connection() as conn:
+            conn.execute(SQL_SESSION_INSERT, (
+                str(ObjectId()),
+                session_info['session_id'],
+                session_info.get('email'),
+                session_info.get('user_id'),
+                _ts(session_info.get('created_at')),
+                _ts(session_info.get('updated_at')),
+                _ts(session_info.get('expires_at')),
+                int(session_info.get('is_active', True))
+            ))
+
+    def touch(self, session_id: str, when: datetime) -> bool:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_SESSION_TOUCH, (_ts(when), session_id)).rowcount > 0
+
+    def touch_many(self, pending: Dict[str, datetime]) -> None:
+        params = [
+            (_ts(timestamp), _ts(timestamp), session_id)
+            for session_id, timestamp in pending.items()
+        ]
+        with self._storage.transaction() as conn:
+            conn.executemany(SQL_SESSION_TOUCH_MAX, params)
+
+    def deactivate(self, session_id: str, when: datetime) -> bool:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_SESSION_DEACTIVATE, (_ts(when), session_id)).rowcount > 0
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self._storage.connection() as conn:
+            row = conn.execute(SQL_SESSION_GET, (session_id,)).fetchone()
+        return _session_row_to_dict(row) if row is not None else None
+
+    def list_active(self) -> List[Dict]:
+        with self._storage.connection() as conn:
+            return [_session_row_to_dict(row) for row in conn.execute(SQL_SESSION_ACTIVE)]
+
+    def deactivate_expired(self, now: datetime, limit: int) -> int:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_SESSION_EXPIRE, (_ts(now), _ts(now), limit)).rowcount
+
+    def purge_expired(self, now: datetime) -> int:
+        with self._storage.connection() as conn:
+            return conn.execute(SQL_SESSION_PURGE, (_ts(now - self.retention),)).rowcount
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Backend SQLite (WAL).
+
+    As conexões ficam em um pool pequeno (uma por thread em uso) e são
+    recriadas no processo filho após um fork. Com path ':memory:' o banco
+    vive só na memória do processo, em uma única conexão compartilhada
+    (útil para testes e benchmarks).
+
+    Args:
+        path: Caminho do arquivo do banco ou ':memory:'
+        busy_timeout: Segundos aguardando o lock de escrita de outro processo
+        cached_statements: Statements compilados mantidos por conexão
+        pool_size: Conexões mantidas abertas no pool
+        token_retention: Tempo após expirar até o token ser removido
+        session_retention: Tempo após expirar até a sessão ser removida
+        tombstone_retention: Tempo até a lápide de uma tarefa removida ser apagada
+        trace_callback: Chamado com cada statement executado (perfil de comandos)
+    """
+    name = 'sqlite'
+
+    def __init__(self, path: str, busy_timeout: float = 5.0, cached_statements: int = 128,
+                 pool_size: int = 8, token_retention: timedelta = timedelta(days=7),
+                 session_retention: timedelta = timedelta(days=7),
+                 tombstone_retention: timedelta = timedelta(days=30),
+                 trace_callback: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self.pool_size = pool_size
+        self.trace_callback = trace_callback
+        self.in_memory = path == ':memory:'
+        self._pid = os.getpid()
+        self._pool: queue.LifoQueue = queue.LifoQueue()
+        self._memory_connection: Optional[sqlite3.Connection] = None
+        self._memory_lock = threading.RLock()
+
+        self.tasks = SQLiteTaskStore(self, tombstone_retention)
+        self.users = SQLiteUserStore(self)
+        self.tokens = SQLiteTokenStore(self, token_retention)
+        self.sessions = SQLiteSessionInfoStore(self, session_retention)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre uma conexão já configurada (WAL, autocommit)."""
+        if not self.in_memory:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            isolation_level=None,  # autocommit; transações explícitas em transaction()
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row
+        if not self.in_memory:
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        if self.trace_callback is not None:
+            conn.set_trace_callback(self.trace_callback)
+        return conn
+
+    def _check_fork(self) -> None:
+        """Descarta as conexões herdadas do processo pai."""
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._pool = queue.LifoQueue()
+            self._memory_lock = threading.RLock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Empresta uma conexão do pool durante o bloco."""
+        self._check_fork()
+        if self.in_memory:
+            with self._memory_lock:
+                if self._memory_connection is None:
+                    self._memory_connection = self._connect()
+                yield self._memory_connection
+            return
+
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._pool.qsize() < self.pool_size:
+                self._pool.put(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Executa o bloco em uma transação de escrita (BEGIN IMMEDIATE)."""
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def ensure_schema(self, force: bool = False, dry_run: bool = False) -> Dict:
+        report = {
+            'version': SCHEMA_VERSION,
+            'skipped': False,
+            'created': [],
+            'dropped': [],
+            'unchanged': [],
+            'errors': []
+        }
+
+        with self.connection() as conn:
+            current_version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if not force and current_version == SCHEMA_VERSION:
+                report['skipped'] = True
+                return report
+
+            existing = {
+                row['name'] for row in
+                conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")
+            }
+            for label, sql in SCHEMA:
+                if sql.startswith('ALTER TABLE'):
+                    # Coluna nova em tabela existente (rótulo tabela.coluna)
+                    table, column = label.split('.')
+                    done = table in existing and any(
+                        row['name'] == column for row in conn.execute(f'PRAGMA table_info({table})')
+                    )
+                else:
+                    done = label.replace('.', '_') in existing
+                if done:
+                    report['unchanged'].append(label)
+                    continue
+                try:
+                    if not dry_run:
+                        conn.execute(sql)
+                    report['created'].append(label)
+                except sqlite3.Error as e:
+                    report['errors'].append(f'{label}: {e}')
+
+            if not dry_run and not report['errors']:
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+        return report
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._memory_lock:
+            if self._memory_connection is not None:
+                self._memory_connection.close()
+                self._memory_connection = None
+        logger.info('Conexoes SQLite fechadas', extra={'event': 'sqlite.closed', 'path': self.path})
@@ -0,0 +1,83 @@
+# /backend/gunicorn.conf.py
+"""
+Configuração do gunicorn para produção.
+
+    pip install -r requirements-prod.txt
+    TODO_SECRET_KEY=... gunicorn -c gunicorn.conf.py wsgi:app
+
+O app é carregado uma vez no processo mestre (preload) e os workers são
+criados por fork: índices e filtro de emails são preparados uma única vez,
+e os recursos por processo (cliente MongoDB, pool de hash, threads de
+gravação) são recriados em cada worker no primeiro uso.
+
+Sinais (kill -<SINAL> <pid do mestre>):
+    HUP   relê esta configuração e troca os workers sem derrubar conexões
+    TTIN  / TTOU  adiciona / remove um worker
+    USR2  inicia um novo mestre com o código novo (depois envie QUIT ao antigo)
+    TERM  encerramento gracioso
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+from config import Config
+from monitoring import metrics
+from monitoring.metrics import clear_shared_dir, retire_process
+
+bind = Config.SERVER_BIND
+workers = Config.SERVER_WORKERS or multiprocessing.cpu_count() * 2 + 1
+threads = Config.SERVER_THREADS
+worker_class = 'gthread'
+preload_app = True
+timeout = Config.SERVER_TIMEOUT
+graceful_timeout = Config.SERVER_GRACEFUL_TIMEOUT
+max_requests = Config.SERVER_MAX_REQUESTS
+max_requests_jitter = Config.SERVER_MAX_REQUESTS // 10
+keepalive = 5
+accesslog = '-'
+errorlog = '-'
+
+if Config.SECRET_KEY_EPHEMERAL and workers > 1:
+    raise SystemExit('[ERRO] Defina TODO_SECRET_KEY (ou TODO_SECRET_KEY_FILE): com varios '
+                     'workers a chave precisa ser a mesma em todos os processos')
+
+# As entradas do cache levam a versão da lista, então o 'memory' continua
+# correto com vários workers (cada um só guarda e recarrega a sua cópia)
+memory_cache_per_worker = (Config.TASK_CACHE_BACKEND == 'memory' and workers > 1
+                           and 'TASK_CACHE_BACKEND' not in Config.SETTINGS_OVERRIDDEN)
+
+# Métricas somadas entre os workers: cada um grava o seu snapshot neste
+# diretório (um por mestre, apagado no encerramento)
+auto_metrics_dir = os.path.join(tempfile.gettempdir(), f'todo_metrics_{os.getpid()}')
+if Config.METRICS_ENABLED and not Config.METRICS_MULTIPROC_DIR:
+    Config.METRICS_MULTIPROC_DIR = auto_metrics_dir
+
+
+def on_starting(server):
+    if Config.METRICS_MULTIPROC_DIR:
+        clear_shared_dir(Config.METRICS_MULTIPROC_DIR)
+
+
+def when_ready(server):
+    server.log.info('[OK] %s worker(s) x %s thread(s) em %s', workers, threads, bind)
+    if memory_cache_per_worker:
+        server.log.warning("TASK_CACHE_BACKEND = 'memory' (padrao) com %s workers: cada worker "
+                           "tem a sua copia do cache de tarefas. Use TODO_TASK_CACHE_BACKEND="
+                           "filesystem para compartilhar (ou =memory para silenciar este aviso)",
+                           workers)
+
+
+def worker_exit(server, worker):
+    # No worker: grava os últimos valores antes de sair
+    metrics.write_snapshot()
+
+
+def child_exit(server, worker):
+    # No mestre: contadores do worker encerrado continuam somando, gauges saem
+    if Config.METRICS_MULTIPROC_DIR:
+        retire_process(Config.METRICS_MULTIPROC_DIR, worker.pid)
+
+
+def on_exit(server):
+    if Config.METRICS_MULTIPROC_DIR == auto_metrics_dir:
+        shutil.rmtree(auto_metrics_dir, ignore_errors=True)
@@ -0,0 +1,33 @@
+"""
+Sessão Assinada (SESSION_MODE = 'signed')
+A identidade do usuário ({email, _id}) fica no próprio cookie, assinado com
+SECRET_KEY e com validade de PERMANENT_SESSION_LIFETIME. Abrir a sessão
+não consulta o banco: só a época do usuário é conferida, no cache do
+processo (services/session_epochs.py).
+
+Rotação de chaves: mova a chave atual para SECRET_KEY_FALLBACKS e defina
+uma nova SECRET_KEY. Os cookies assinados com as chaves anteriores
+continuam valendo e são reassinados com a nova chave na próxima resposta.
+"""
+import hashlib
+from flask.sessions import SecureCookieSessionInterface
+from services.session_epochs import session_epochs
+
+
+class SignedSessionInterface(SecureCookieSessionInterface):
+    """
+    Cookie de sessão do Flask (itsdangerous) com verificação de época.
+    Um cookie cuja época não é a atual do usuário abre como sessão vazia.
+    """
+    salt = 'todo-signed-session'
+    digest_method = staticmethod(hashlib.sha256)
+
+    def open_session(self, app, request):
+        session = super().open_session(app, request)
+        if session is None or 'user' not in session:
+            return session
+        if session.get('epoch') != session_epochs.get(session['user']['_id']):
+            # Sessão encerrada por um logout: o cookie é apagado na resposta
+            session = self.session_class()
+            session.modified = True
+        return session
@@ -1,17 +1,22 @@
 """
 Modelo de Tarefa
 """
-from typing import Optional, Dict, List
-from bson import ObjectId
-from database import db
+from typing import Optional, Dict, List, Iterator
+from database import storage
+from database.storage.base import task_doc_to_dict
 
 
 class Task:
     """
     Modelo para representar uma tarefa no sistema.
-    Responsável por operações relacionadas a tarefas no banco de dados.
+    Responsável por operações relacionadas a tarefas no banco de dados
+    (via backend de armazenamento, ver database/storage).
     """
     COLLECTION_NAME = 'todos'
+    # Coleção com a versão da lista de tarefas de cada usuário
+    VERSIONS_COLLECTION_NAME = 'todos_versions'
+    # Campos retornados nas listagens (evita trazer o documento inteiro)
+    LIST_PROJECTION = {'text': 1, 'done': 1}
 
     def __init__(self, text: str, done: bool = False, user_id: str = None, task_id: str = None):
         self.text = text
@@ -19,11 +24,6 @@ class Task:
         self.user_id = user_id
         self._id = task_id
 
-    @property
-    def collection(self):
-        """Retorna a coleção de tarefas."""
-        return db.get_collection(self.COLLECTION_NAME)
-
     @classmethod
     def find_by_id(cls, task_id: str, user_id: str) -> Optional['Task']:
         """
@@ -36,23 +36,47 @@ class Task:
         Returns:
             Instância de Task ou None se não encontrado
         """
-        try:
-            obj_id = ObjectId(task_id)
-        except Exception:
-            return None
-
-        collection = db.get_collection(cls.COLLECTION_NAME)
-        task_doc = collection.find_one({'_id': obj_id, 'user_id': user_id})
+        task_doc = storage.tasks.find(task_id, user_id)
         
         if task_doc:
             return cls(
                 text=task_doc['text'],
                 done=task_doc.get('done', False),
                 user_id=task_doc.get('user_id'),
-                task_id=str(task_doc['_id'])
+                task_id=task_doc['_id']
             )
         return None
 
+    @classmethod
+    def update_by_id(cls, task_id: str, user_id: str, fields: Dict) -> Optional[Dict]:
+        """
+        Atualiza uma tarefa do usuário em uma única ida ao banco.
+        Envia apenas os campos alterados e retorna o documento atualizado.
+        
+        Args:
+            task_id: ID da tarefa
+            user_id: ID do usuário
+            fields: Campos a atualizar (ex.: {'done': True})
+            
+        Returns:
+            Tarefa atualizada em formato de dicionário ou None se não encontrada
+        """
+        return storage.tasks.update(task_id, user_id, fields)
+
+    @classmethod
+    def delete_by_id(cls, task_id: str, user_id: str) -> bool:
+        """
+        Deleta uma tarefa do usuário em uma única ida ao banco.
+        
+        Args:
+            task_id: ID da tarefa
+            user_id: ID do usuário
+            
+        Returns:
+            True se deletado com sucesso, False caso contrário
+        """
+        return storage.tasks.delete(task_id, user_id)
+
     @classmethod
     def find_all_by_user(cls, user_id: str) -> List['Task']:
         """
@@ -64,39 +88,140 @@ class Task:
         Returns:
             Lista de instâncias de Task
         """
-        collection = db.get_collection(cls.COLLECTION_NAME)
-        cursor = collection.find({'user_id': user_id})
-        
-        tasks = []
-        for task_doc in cursor:
-            tasks.append(cls(
+        return [
+            cls(
                 text=task_doc['text'],
                 done=task_doc.get('done', False),
-                user_id=task_doc.get('user_id'),
-                task_id=str(task_doc['_id'])
-            ))
-        return tasks
+                user_id=user_id,
+                task_id=task_doc['_id']
+            )
+            for task_doc in storage.tasks.iter_by_user(user_id)
+        ]
+
+    @classmethod
+    def find_page_by_user(cls, user_id: str, limit: int = None, after_id: str = None) -> List[Dict]:
+        """
+        Busca tarefas de um usuário em ordem de _id (paginação por chave).
+        Retorna dicionários diretamente, apenas com os campos da listagem.
+        
+        Args:
+            user_id: ID do usuário
+            limit: Número máximo de tarefas (opcional)
+            after_id: Retorna apenas tarefas com _id maior que este (opcional)
+            
+        Returns:
+            Lista de tarefas em formato de dicionário
+        """
+        return storage.tasks.find_page(user_id, limit=limit, after_id=after_id)
+
+    @classmethod
+    def iter_by_user(cls, user_id: str, batch_size: int = 500) -> Iterator[Dict]:
+        """
+        Itera sobre as tarefas de um usuário sem carregá-las todas em memória.
+        As tarefas são lidas do banco em lotes de tamanho fixo.
+        
+        Args:
+            user_id: ID do usuário
+            batch_size: Número de tarefas por lote
+            
+        Yields:
+            Tarefas em formato de dicionário
+        """
+        return storage.tasks.iter_by_user(user_id, batch_size=batch_size)
+
+    @classmethod
+    def bulk_apply(cls, user_id: str, operations: List[Dict], ordered: bool = True) -> List[Dict]:
+        """
+        Executa várias operações de tarefas de uma só vez
+        (um bulk_write no MongoDB, uma transação no SQLite).
+        Todas as operações são restritas às tarefas do usuário.
+        
+        Args:
+            user_id: ID do usuário
+            operations: Lista de operações já validadas, no formato
+                {'op': 'create', 'text': str, 'done': bool},
+                {'op': 'update', '_id': str, 'fields': dict} ou
+                {'op': 'delete', '_id': str}
+            ordered: Se True, para na primeira falha (as demais são ignoradas)
+            
+        Returns:
+            Lista de resultados, um por operação, na mesma ordem
+        """
+        return storage.tasks.bulk_apply(user_id, operations, ordered=ordered)
+
+    @classmethod
+    def get_list_version(cls, user_id: str) -> int:
+        """
+        Retorna a versão atual da lista de tarefas de um usuário.
+        A versão muda a cada alteração nas tarefas do usuário.
+        
+        Args:
+            user_id: ID do usuário
+            
+        Returns:
+            Número da versão (0 se a lista nunca foi alterada)
+        """
+        return storage.tasks.get_list_version(user_id)
+
+    @classmethod
+    def bump_list_version(cls, user_id: str) -> None:
+        """
+        Incrementa a versão da lista de tarefas de um usuário.
+        As escritas de tarefas já fazem isso; útil após alterações externas.
+        
+        Args:
+            user_id: ID do usuário
+        """
+        storage.tasks.bump_list_version(user_id)
+
+    @classmethod
+    def get_sync_seq(cls, user_id: str) -> int:
+        """
+        Retorna a sequência até a qual todas as alterações do usuário já
+        podem ser lidas (base do cursor de GET /todos/changes).
+        
+        Args:
+            user_id: ID do usuário
+            
+        Returns:
+            Sequência (escritas em andamento ficam depois dela)
+        """
+        return storage.tasks.get_sync_seq(user_id)
+
+    @classmethod
+    def changes_since(cls, user_id: str, since: int, limit: int) -> List[Dict]:
+        """
+        Busca as tarefas alteradas e removidas depois de uma sequência.
+        O custo depende do número de alterações, não do tamanho da lista.
+        
+        Args:
+            user_id: ID do usuário
+            since: Sequência já sincronizada
+            limit: Número máximo de itens
+            
+        Returns:
+            Itens em ordem de sequência: {'seq', 'task'} ou {'seq', 'deleted'}
+        """
+        return storage.tasks.changes_since(user_id, since, limit)
+
+    @staticmethod
+    def doc_to_dict(task_doc: Dict) -> Dict:
+        """Converte um documento de tarefa para o formato de resposta."""
+        return task_doc_to_dict(task_doc)
 
     def save(self) -> str:
         """
-        Salva a tarefa no banco de dados.
+        Salva a tarefa no banco de dados (com a próxima sequência do usuário).
         
         Returns:
             ID da tarefa criada
         """
-        task_data = {
-            'text': self.text,
-            'done': self.done,
-            'user_id': self.user_id
-        }
-        
-        result = self.collection.insert_one(task_data)
-        self._id = str(result.inserted_id)
+        self._id = storage.tasks.insert(self.user_id, self.text, self.done)
         return self._id
 
     def update(self, text: str = None, done: bool = None) -> bool:
         """
-        Atualiza a tarefa no banco de dados.
+        Atualiza a tarefa no banco de dados (com a próxima sequência do usuário).
         
         Args:
             text: Novo texto da tarefa (opcional)
@@ -108,11 +233,6 @@ class Task:
         if not self._id:
             return False
 
-        try:
-            obj_id = ObjectId(self._id)
-        except Exception:
-            return False
-
         update_data = {}
         if text is not None:
             self.text = text
@@ -124,9 +244,7 @@ class Task:
         if not update_data:
             return False
 
-        query_filter = {'_id': obj_id, 'user_id': self.user_id}
-        result = self.collection.update_one(query_filter, {'$set': update_data})
-        return result.matched_count > 0
+        return storage.tasks.update(self._id, self.user_id, update_data) is not None
 
     def delete(self) -> bool:
         """
@@ -138,14 +256,7 @@ class Task:
         if not self._id:
             return False
 
-        try:
-            obj_id = ObjectId(self._id)
-        except Exception:
-            return False
-
-        query_filter = {'_id': obj_id, 'user_id': self.user_id}
-        result = self.collection.delete_one(query_filter)
-        return result.deleted_count > 0
+        return storage.tasks.delete(self._id, self.user_id)
 
     def to_dict(self) -> Dict:
         """Converte a tarefa para dicionário."""
@@ -2,14 +2,14 @@
 Modelo de Usuário
 """
 from typing import Optional, Dict
-from bson import ObjectId
-from database import db
+from database import storage
 
 
 class User:
     """
     Modelo para representar um usuário no sistema.
-    Responsável por operações relacionadas a usuários no banco de dados.
+    Responsável por operações relacionadas a usuários no banco de dados
+    (via backend de armazenamento, ver database/storage).
     """
     COLLECTION_NAME = 'users'
 
@@ -18,10 +18,16 @@ class User:
         self.password_hash = password_hash
         self._id = user_id
 
-    @property
-    def collection(self):
-        """Retorna a coleção de usuários."""
-        return db.get_collection(self.COLLECTION_NAME)
+    @classmethod
+    def _from_doc(cls, user_doc: Optional[Dict]) -> Optional['User']:
+        """Cria a instância a partir do dicionário retornado pelo backend."""
+        if user_doc:
+            return cls(
+                email=user_doc['email'],
+                password_hash=user_doc.get('password'),
+                user_id=user_doc['_id']
+            )
+        return None
 
     @classmethod
     def find_by_email(cls, email: str) -> Optional['User']:
@@ -34,16 +40,7 @@ class User:
         Returns:
             Instância de User ou None se não encontrado
         """
-        collection = db.get_collection(cls.COLLECTION_NAME)
-        user_doc = collection.find_one({'email': email})
-        
-        if user_doc:
-            return cls(
-                email=user_doc['email'],
-                password_hash=user_doc.get('password'),
-                user_id=str(user_doc['_id'])
-            )
-        return None
+        return cls._from_doc(storage.users.find_by_email(email))
 
     @classmethod
     def find_by_id(cls, user_id: str) -> Optional['User']:
@@ -56,44 +53,40 @@ class User:
         Returns:
             Instância de User ou None se não encontrado
         """
-        try:
-            obj_id = ObjectId(user_id)
-        except Exception:
-            return None
-
-        collection = db.get_collection(cls.COLLECTION_NAME)
-        user_doc = collection.find_one({'_id': obj_id})
-        
-        if user_doc:
-            return cls(
-                email=user_doc['email'],
-                password_hash=user_doc.get('password'),
-                user_id=str(user_doc['_id'])
-            )
-        return None
+        return cls._from_doc(storage.users.find_by_id(user_id))
 
     def exists(self) -> bool:
         """Verifica se o usuário já existe no banco de dados."""
-        return self.collection.find_one({'email': self.email}) is not None
+        return storage.users.find_by_email(self.email) is not None
 
     def save(self) -> Optional[str]:
         """
         Salva o usuário no banco de dados.
+        Um único insert: a duplicidade é detectada pelo índice único de email.
         
         Returns:
             ID do usuário criado ou None se já existir
         """
-        if self.exists():
+        user_id = storage.users.insert(self.email, self.password_hash)
+        if user_id is None:
             return None
+        self._id = user_id
+        return self._id
 
-        user_data = {
-            'email': self.email,
-            'password': self.password_hash
-        }
+    def update_password_hash(self, password_hash: str) -> bool:
+        """
+        Atualiza o hash da senha do usuário (ex.: após aumentar o custo).
         
-        result = self.collection.insert_one(user_data)
-        self._id = str(result.inserted_id)
-        return self._id
+        Args:
+            password_hash: Novo hash da senha
+            
+        Returns:
+            True se atualizado com sucesso, False caso contrário
+        """
+        if not self._id or not storage.users.update_password(self._id, password_hash):
+            return False
+        self.password_hash = password_hash
+        return True
 
     def to_dict(self) -> Dict:
         """Converte o usuário para dicionário (sem senha)."""
@@ -0,0 +1,12 @@
+"""
+Instrumentação da aplicação (métricas, perfil de comandos por requisição
+e logs estruturados).
+Não importa modelos nem serviços: pode ser usado pela camada de banco.
+"""
+from .log import bind_request_id, configure_logging, reset_request_id
+from .metrics import metrics, mongo_event_listeners, observe_request
+from .profiler import profile_commands, report_profile, roundtrip_budget, start_profile, stop_profile
+
+__all__ = ['bind_request_id', 'configure_logging', 'reset_request_id', 'metrics',
+           'mongo_event_listeners', 'observe_request', 'profile_commands', 'report_profile',
+           'roundtrip_budget', 'start_profile', 'stop_profile']
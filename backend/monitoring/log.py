@@ -0,0 +1,249 @@
+"""
+Logs estruturados sem I/O na requisição.
+Os registros vão para uma fila em memória (QueueHandler) e uma thread em
+segundo plano (QueueListener) os formata e escreve na saída padrão, em
+JSON (um objeto por linha) ou em texto no estilo "[OK] mensagem".
+
+Cada registro leva o ID da requisição em que foi criado (X-Request-ID).
+Eventos frequentes podem ser amostrados (LOG_SAMPLE_RATES) e cada logger
+pode ter o seu nível (LOG_LEVELS). Com a fila cheia, o registro é
+descartado e contado em todo_log_records_dropped_total: quem loga nunca
+espera pela escrita.
+
+Uso:
+    logger = logging.getLogger(__name__)
+    logger.info('Usuario autenticado', extra={'event': 'auth.login', 'email': email})
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from .metrics import metrics
+
+# ID da requisição atual (None fora de uma requisição)
+_request_id: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+
+# Atributos padrão do LogRecord (o restante vem de extra= e vira campo do JSON)
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'request_id', 'event'
+}
+
+# Rótulos do formato texto (os mesmos dos prints da aplicação)
+TEXT_LABELS = {
+    'DEBUG': 'DEBUG',
+    'INFO': 'OK',
+    'WARNING': 'AVISO',
+    'ERROR': 'ERRO',
+    'CRITICAL': 'ERRO',
+}
+
+
+def bind_request_id(value: Optional[str] = None):
+    """
+    Associa um ID de requisição ao contexto atual.
+
+    Args:
+        value: ID recebido do cliente (X-Request-ID); gerado se vazio ou inválido
+
+    Returns:
+        (ID, token) - o token deve ser passado a reset_request_id
+    """
+    if not value or len(value) > 64 or not value.isprintable():
+        value = uuid.uuid4().hex
+    return value, _request_id.set(value)
+
+
+def reset_request_id(token) -> None:
+    """Desfaz o bind_request_id."""
+    _request_id.reset(token)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class ContextFilter(logging.Filter):
+    """
+    Preenche request_id e aplica a amostragem por evento.
+    Roda na thread de quem loga (antes de o registro entrar na fila).
+    """
+
+    def __init__(self, sample_rates: Dict[str, float] = None):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        event = getattr(record, 'event', None)
+        if event is not None and record.levelno < logging.ERROR:
+            rate = self.sample_rates.get(event)
+            if rate is not None and random.random() >= rate:
+                return False
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que descarta (e conta) em vez de bloquear com a fila cheia.
+    A mensagem é montada aqui; a formatação final fica com o listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        prepared = logging.makeLogRecord(record.__dict__)
+        prepared.message = record.getMessage()
+        prepared.msg = prepared.message
+        prepared.args = None
+        if record.exc_info:
+            # O traceback não pode atravessar a fila; vira texto aqui
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+        prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc('todo_log_records_dropped_total', (('logger', record.name),))
+
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha: horário, nível, logger, mensagem e campos extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.message if hasattr(record, 'message') else record.getMessage(),
+            'pid': record.process,
+        }
+        event = getattr(record, 'event', None)
+        if event is not None:
+            entry['event'] = event
+        request_id = getattr(record, 'request_id', None)
+        if request_id is not None:
+            entry['request_id'] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legível para desenvolvimento: "[OK] mensagem (request_id)"."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.message if hasattr(record, 'message') else record.getMessage()
+        line = f"[{TEXT_LABELS.get(record.levelname, record.levelname)}] {message}"
+        request_id = getattr(record, 'request_id', None)
+        if request_id is not None:
+            line += f" (req {request_id[:8]})"
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Escreve no sys.stdout atual (respeita redirecionamentos feitos depois)."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """Ao parar, espera espaço na fila para o aviso de fim (em vez de falhar)."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel, timeout=5)
+
+
+class LogPipeline:
+    """
+    Fila + listener instalados no logger raiz.
+    Após um fork, o filho recria a fila e a thread (a do pai não existe nele).
+    """
+
+    def __init__(self):
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self.listener: Optional[_QueueListener] = None
+        self._output: Optional[logging.Handler] = None
+        self._queue_size = 10000
+        self._lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def configure(self, config) -> None:
+        """
+        Instala (ou reconfigura) o pipeline a partir do Config.
+
+        Args:
+            config: Objeto ou dicionário de configuração com as chaves LOG_*
+        """
+        get = config.get if isinstance(config, dict) else lambda key: getattr(config, key)
+        with self._lock:
+            self.stop()
+            self._queue_size = get('LOG_QUEUE_SIZE')
+            self._output = _StdoutHandler()
+            self._output.setFormatter(JsonFormatter() if get('LOG_FORMAT') == 'json'
+                                      else TextFormatter())
+
+            self.handler = NonBlockingQueueHandler(queue.Queue(self._queue_size))
+            self.handler.addFilter(ContextFilter(get('LOG_SAMPLE_RATES')))
+
+            root = logging.getLogger()
+            for handler in [h for h in root.handlers if isinstance(h, NonBlockingQueueHandler)]:
+                root.removeHandler(handler)
+            root.addHandler(self.handler)
+            root.setLevel(get('LOG_LEVEL'))
+            for name, level in get('LOG_LEVELS').items():
+                logging.getLogger(name).setLevel(level)
+
+            self._start()
+
+    def _start(self) -> None:
+        self.listener = _QueueListener(self.handler.queue, self._output,
+                                       respect_handler_level=True)
+        self.listener.start()
+
+    def _after_fork(self) -> None:
+        if self.handler is None:
+            return
+        self._lock = threading.Lock()
+        self.handler.queue = queue.Queue(self._queue_size)
+        self._start()
+
+    def stop(self) -> None:
+        """Para o listener depois de escrever o que estiver na fila."""
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            try:
+                listener.stop()
+            except queue.Full:
+                # Thread de escrita parada: os registros pendentes se perdem
+                pass
+
+
+# Pipeline único do processo
+log_pipeline = LogPipeline()
+atexit.register(log_pipeline.stop)
+
+
+def configure_logging(config) -> None:
+    """Instala os logs estruturados (chamado pelas factories dos apps)."""
+    log_pipeline.configure(config)
@@ -0,0 +1,527 @@
+"""
+Métricas da aplicação no formato de texto do Prometheus.
+Requisições HTTP por blueprint/rota, comandos do MongoDB por coleção
+(CommandListener) e o estado do pool de conexões (ConnectionPoolListener).
+
+O registro é "lock-light": cada thread grava no seu próprio shard, sem
+locks. O lock só é usado ao criar/aposentar um shard e ao gerar a
+exposição (GET /todos/metrics), que soma os shards.
+
+Com vários processos (workers do gunicorn), cada um grava periodicamente
+o seu snapshot em METRICS_MULTIPROC_DIR e a exposição soma os arquivos de
+todos, então qualquer worker responde pelo servidor inteiro. Quando um
+processo termina, os seus contadores e histogramas passam para o arquivo
+dos aposentados e os gauges são descartados.
+"""
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from pymongo import monitoring
+
+# Limites (segundos) dos buckets dos histogramas de latência
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Tipo e descrição de cada métrica
+METRICS = {
+    'todo_http_requests_total': ('counter', 'Requisições HTTP atendidas.'),
+    'todo_http_request_duration_seconds': ('histogram', 'Duração das requisições HTTP.'),
+    'todo_mongo_commands_total': ('counter', 'Comandos enviados ao MongoDB.'),
+    'todo_mongo_command_duration_seconds': ('histogram', 'Duração dos comandos do MongoDB.'),
+    'todo_mongo_pool_connections': ('gauge', 'Conexões do pool do MongoDB (open/in_use).'),
+    'todo_mongo_pool_waiters': ('gauge', 'Threads aguardando uma conexão do pool.'),
+    'todo_mongo_pool_checkout_failures_total': ('counter', 'Falhas ao obter conexão do pool.'),
+    'todo_mongo_pool_cleared_total': ('counter', 'Vezes em que o pool foi limpo.'),
+    'todo_log_records_dropped_total': ('counter', 'Registros de log descartados (fila cheia).'),
+    'todo_db_profiled_requests_total': ('counter', 'Requisições perfiladas (DB_PROFILER_ENABLED).'),
+    'todo_db_roundtrips_total': ('counter', 'Comandos do MongoDB das requisições perfiladas.'),
+    'todo_db_roundtrip_budget_exceeded_total': ('counter',
+                                                'Requisições acima do orçamento de comandos.'),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Arquivos do diretório compartilhado: <pid>.json por processo vivo
+RETIRED_FILE = 'retired.json'
+LOCK_FILE = '.lock'
+
+logger = logging.getLogger(__name__)
+
+
+class _Shard:
+    """Valores gravados por uma única thread."""
+    __slots__ = ('counters', 'gauges', 'histograms')
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        # [contagem por bucket..., contagem acima do último, soma]
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+
+class _ShardOwner:
+    """Fica no threading.local; quando a thread termina, aposenta o shard."""
+    __slots__ = ('registry', 'shard')
+
+    def __init__(self, registry: 'MetricsRegistry', shard: _Shard):
+        self.registry = registry
+        self.shard = shard
+
+    def __del__(self):
+        try:
+            self.registry._retire(self.shard)
+        except Exception:
+            pass  # encerramento do interpretador
+
+
+def _merge_into(target: _Shard, source: _Shard) -> None:
+    for key, value in source.counters.copy().items():
+        target.counters[key] = target.counters.get(key, 0) + value
+    for key, value in source.gauges.copy().items():
+        target.gauges[key] = target.gauges.get(key, 0) + value
+    for key, values in source.histograms.copy().items():
+        values = list(values)
+        current = target.histograms.get(key)
+        if current is None:
+            target.histograms[key] = values
+        else:
+            for index, value in enumerate(values):
+                current[index] += value
+
+
+def _dump(shard: _Shard, extra: Iterable) -> Dict:
+    """Snapshot serializável em JSON (labels viram listas de pares)."""
+    return {
+        'counters': [[name, labels, value] for (name, labels), value in shard.counters.items()],
+        'gauges': [[name, labels, value] for (name, labels), value in shard.gauges.items()],
+        'histograms': [[name, labels, values] for (name, labels), values in shard.histograms.items()],
+        'extra': [list(sample) for sample in extra],
+    }
+
+
+def _labels(raw: List) -> Labels:
+    return tuple((key, value) for key, value in raw)
+
+
+def _load(data: Dict) -> Tuple[_Shard, List]:
+    """Inverso de _dump: (shard, amostras extras)."""
+    shard = _Shard()
+    shard.counters = {(name, _labels(labels)): value for name, labels, value in data['counters']}
+    shard.gauges = {(name, _labels(labels)): value for name, labels, value in data['gauges']}
+    shard.histograms = {(name, _labels(labels)): values
+                        for name, labels, values in data['histograms']}
+    extra = [(name, kind, help_text, _labels(labels), value)
+             for name, kind, help_text, labels, value in data['extra']]
+    return shard, extra
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Dict) -> None:
+    """Grava de forma atômica (quem lê nunca vê um arquivo pela metade)."""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _sum_extra(extra: Iterable) -> List:
+    """Soma as amostras extras de mesmo nome e labels (vindas de vários processos)."""
+    totals: Dict[Tuple[str, Labels], list] = {}
+    for name, kind, help_text, labels, value in extra:
+        entry = totals.get((name, labels))
+        if entry is None:
+            totals[(name, labels)] = [name, kind, help_text, labels, value]
+        else:
+            entry[4] += value
+    return [tuple(entry) for entry in totals.values()]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def retire_process(directory: str, pid: int) -> None:
+    """
+    Move o snapshot de um processo encerrado para o arquivo dos aposentados:
+    contadores e histogramas continuam somando, gauges são descartados.
+    Chamado pelo gunicorn (child_exit) e, para processos que sumiram sem
+    aviso, pela própria exposição.
+
+    Args:
+        directory: Diretório compartilhado (METRICS_MULTIPROC_DIR)
+        pid: PID do processo encerrado
+    """
+    path = os.path.join(directory, f'{pid}.json')
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        data = _read_json(path)
+        if data is None:
+            return
+        shard, extra = _load(data)
+        retired = _read_json(os.path.join(directory, RETIRED_FILE))
+        total, total_extra = _load(retired) if retired else (_Shard(), [])
+        shard.gauges = {}
+        _merge_into(total, shard)
+        total_extra = _sum_extra(total_extra + [sample for sample in extra if sample[1] != 'gauge'])
+        _write_json(os.path.join(directory, RETIRED_FILE), _dump(total, total_extra))
+        os.remove(path)
+
+
+def clear_shared_dir(directory: str) -> None:
+    """Apaga os snapshots de uma execução anterior (início do servidor)."""
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith('.json') or name.endswith('.tmp'):
+            os.remove(os.path.join(directory, name))
+
+
+class MetricsRegistry:
+    """
+    Contadores, gauges (somados a partir de deltas) e histogramas.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.shared_dir: Optional[str] = None
+        self.flush_interval = 5.0
+        self._extra: Optional[Callable[[], Iterable]] = None
+        self._writer_pid: Optional[int] = None
+        self._reset_values()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _reset_values(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live: set = set()
+        self._retired = _Shard()
+
+    def _after_fork(self) -> None:
+        """
+        O filho começa zerado (só a thread do fork existe; o lock é recriado):
+        os valores do pai continuam sendo dele e não se repetem em cada worker.
+        """
+        self._reset_values()
+
+    def share(self, directory: str, flush_interval: float = 5,
+              extra: Callable[[], Iterable] = None) -> None:
+        """
+        Soma as métricas dos processos que gravam em directory.
+
+        Args:
+            directory: Diretório compartilhado pelos processos do servidor
+            flush_interval: Segundos entre as gravações do snapshot de cada processo
+            extra: Função que devolve as amostras calculadas na hora (como em
+                render), gravadas junto com o snapshot
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.shared_dir = directory
+        self.flush_interval = flush_interval
+        self._extra = extra
+
+    def ensure_writer(self) -> None:
+        """Inicia a thread que grava o snapshot deste processo (seguro após fork)."""
+        pid = os.getpid()
+        if self.shared_dir is None or self._writer_pid == pid:
+            return
+        with self._lock:
+            if self._writer_pid == pid:
+                return
+            self._writer_pid = pid
+            threading.Thread(target=self._write_loop, name='metrics-writer', daemon=True).start()
+
+    def _write_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.write_snapshot()
+            except Exception:
+                logger.warning('Falha ao gravar o snapshot das metricas', exc_info=True,
+                               extra={'event': 'metrics.write_failed'})
+
+    def write_snapshot(self) -> None:
+        """Grava o snapshot deste processo no diretório compartilhado."""
+        if self.shared_dir is None:
+            return
+        extra = self._extra() if self._extra is not None else ()
+        # Recriado se alguém limpou o /tmp com o servidor no ar
+        os.makedirs(self.shared_dir, exist_ok=True)
+        _write_json(os.path.join(self.shared_dir, f'{os.getpid()}.json'),
+                    _dump(self.snapshot(), extra))
+
+    def _shared_snapshots(self) -> Iterator[Tuple[_Shard, List]]:
+        """Snapshots dos outros processos vivos e dos aposentados."""
+        own = f'{os.getpid()}.json'
+        try:
+            names = sorted(os.listdir(self.shared_dir))
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith('.json') or name in (own, RETIRED_FILE):
+                continue
+            pid = int(name[:-len('.json')])
+            if not _pid_alive(pid):
+                # Encerrado sem child_exit (ex.: servidor sem o gunicorn.conf.py)
+                retire_process(self.shared_dir, pid)
+                continue
+            data = _read_json(os.path.join(self.shared_dir, name))
+            if data is not None:
+                yield _load(data)
+        # Lido por último: inclui os processos aposentados acima
+        retired = _read_json(os.path.join(self.shared_dir, RETIRED_FILE))
+        if retired is not None:
+            yield _load(retired)
+
+    def _shard(self) -> _Shard:
+        owner = getattr(self._local, 'owner', None)
+        if owner is not None:
+            return owner.shard
+        shard = _Shard()
+        with self._lock:
+            self._live.add(shard)
+        self._local.owner = _ShardOwner(self, shard)
+        return shard
+
+    def _retire(self, shard: _Shard) -> None:
+        with self._lock:
+            if shard in self._live:
+                self._live.discard(shard)
+                _merge_into(self._retired, shard)
+
+    def inc(self, name: str, labels: Labels, value: float = 1) -> None:
+        """Incrementa um contador."""
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def add(self, name: str, labels: Labels, delta: float) -> None:
+        """Soma um delta a um gauge."""
+        gauges = self._shard().gauges
+        key = (name, labels)
+        gauges[key] = gauges.get(key, 0) + delta
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        """Registra um valor (em segundos) em um histograma."""
+        histograms = self._shard().histograms
+        key = (name, labels)
+        entry = histograms.get(key)
+        if entry is None:
+            entry = histograms[key] = [0] * (len(self.buckets) + 2)
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def snapshot(self) -> _Shard:
+        """Soma de todos os shards (vivos e aposentados)."""
+        total = _Shard()
+        with self._lock:
+            _merge_into(total, self._retired)
+            for shard in list(self._live):
+                _merge_into(total, shard)
+        return total
+
+    def render(self, extra: Iterable[Tuple[str, str, str, Labels, float]] = ()) -> str:
+        """
+        Gera a exposição em texto (Prometheus 0.0.4).
+
+        Com o diretório compartilhado (share), soma os snapshots dos outros
+        processos aos valores atuais deste.
+
+        Args:
+            extra: Amostras adicionais (nome, tipo, descrição, labels, valor),
+                ex.: estatísticas de caches calculadas na hora
+        """
+        snapshot = self.snapshot()
+        if self.shared_dir is not None:
+            extra = list(extra)
+            for shard, shard_extra in self._shared_snapshots():
+                _merge_into(snapshot, shard)
+                extra.extend(shard_extra)
+            extra = _sum_extra(extra)
+
+        samples: Dict[str, List[str]] = {}
+        kinds = {name: kind for name, (kind, _) in METRICS.items()}
+        helps = {name: text for name, (_, text) in METRICS.items()}
+
+        for (name, labels), value in sorted(snapshot.counters.items()):
+            samples.setdefault(name, []).append(_sample(name, labels, value))
+        for (name, labels), value in sorted(snapshot.gauges.items()):
+            samples.setdefault(name, []).append(_sample(name, labels, value))
+        for (name, labels), values in sorted(snapshot.histograms.items()):
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(_sample(f'{name}_bucket', labels + (('le', _number(bound)),), cumulative))
+            cumulative += values[len(self.buckets)]
+            lines.append(_sample(f'{name}_bucket', labels + (('le', '+Inf'),), cumulative))
+            lines.append(_sample(f'{name}_sum', labels, values[-1]))
+            lines.append(_sample(f'{name}_count', labels, cumulative))
+
+        for name, kind, help_text, labels, value in extra:
+            kinds.setdefault(name, kind)
+            helps.setdefault(name, help_text)
+            samples.setdefault(name, []).append(_sample(name, labels, value))
+
+        output = []
+        for name in sorted(samples):
+            output.append(f'# HELP {name} {helps.get(name, "")}')
+            output.append(f'# TYPE {name} {kinds.get(name, "untyped")}')
+            output.extend(samples[name])
+        return '\n'.join(output) + '\n'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _sample(name: str, labels: Labels, value: float) -> str:
+    if labels:
+        rendered = ','.join(f'{key}="{_escape(label)}"' for key, label in labels)
+        return f'{name}{{{rendered}}} {_number(value)}'
+    return f'{name} {_number(value)}'
+
+
+def _command_collection(event) -> str:
+    """Coleção alvo de um comando (vazio para comandos administrativos)."""
+    if event.command_name == 'getMore':
+        return event.command.get('collection', '')
+    target = event.command.get(event.command_name)
+    return target if isinstance(target, str) else ''
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Conta e cronometra os comandos do MongoDB por coleção e comando.
+    O started e o succeeded/failed de um comando chegam na mesma thread,
+    então a coleção fica guardada num dicionário por thread.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._pending = threading.local()
+
+    def _pending_map(self) -> Dict[int, str]:
+        pending = getattr(self._pending, 'map', None)
+        if pending is None:
+            pending = self._pending.map = {}
+        return pending
+
+    def started(self, event) -> None:
+        self._pending_map()[event.request_id] = _command_collection(event)
+
+    def _finish(self, event, outcome: str) -> None:
+        collection = self._pending_map().pop(event.request_id, '')
+        labels = (('collection', collection), ('command', event.command_name))
+        self.registry.inc('todo_mongo_commands_total', labels + (('outcome', outcome),))
+        self.registry.observe('todo_mongo_command_duration_seconds', labels,
+                              event.duration_micros / 1_000_000)
+
+    def succeeded(self, event) -> None:
+        self._finish(event, 'success')
+
+    def failed(self, event) -> None:
+        self._finish(event, 'failure')
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Gauges do pool de conexões por servidor (a partir dos eventos do pool)."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f'{host}:{port}'
+
+    def _connections(self, event, state: str, delta: int) -> None:
+        self.registry.add('todo_mongo_pool_connections',
+                          (('address', self._address(event)), ('state', state)), delta)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        self.registry.inc('todo_mongo_pool_cleared_total', (('address', self._address(event)),))
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        self._connections(event, 'open', 1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._connections(event, 'open', -1)
+
+    def connection_check_out_started(self, event) -> None:
+        self.registry.add('todo_mongo_pool_waiters', (('address', self._address(event)),), 1)
+
+    def connection_check_out_failed(self, event) -> None:
+        address = (('address', self._address(event)),)
+        self.registry.add('todo_mongo_pool_waiters', address, -1)
+        self.registry.inc('todo_mongo_pool_checkout_failures_total',
+                          address + (('reason', str(event.reason)),))
+
+    def connection_checked_out(self, event) -> None:
+        self.registry.add('todo_mongo_pool_waiters', (('address', self._address(event)),), -1)
+        self._connections(event, 'in_use', 1)
+
+    def connection_checked_in(self, event) -> None:
+        self._connections(event, 'in_use', -1)
+
+
+# Registro único da aplicação
+metrics = MetricsRegistry()
+
+
+def mongo_event_listeners(enabled: bool = True, profiler: bool = False) -> List:
+    """
+    Listeners a passar para o MongoClient (event_listeners=...).
+
+    Args:
+        enabled: Inclui os listeners de métricas
+        profiler: Inclui o perfil de comandos por requisição (monitoring.profiler)
+    """
+    listeners = [MongoCommandMetrics(metrics), MongoPoolMetrics(metrics)] if enabled else []
+    if profiler:
+        from .profiler import MongoCommandProfiler
+        listeners.append(MongoCommandProfiler())
+    return listeners
+
+
+def observe_request(blueprint: Optional[str], route: str, method: str,
+                    status: int, seconds: float) -> None:
+    """Registra uma requisição HTTP atendida."""
+    labels = (('blueprint', blueprint or ''), ('route', route), ('method', method))
+    metrics.inc('todo_http_requests_total', labels + (('status', str(status)),))
+    metrics.observe('todo_http_request_duration_seconds', labels, seconds)
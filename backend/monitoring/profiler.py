@@ -0,0 +1,203 @@
+"""
+Perfil de comandos do banco por requisição.
+Conta e cronometra cada comando enviado enquanto um perfil está ativo,
+agrupando pelo método de modelo/serviço que originou a consulta
+(ex.: models.user.User.find_by_email).
+
+No MongoDB, os comandos vêm de um CommandListener do cliente; no SQLite,
+do trace callback de cada conexão (trace_sqlite_statement): cada
+statement conta como uma ida ao banco, sem tempo medido (o SQLite roda no
+próprio processo).
+
+O perfil ativo fica num ContextVar, então funciona tanto nas threads do
+app síncrono quanto nas tasks do modo assíncrono. Perfis podem ser
+aninhados (ex.: o helper de testes dentro de uma requisição perfilada):
+cada comando é registrado em todos os perfis ativos.
+"""
+import logging
+import re
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+from pymongo import monitoring
+from config import Config
+from .metrics import _command_collection, metrics
+
+# Módulos cujos métodos identificam quem fez a consulta (o mais interno vence)
+CALLER_MODULES = ('models.', 'services.', 'aio.services')
+# Usados quando nenhum modelo/serviço aparece na pilha (ex.: sessões do Flask-Session)
+FALLBACK_MODULES = ('database.', 'aio.', 'routes.', 'middleware.', 'flask_session.')
+
+# Statements do SQLite que não são consultas (controle de transação e PRAGMA)
+SQLITE_IGNORED_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'PRAGMA')
+# Tabela de um statement do SQLite (a primeira após FROM/INTO/UPDATE)
+SQLITE_TABLE_PATTERN = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+(\w+)', re.IGNORECASE)
+
+logger = logging.getLogger(__name__)
+
+_active: ContextVar[Tuple['RequestProfile', ...]] = ContextVar('mongo_profiles', default=())
+
+
+class RequestProfile:
+    """Comandos registrados enquanto o perfil esteve ativo."""
+
+    def __init__(self):
+        # (comando, coleção, chamador, segundos)
+        self.commands: List[Tuple[str, str, str, float]] = []
+        self._pending: Dict[int, Tuple[str, str, str]] = {}
+
+    @property
+    def count(self) -> int:
+        """Número de idas ao banco (inclui as pendentes)."""
+        return len(self.commands) + len(self._pending)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(command[3] for command in self.commands)
+
+    def by_caller(self) -> Dict[str, Tuple[int, float]]:
+        """
+        Agrupa os comandos pelo método chamador.
+
+        Returns:
+            Dicionário chamador -> (quantidade, segundos), do maior para o menor
+        """
+        grouped: Dict[str, List[float]] = {}
+        for _, _, caller, seconds in self.commands:
+            entry = grouped.setdefault(caller, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+        ordered = sorted(grouped.items(), key=lambda item: (-item[1][0], -item[1][1]))
+        return {caller: (count, seconds) for caller, (count, seconds) in ordered}
+
+    def summary(self) -> str:
+        """Resumo em texto: total e uma linha por chamador com seus comandos."""
+        lines = [f'{self.count} comando(s) em {self.total_seconds * 1000:.1f}ms']
+        for caller, (count, seconds) in self.by_caller().items():
+            commands = sorted({f'{name} {collection}'.strip()
+                               for name, collection, owner, _ in self.commands if owner == caller})
+            lines.append(f'  {count}x {caller} ({seconds * 1000:.1f}ms): {", ".join(commands)}')
+        return '\n'.join(lines)
+
+
+def _qualname(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _caller() -> str:
+    """Método de modelo/serviço mais interno na pilha de quem enviou o comando."""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith(CALLER_MODULES):
+            return _qualname(frame)
+        if fallback is None and module.startswith(FALLBACK_MODULES):
+            fallback = _qualname(frame)
+        frame = frame.f_back
+    return fallback or '<desconhecido>'
+
+
+class MongoCommandProfiler(monitoring.CommandListener):
+    """
+    Registra os comandos nos perfis ativos.
+    Sem perfil ativo, o custo é uma leitura do ContextVar por evento.
+    """
+
+    def started(self, event) -> None:
+        profiles = _active.get()
+        if not profiles:
+            return
+        pending = (event.command_name, _command_collection(event), _caller())
+        for profile in profiles:
+            profile._pending[event.request_id] = pending
+
+    def _finish(self, event) -> None:
+        for profile in _active.get():
+            pending = profile._pending.pop(event.request_id, None)
+            if pending is not None:
+                name, collection, caller = pending
+                profile.commands.append((name, collection, caller,
+                                         event.duration_micros / 1_000_000))
+
+    def succeeded(self, event) -> None:
+        self._finish(event)
+
+    def failed(self, event) -> None:
+        self._finish(event)
+
+
+def trace_sqlite_statement(statement: str) -> None:
+    """
+    Trace callback das conexões SQLite (sqlite3.Connection.set_trace_callback):
+    registra o statement nos perfis ativos, como um comando de duração zero.
+    """
+    profiles = _active.get()
+    if not profiles:
+        return
+    words = statement.split(None, 1)
+    name = words[0].upper() if words else ''
+    if not name or name in SQLITE_IGNORED_STATEMENTS:
+        return
+    table = SQLITE_TABLE_PATTERN.search(statement)
+    command = (name.lower(), table.group(1) if table else '', _caller(), 0.0)
+    for profile in profiles:
+        profile.commands.append(command)
+
+
+def start_profile() -> Tuple[RequestProfile, object]:
+    """
+    Ativa um novo perfil no contexto atual.
+
+    Returns:
+        (perfil, token) - o token deve ser passado a stop_profile
+    """
+    profile = RequestProfile()
+    return profile, _active.set(_active.get() + (profile,))
+
+
+def stop_profile(token) -> None:
+    """Desativa o perfil iniciado por start_profile."""
+    _active.reset(token)
+
+
+@contextmanager
+def profile_commands() -> Iterator[RequestProfile]:
+    """Perfila os comandos enviados dentro do bloco with."""
+    if not Config.DB_PROFILER_ENABLED:
+        raise RuntimeError('O perfil de comandos não está registrado no banco '
+                           '(defina DB_PROFILER_ENABLED = True antes de conectar)')
+    profile, token = start_profile()
+    try:
+        yield profile
+    finally:
+        stop_profile(token)
+
+
+def roundtrip_budget(config, endpoint: Optional[str]) -> int:
+    """Orçamento de idas ao banco do endpoint (DB_ROUNDTRIP_BUDGETS ou o padrão)."""
+    return config['DB_ROUNDTRIP_BUDGETS'].get(endpoint, config['DB_ROUNDTRIP_BUDGET'])
+
+
+def report_profile(profile: RequestProfile, response, method: str, path: str,
+                   budget: int, endpoint: Optional[str] = None) -> None:
+    """
+    Adiciona os cabeçalhos de depuração à resposta e registra um resumo
+    quando a requisição passa do orçamento.
+    Os totais por endpoint vão para o registro de métricas, que os soma
+    entre os workers (os cabeçalhos e o log são só desta requisição).
+    """
+    elapsed_ms = profile.total_seconds * 1000
+    response.headers['X-DB-Roundtrips'] = str(profile.count)
+    response.headers['Server-Timing'] = f'db;dur={elapsed_ms:.2f};desc="{profile.count} comandos"'
+
+    labels = (('endpoint', endpoint or '<unmatched>'),)
+    metrics.inc('todo_db_profiled_requests_total', labels)
+    metrics.inc('todo_db_roundtrips_total', labels, profile.count)
+    if profile.count > budget:
+        metrics.inc('todo_db_roundtrip_budget_exceeded_total', labels)
+        logger.warning(f"{method} {path} excedeu o orcamento de {budget} comandos: {profile.summary()}",
+                       extra={'event': 'db.roundtrip_budget_exceeded', 'roundtrips': profile.count,
+                              'budget': budget, 'by_caller': profile.by_caller()})
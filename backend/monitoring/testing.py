@@ -0,0 +1,57 @@
+"""
+Helpers de teste para o orçamento de idas ao banco.
+Falham quando um bloco ou endpoint envia mais comandos ao banco (MongoDB
+ou SQLite) do que o declarado. Requer DB_PROFILER_ENABLED = True antes da
+conexão (ver tests/test_roundtrip_budgets.py).
+
+Exemplo:
+    from monitoring.testing import assert_roundtrips
+    assert_roundtrips(client, 'POST', '/todos/login', 4,
+                      json={'email': 'a@b.com', 'password': 'x'})
+"""
+from contextlib import contextmanager
+from typing import Iterator
+from .profiler import RequestProfile, profile_commands
+
+
+class RoundTripBudgetExceeded(AssertionError):
+    """Um bloco/endpoint enviou mais comandos do que o orçamento."""
+
+
+@contextmanager
+def max_roundtrips(budget: int, label: str = 'bloco') -> Iterator[RequestProfile]:
+    """
+    Perfila o bloco with e falha se ele enviar mais de budget comandos.
+
+    Args:
+        budget: Máximo de comandos permitidos
+        label: Nome usado na mensagem de erro
+
+    Raises:
+        RoundTripBudgetExceeded: Se o orçamento for excedido
+    """
+    with profile_commands() as profile:
+        yield profile
+    if profile.count > budget:
+        raise RoundTripBudgetExceeded(
+            f'{label} excedeu o orcamento de {budget} comandos: {profile.summary()}'
+        )
+
+
+def assert_roundtrips(client, method: str, path: str, budget: int, **kwargs):
+    """
+    Executa uma requisição pelo test client e falha se ela passar do orçamento.
+
+    Args:
+        client: Test client do Flask (app.test_client())
+        method: Método HTTP
+        path: Caminho da requisição
+        budget: Máximo de comandos permitidos
+        **kwargs: Repassados ao client.open (json, headers, ...)
+
+    Returns:
+        A resposta da requisição
+    """
+    with max_roundtrips(budget, f'{method} {path}'):
+        response = client.open(path, method=method, **kwargs)
+    return response
@@ -3,6 +3,7 @@ Rotas da aplicação
 """
 from .auth_routes import auth_bp
 from .task_routes import task_bp
+from .metrics_routes import metrics_bp
 
-__all__ = ['auth_bp', 'task_bp']
+__all__ = ['auth_bp', 'task_bp', 'metrics_bp']
 
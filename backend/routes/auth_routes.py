@@ -2,15 +2,26 @@
 Rotas de Autenticação
 Gerencia todas as rotas relacionadas a autenticação de usuários.
 """
+import logging
 from flask import Blueprint, request, jsonify, session
 from services.auth_service import AuthService
+from services.password_hasher import HashPoolBusyError
 from services.session_service import SessionService
 from services.token_service import TokenService
-from database import db
 
 # Cria um Blueprint para as rotas de autenticação
 auth_bp = Blueprint('auth', __name__, url_prefix='/todos')
 
+logger = logging.getLogger(__name__)
+
+
+@auth_bp.errorhandler(HashPoolBusyError)
+def handle_hash_pool_busy(error):
+    """Responde rápido com 503 quando o pool de hash de senhas está cheio."""
+    response = jsonify({'error': 'Servidor ocupado, tente novamente em instantes'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -69,8 +80,7 @@ def login():
     user = AuthService.get_user_by_email(email)
     
     # Cria a sessão do Flask
-    session['user'] = {'email': user['email'], '_id': user['_id']}
-    session.permanent = True
+    SessionService.start_session(user['email'], user['_id'])
     
     # Marca para salvar informações legíveis após a resposta
     from flask import g
@@ -88,9 +98,9 @@ def login():
     if remember_me:
         token = TokenService.create_token(user['_id'], user['email'])
         response_data['token'] = token
-        print(f"[OK] Token de autenticacao criado para: {user['email']}")
     
-    print(f"[OK] Usuario autenticado! Sessao criada para: {user['email']}")
+    logger.info('Usuario autenticado', extra={'event': 'auth.login', 'email': user['email'],
+                                              'remember_me': bool(remember_me)})
     return jsonify(response_data), 200
 
 
@@ -115,20 +125,13 @@ def logout():
     if 'user' in session:
         # Obtém o ID da sessão antes de remover
         try:
-            sessions_collection = db.get_collection('sessions')
-            latest_session = sessions_collection.find_one(
-                {},
-                sort=[('_id', -1)]
-            )
-            if latest_session:
-                session_id = latest_session.get('id', '')
-                if session_id.startswith('session:'):
-                    session_id = session_id.replace('session:', '')
+            session_id = SessionService.get_current_session_id()
+            if session_id:
                 SessionService.deactivate_session(session_id)
-        except Exception as e:
-            print(f"[ERRO] Falha ao desativar sessao: {e}")
+        except Exception:
+            logger.exception('Falha ao desativar sessao', extra={'event': 'session.deactivate_failed'})
         
-        session.pop('user', None)
+        SessionService.end_session()
         return jsonify({'message': 'Logout bem-sucedido'}), 200
     return jsonify({'error': 'Nenhuma sessão ativa'}), 400
 
@@ -184,11 +187,7 @@ def auto_login():
         return jsonify({'error': 'Token inválido ou expirado'}), 401
 
     # Restaura a sessão
-    session['user'] = {
-        'email': user_info['email'],
-        '_id': user_info['user_id']
-    }
-    session.permanent = True
+    SessionService.start_session(user_info['email'], user_info['user_id'])
     
     # Marca para salvar informações legíveis após a resposta
     from flask import g
@@ -197,7 +196,8 @@ def auto_login():
         'user_id': user_info['user_id']
     }
     
-    print(f"[OK] Login automatico realizado para: {user_info['email']}")
+    logger.info('Login automatico realizado', extra={'event': 'auth.auto_login',
+                                                     'email': user_info['email']})
     return jsonify({
         'message': 'Login automático realizado com sucesso!',
         'user_id': user_info['user_id'],
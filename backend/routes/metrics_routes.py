@@ -0,0 +1,91 @@
+"""
+Rota de Métricas
+Expõe as métricas da aplicação no formato de texto do Prometheus.
+"""
+import hmac
+from typing import Optional, Tuple
+from flask import Blueprint, Response, current_app, request
+from monitoring import metrics
+from services.password_hasher import password_hasher
+from services.task_service import TaskService
+from services.task_events import task_events
+
+# Endereços aceitos sem METRICS_TOKEN
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1')
+
+# Cria um Blueprint para a rota de métricas
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/todos')
+
+
+def check_metrics_access(config, authorization: str,
+                         remote_addr: Optional[str]) -> Optional[Tuple[str, int]]:
+    """
+    Verifica o acesso às métricas.
+    Com METRICS_TOKEN, exige "Authorization: Bearer <token>"; sem ele, só
+    aceita conexões locais (a rota fica sob o CORS com credenciais de /todos/*).
+
+    Returns:
+        (mensagem, status 401/403) ou None se o acesso for permitido
+    """
+    token = config.get('METRICS_TOKEN')
+    if token:
+        if not hmac.compare_digest(authorization, f'Bearer {token}'):
+            return 'Não autorizado\n', 401
+    elif remote_addr not in LOOPBACK_ADDRESSES:
+        return 'Defina METRICS_TOKEN para acesso remoto\n', 403
+    return None
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Rota com as métricas da aplicação (Prometheus, text/plain 0.0.4).
+    Se METRICS_TOKEN estiver definido, exige "Authorization: Bearer <token>";
+    senão, só responde a conexões locais. Com METRICS_MULTIPROC_DIR, soma
+    os valores de todos os workers.
+    """
+    denied = check_metrics_access(current_app.config, request.headers.get('Authorization', ''),
+                                  request.remote_addr)
+    if denied is not None:
+        return Response(denied[0], status=denied[1], mimetype='text/plain')
+
+    body = metrics.render(extra=service_samples())
+    return Response(body, mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+def service_samples():
+    """Estatísticas calculadas na hora pelos serviços (caches e pool de hash)."""
+    samples = []
+
+    cache_stats = TaskService.get_cache_stats()
+    if cache_stats is not None:
+        for key in ('hits', 'misses', 'evictions', 'invalidations'):
+            samples.append((f'todo_task_cache_{key}_total', 'counter',
+                            f'Cache de listas de tarefas: {key}.', (), cache_stats[key]))
+        samples.append(('todo_task_cache_entries', 'gauge',
+                        'Listas de tarefas em cache.', (), cache_stats['entries']))
+
+    stream_stats = task_events.stats()
+    samples.extend([
+        ('todo_task_stream_connections', 'gauge', 'Conexões abertas em /todos/stream.',
+         (), stream_stats['connections']),
+        ('todo_task_stream_events_total', 'counter', 'Eventos publicados no feed de tarefas.',
+         (), stream_stats['published']),
+        ('todo_task_stream_resets_total', 'counter',
+         'Conexões que estouraram o limite de eventos pendentes.', (), stream_stats['resets']),
+        ('todo_task_stream_change_stream', 'gauge', 'Workers com o change stream do MongoDB ativo.',
+         (), int(stream_stats['change_stream'])),
+    ])
+
+    hasher_stats = password_hasher.stats()
+    samples.extend([
+        ('todo_password_hash_workers', 'gauge', 'Processos do pool de hash de senhas.',
+         (), hasher_stats['workers']),
+        ('todo_password_hash_in_flight', 'gauge', 'Hashes em execução ou na fila.',
+         (), hasher_stats['in_flight']),
+        ('todo_password_hash_completed_total', 'counter', 'Hashes concluídos.',
+         (), hasher_stats['completed']),
+        ('todo_password_hash_rejected_total', 'counter', 'Hashes rejeitados (503).',
+         (), hasher_stats['rejected']),
+    ])
+    return samples
@@ -2,9 +2,12 @@
 Rotas de Tarefas
 Gerencia todas as rotas relacionadas a tarefas.
 """
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, current_app, Response, stream_with_context
 from middleware.auth_middleware import require_auth
 from services.task_service import TaskService
+from services.task_events import (
+    task_events, sse_events, sync_connection_limit, StreamLimitError, StreamCapacityError
+)
 
 # Cria um Blueprint para as rotas de tarefas
 task_bp = Blueprint('tasks', __name__, url_prefix='/todos')
@@ -14,12 +17,106 @@ task_bp = Blueprint('tasks', __name__, url_prefix='/todos')
 @require_auth
 def get_tasks():
     """
-    Rota para recuperar todas as tarefas do usuário logado.
+    Rota para recuperar as tarefas do usuário logado.
     Requer autenticação.
+    
+    Query (opcional):
+        limit: Número máximo de tarefas por página
+        cursor: Cursor retornado em "next_cursor" pela página anterior
+        stream: "json" ou "ndjson" para resposta em streaming
+    
+    Sem "limit" e "cursor" retorna a lista completa (formato antigo).
+    Com paginação retorna {"tasks": [...], "next_cursor": "..." | null}.
+    Com "stream" (ou header Accept: application/x-ndjson) a lista completa
+    é enviada em pedaços, sem ser montada em memória.
+    
+    A resposta traz um ETag; com If-None-Match igual retorna 304 sem
+    carregar as tarefas.
+    """
+    user_id = session['user']['_id']
+
+    # A mesma versão identifica o ETag e a lista servida (ou lida do cache)
+    version = TaskService.get_list_version(user_id)
+    variant = request.query_string.decode('utf-8') + '|' + (request.accept_mimetypes.best or '')
+    etag = TaskService.make_list_etag(user_id, version, variant)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        return _with_list_cache_headers(response, etag)
+
+    response, status = _list_tasks(user_id, version)
+    response.status_code = status
+    return _with_list_cache_headers(response, etag) if status == 200 else response
+
+
+@task_bp.route('/changes', methods=['GET'])
+@require_auth
+def get_changes():
+    """
+    Rota de sincronização incremental das tarefas.
+    Requer autenticação.
+    
+    Query (opcional):
+        since: Cursor retornado em "cursor" pela sincronização anterior
+        limit: Número máximo de alterações por resposta
+    
+    Retorna {"tasks": [...], "deleted": ["_id", ...], "cursor": "...",
+    "has_more": bool, "reset": bool}. Com "reset": true (sem "since" ou com
+    um cursor antigo demais), "tasks" é a lista completa e substitui a local.
     """
     user_id = session['user']['_id']
-    tasks = TaskService.get_all_tasks(user_id)
-    return jsonify(tasks), 200
+
+    limit, error = _parse_limit(request.args.get('limit'), current_app.config['TASKS_PAGE_MAX_LIMIT'])
+    if error:
+        return error
+
+    try:
+        changes = TaskService.get_changes(user_id, request.args.get('since'), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify(changes)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response, 200
+
+
+@task_bp.route('/stream', methods=['GET'])
+@require_auth
+def stream_tasks():
+    """
+    Rota do feed de alterações das tarefas (Server-Sent Events).
+    Requer autenticação.
+    
+    Eventos:
+        created / updated: a tarefa
+        deleted: {"_id": "..."}
+        reset: eventos perdidos; o cliente deve recarregar GET /todos
+    
+    Ao reconectar, o navegador envia o header Last-Event-ID (ou a query
+    "last_event_id") e recebe os eventos perdidos.
+    
+    Desligada por padrão neste app (TASK_STREAM_SYNC_ENABLED): cada conexão
+    ocupa uma thread do worker, então o número de conexões fica abaixo de
+    SERVER_THREADS (sync_connection_limit) e o excedente recebe 429.
+    """
+    config = current_app.config
+    if not (config['TASK_STREAM_ENABLED'] and config['TASK_STREAM_SYNC_ENABLED']):
+        return jsonify({'error': 'Não encontrado'}), 404
+
+    user_id = session['user']['_id']
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        subscription = task_events.subscribe(user_id, last_event_id,
+                                             max_connections=sync_connection_limit(config))
+    except StreamCapacityError:
+        response = jsonify({'error': 'Servidor sem conexões livres para o feed'})
+        response.headers['Retry-After'] = str(max(1, config['TASK_STREAM_RETRY_MS'] // 1000))
+        return response, 429
+    except StreamLimitError:
+        return jsonify({'error': 'Muitas conexões abertas para este usuário'}), 429
+
+    chunks = sse_events(subscription, config['TASK_STREAM_HEARTBEAT'],
+                        config['TASK_STREAM_MAX_DURATION'], config['TASK_STREAM_RETRY_MS'])
+    return _with_stream_headers(Response(chunks, mimetype='text/event-stream'))
 
 
 @task_bp.route('', methods=['POST'])
@@ -44,6 +141,44 @@ def create_task():
     return jsonify(created_task), 201
 
 
+@task_bp.route('/batch', methods=['POST'])
+@require_auth
+def batch_tasks():
+    """
+    Rota para aplicar várias operações de tarefas em uma única requisição.
+    Útil para sincronizar edições feitas offline.
+    Requer autenticação.
+    
+    Body:
+        {
+            "ordered": true (opcional, padrão: true),
+            "operations": [
+                {"op": "create", "text": "Nova tarefa"},
+                {"op": "update", "_id": "...", "done": true},
+                {"op": "delete", "_id": "..."}
+            ]
+        }
+    """
+    user_id = session['user']['_id']
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    ordered = data.get('ordered', True)
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'O campo "operations" deve ser uma lista não vazia'}), 400
+    if not isinstance(ordered, bool):
+        return jsonify({'error': 'O campo "ordered" deve ser true ou false'}), 400
+
+    max_operations = current_app.config['TASKS_BATCH_MAX_OPERATIONS']
+    if len(operations) > max_operations:
+        return jsonify({
+            'error': f'O lote pode ter no máximo {max_operations} operações'
+        }), 400
+
+    results = TaskService.apply_batch(user_id, operations, ordered=ordered)
+    return jsonify({'results': results}), 200
+
+
 @task_bp.route('/<string:task_id>', methods=['PUT'])
 @require_auth
 def modify_task(task_id):
@@ -90,3 +225,69 @@ def remove_task(task_id):
     
     return jsonify({"message": "Tarefa deletada com sucesso"}), 200
 
+
+def _with_list_cache_headers(response: Response, etag: str) -> Response:
+    """Adiciona o ETag e obriga o navegador a revalidar a lista."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _with_stream_headers(response: Response) -> Response:
+    """Desliga cache e buffering de proxies (o nginx segura a resposta sem isso)."""
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _parse_limit(raw_limit, max_limit: int):
+    """
+    Valida o parâmetro "limit" (padrão e teto: max_limit).
+    
+    Returns:
+        Tupla (limite, None) ou (None, resposta de erro 400)
+    """
+    try:
+        limit = int(raw_limit) if raw_limit is not None else max_limit
+    except ValueError:
+        return None, (jsonify({'error': 'O parâmetro "limit" deve ser um número'}), 400)
+    
+    if limit < 1:
+        return None, (jsonify({'error': 'O parâmetro "limit" deve ser maior que zero'}), 400)
+    return min(limit, max_limit), None
+
+
+def _list_tasks(user_id: str, version: int):
+    """Monta a resposta de listagem (completa, paginada ou em streaming)."""
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+
+    stream_mode = request.args.get('stream')
+    if stream_mode is None and request.accept_mimetypes.best == 'application/x-ndjson':
+        stream_mode = 'ndjson'
+
+    if stream_mode is not None:
+        if stream_mode == 'ndjson':
+            chunks = TaskService.stream_tasks_ndjson(user_id)
+            mimetype = 'application/x-ndjson'
+        elif stream_mode in ('json', '1', 'true'):
+            chunks = TaskService.stream_tasks_json(user_id)
+            mimetype = 'application/json'
+        else:
+            return jsonify({'error': 'O parâmetro "stream" deve ser "json" ou "ndjson"'}), 400
+        return Response(stream_with_context(chunks), mimetype=mimetype), 200
+
+    if limit is None and cursor is None:
+        tasks = TaskService.get_all_tasks(user_id, version)
+        return jsonify(tasks), 200
+
+    limit, error = _parse_limit(limit, current_app.config['TASKS_PAGE_MAX_LIMIT'])
+    if error:
+        return error
+
+    try:
+        page = TaskService.get_tasks_page(user_id, limit, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(page), 200
@@ -0,0 +1,123 @@
+"""
+Buffer de Atividade de Sessão
+Agrupa as atualizações de "updated_at" das sessões em memória e as grava
+periodicamente no banco em uma única escrita em lote (write-behind).
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from config import Config
+from database import storage
+
+logger = logging.getLogger(__name__)
+
+
+class SessionActivityBuffer:
+    """
+    Buffer write-behind para os "touches" de atividade das sessões.
+    Mantém apenas o último timestamp por sessão e grava tudo de uma vez,
+    evitando uma escrita no banco a cada requisição autenticada.
+    """
+
+    def __init__(self, flush_interval: float = 5.0, max_size: int = 1000):
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._pending: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # Acorda a thread de gravação antes do intervalo (buffer cheio)
+        self._flush_requested = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def touch(self, session_id: str, timestamp: datetime = None, background: bool = False) -> None:
+        """
+        Registra atividade de uma sessão (apenas em memória).
+
+        Args:
+            session_id: ID da sessão
+            timestamp: Momento da atividade (padrão: agora)
+            background: Se True, um buffer cheio é gravado pela thread de
+                gravação, nunca na thread que chamou (ex.: o event loop)
+        """
+        timestamp = timestamp or datetime.utcnow()
+        with self._lock:
+            current = self._pending.get(session_id)
+            if current is None or timestamp > current:
+                self._pending[session_id] = timestamp
+            should_flush = len(self._pending) >= self.max_size
+
+        self._ensure_started()
+        if should_flush:
+            if background:
+                self._flush_requested.set()
+            else:
+                self.flush()
+
+    def discard(self, session_id: str) -> None:
+        """Remove do buffer a atividade pendente de uma sessão."""
+        with self._lock:
+            self._pending.pop(session_id, None)
+
+    def flush(self) -> int:
+        """
+        Grava as atividades pendentes em uma única escrita em lote.
+
+        Returns:
+            Número de sessões enviadas ao banco
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+
+        try:
+            storage.sessions.touch_many(pending)
+        except Exception:
+            logger.exception('Falha ao gravar atividade de sessoes',
+                             extra={'event': 'session.activity_flush_failed', 'sessions': len(pending)})
+        return len(pending)
+
+    def stop(self) -> None:
+        """Para a thread de gravação e faz o flush final."""
+        self._stop_event.set()
+        self._flush_requested.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.flush_interval)
+        self.flush()
+
+    def _ensure_started(self) -> None:
+        """Inicia a thread de gravação na primeira atividade (seguro após fork)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._flush_requested.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='session-activity-flusher',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Loop da thread de gravação periódica."""
+        while True:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            if self._stop_event.is_set():
+                return
+            self.flush()
+
+
+# Instância única do buffer usada pelo SessionService
+activity_buffer = SessionActivityBuffer(
+    flush_interval=Config.SESSION_ACTIVITY_FLUSH_INTERVAL,
+    max_size=Config.SESSION_ACTIVITY_MAX_BUFFER
+)
+
+# Garante o flush final no encerramento do processo
+atexit.register(activity_buffer.stop)
@@ -2,9 +2,13 @@
 Serviço de Autenticação
 Responsável pela lógica de negócio relacionada a autenticação de usuários.
 """
+import logging
 from typing import Optional, Dict
-from werkzeug.security import generate_password_hash, check_password_hash
 from models.user import User
+from services.password_hasher import password_hasher, HashPoolBusyError
+from services.email_filter import email_filter
+
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
@@ -24,24 +28,40 @@ class AuthService:
             
         Returns:
             ID do usuário criado ou None se o email já existe
+            
+        Raises:
+            HashPoolBusyError: Se o pool de hash estiver sobrecarregado
         """
-        # Verifica se o usuário já existe
-        existing_user = User.find_by_email(email)
-        if existing_user:
-            return None
+        # Só consulta o banco se o filtro indicar que o email pode existir
+        # (evita gerar o hash para um email já cadastrado)
+        if AuthService.email_may_exist(email):
+            if User.find_by_email(email):
+                return None
 
         # Cria hash da senha
-        password_hash = generate_password_hash(password)
+        password_hash = password_hasher.hash(password)
         
         # Cria e salva o usuário
         user = User(email=email, password_hash=password_hash)
         user_id = user.save()
         
         if user_id:
-            print(f"[OK] Usuario criado com sucesso! ID: {user_id}")
+            AuthService.on_user_created(email, user_id)
         
         return user_id
 
+    @staticmethod
+    def email_may_exist(email: str) -> bool:
+        """Indica se o email precisa ser buscado no banco (sem filtro, sempre)."""
+        return email_filter is None or email_filter.might_exist(email)
+
+    @staticmethod
+    def on_user_created(email: str, user_id: str) -> None:
+        """Registra um usuário recém-criado no filtro de emails."""
+        if email_filter is not None:
+            email_filter.add(email)
+        logger.info('Usuario criado com sucesso', extra={'event': 'auth.user_created', 'user_id': user_id})
+
     @staticmethod
     def authenticate(email: str, password: str) -> Optional[str]:
         """
@@ -53,15 +73,49 @@ class AuthService:
             
         Returns:
             ID do usuário se autenticado com sucesso, None caso contrário
+            
+        Raises:
+            HashPoolBusyError: Se o pool de hash estiver sobrecarregado
         """
         user = User.find_by_email(email)
         
         if user and user.password_hash:
-            if check_password_hash(user.password_hash, password):
+            if password_hasher.verify(user.password_hash, password):
+                AuthService._upgrade_password_hash(user, password)
                 return user._id
         
         return None
 
+    @staticmethod
+    def _upgrade_password_hash(user: User, password: str) -> None:
+        """
+        Refaz o hash da senha se ele usa um método/custo antigo.
+        Executado apenas após um login bem-sucedido (a senha é conhecida).
+        """
+        new_hash = AuthService.rehash_password(user.password_hash, password)
+        if new_hash is not None:
+            user.update_password_hash(new_hash)
+
+    @staticmethod
+    def rehash_password(password_hash: str, password: str) -> Optional[str]:
+        """
+        Gera o novo hash de uma senha se o atual usa um método/custo antigo.
+        
+        Args:
+            password_hash: Hash gravado
+            password: Senha já verificada
+            
+        Returns:
+            Novo hash, ou None se o atual está em dia ou o pool está ocupado
+        """
+        if not password_hasher.needs_rehash(password_hash):
+            return None
+        try:
+            return password_hasher.hash(password)
+        except HashPoolBusyError:
+            # Não é crítico: o hash será atualizado em um próximo login
+            return None
+
     @staticmethod
     def get_user_by_email(email: str) -> Optional[Dict]:
         """
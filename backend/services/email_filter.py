@@ -0,0 +1,93 @@
+"""
+Filtro de Emails Cadastrados
+Filtro de Bloom em memória com os emails dos usuários cadastrados.
+Um "não" do filtro é definitivo: o cadastro pula a consulta ao banco.
+Um "talvez" exige a consulta. A unicidade real é garantida pelo índice.
+"""
+import hashlib
+import math
+import threading
+from config import Config
+from database import storage
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom simples sobre um bytearray.
+    Usa hashing duplo (blake2b) para derivar as k posições.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str) -> None:
+        """Adiciona um valor ao filtro."""
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class EmailFilter:
+    """
+    Filtro dos emails já cadastrados.
+    Enquanto não for construído, responde "talvez" para qualquer email.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = None
+        self._lock = threading.Lock()
+
+    def rebuild(self) -> int:
+        """
+        Reconstrói o filtro a partir dos usuários cadastrados.
+
+        Returns:
+            Número de emails carregados
+        """
+        expected = storage.users.count()
+        bloom = BloomFilter(max(self.capacity, expected * 2), self.error_rate)
+
+        count = 0
+        for email in storage.users.iter_emails(batch_size=5000):
+            bloom.add(email)
+            count += 1
+
+        with self._lock:
+            self._filter = bloom
+        return count
+
+    def might_exist(self, email: str) -> bool:
+        """Retorna False somente se o email certamente não está cadastrado."""
+        bloom = self._filter
+        return bloom is None or email in bloom
+
+    def add(self, email: str) -> None:
+        """Registra um email recém-cadastrado."""
+        bloom = self._filter
+        if bloom is not None:
+            with self._lock:
+                bloom.add(email)
+
+
+# Instância única do filtro (None se desativado)
+email_filter = EmailFilter(
+    capacity=Config.EMAIL_FILTER_CAPACITY,
+    error_rate=Config.EMAIL_FILTER_ERROR_RATE
+) if Config.EMAIL_FILTER_ENABLED else None
@@ -0,0 +1,120 @@
+"""
+Reaper de Expiração
+Desativa em segundo plano os tokens e sessões cujo expires_at já passou.
+A remoção definitiva (e a das lápides de tarefas removidas) fica a cargo
+dos índices TTL (ver database/indexes.py) ou, no SQLite, do próprio reaper
+ao fim de cada passada.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from config import Config
+from database import storage
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryReaper:
+    """
+    Marca como inativos (is_active: False) os documentos expirados.
+    Trabalha em lotes pequenos com pausa entre eles para não sobrecarregar
+    o banco.
+    """
+    # Coleções com expires_at + is_active que precisam de desativação
+    COLLECTIONS = ('auth_tokens', 'sessions_info')
+
+    def __init__(self, interval: float = 300, batch_size: int = 500,
+                 batch_pause: float = 0.1, max_batches: int = 100):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.max_batches = max_batches
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def reap_collection(self, collection_name: str, now: datetime = None) -> int:
+        """
+        Desativa os documentos expirados de uma coleção, em lotes.
+
+        Args:
+            collection_name: Nome da coleção
+            now: Momento de referência (padrão: agora)
+
+        Returns:
+            Número de documentos desativados
+        """
+        now = now or datetime.utcnow()
+        store = storage.tokens if collection_name == 'auth_tokens' else storage.sessions
+        total = 0
+
+        for _ in range(self.max_batches):
+            count = store.deactivate_expired(now, self.batch_size)
+            total += count
+
+            if count < self.batch_size or self._stop_event.is_set():
+                break
+            time.sleep(self.batch_pause)
+
+        # Backends sem índice TTL removem aqui o que passou da retenção
+        store.purge_expired(now)
+        return total
+
+    def reap(self) -> Dict[str, int]:
+        """
+        Executa uma passada completa em todas as coleções.
+
+        Returns:
+            Número de documentos desativados por coleção (e de lápides
+            removidas, em todos_tombstones)
+        """
+        report = {}
+        for collection_name in self.COLLECTIONS:
+            try:
+                report[collection_name] = self.reap_collection(collection_name)
+            except Exception:
+                logger.exception('Falha ao desativar expirados',
+                                 extra={'event': 'reaper.failed', 'collection': collection_name})
+                report[collection_name] = 0
+
+        try:
+            report['todos_tombstones'] = storage.tasks.purge_tombstones(datetime.utcnow())
+        except Exception:
+            logger.exception('Falha ao compactar lapides de tarefas',
+                             extra={'event': 'reaper.failed', 'collection': 'todos_tombstones'})
+            report['todos_tombstones'] = 0
+        return report
+
+    def ensure_started(self) -> None:
+        """Inicia a thread do reaper se ainda não estiver rodando (seguro após fork)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='expiry-reaper',
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Para a thread do reaper."""
+        self._stop_event.set()
+
+    def _run(self) -> None:
+        """Loop da thread: uma passada a cada intervalo."""
+        while not self._stop_event.wait(self.interval):
+            self.reap()
+
+
+# Instância única do reaper
+expiry_reaper = ExpiryReaper(
+    interval=Config.EXPIRY_REAPER_INTERVAL,
+    batch_size=Config.EXPIRY_REAPER_BATCH_SIZE,
+    batch_pause=Config.EXPIRY_REAPER_BATCH_PAUSE
+)
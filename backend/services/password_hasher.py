@@ -0,0 +1,173 @@
+"""
+Pool de Hash de Senhas
+Executa o hash/verificação de senhas (Werkzeug) em processos dedicados,
+com fila limitada para que um pico de logins não trave os workers HTTP.
+"""
+import atexit
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+from config import Config
+
+
+class HashPoolBusyError(Exception):
+    """Lançada quando a fila de hash está cheia (responder com 503)."""
+
+    def __init__(self, retry_after: int):
+        super().__init__('Fila de hash de senhas cheia')
+        self.retry_after = retry_after
+
+
+def normalize_method(method: str) -> str:
+    """
+    Expande um método do Werkzeug com os parâmetros padrão, no formato
+    gravado no início do hash (ex.: 'scrypt' -> 'scrypt:32768:8:1',
+    'pbkdf2' -> 'pbkdf2:sha256:<iterações padrão>').
+    """
+    name, *params = method.split(':')
+    if name == 'scrypt' and not params:
+        params = [str(2 ** 15), '8', '1']
+    elif name == 'pbkdf2':
+        hash_name = params[0] if params else 'sha256'
+        iterations = params[1] if len(params) > 1 else str(DEFAULT_PBKDF2_ITERATIONS)
+        params = [hash_name, iterations]
+    return ':'.join([name, *params])
+
+
+def _generate(password: str, method: str) -> str:
+    """Gera o hash da senha (executado no processo do pool)."""
+    return generate_password_hash(password, method=method)
+
+
+def _check(password_hash: str, password: str) -> bool:
+    """Verifica a senha contra o hash (executado no processo do pool)."""
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """
+    Fachada para hash de senhas em um pool de processos.
+    Com workers=0 o hash roda na própria thread (útil em desenvolvimento).
+    """
+
+    def __init__(self, method: str, workers: int = 2, queue_size: int = 16,
+                 timeout: float = 10.0, retry_after: int = 1,
+                 mp_context: Optional[str] = None):
+        self.method = method
+        self._method_key = normalize_method(method)
+        self.workers = workers
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.mp_context = mp_context
+        # Vagas = processos ocupados + pedidos aguardando na fila
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def hash(self, password: str) -> str:
+        """
+        Gera o hash da senha com o método configurado.
+
+        Raises:
+            HashPoolBusyError: Se a fila estiver cheia ou o hash passar do timeout
+        """
+        return self._run(_generate, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """
+        Verifica uma senha contra o hash armazenado.
+
+        Raises:
+            HashPoolBusyError: Se a fila estiver cheia ou a verificação passar do timeout
+        """
+        return self._run(_check, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Indica se o hash foi gerado com um método/custo diferente do atual."""
+        return normalize_method(password_hash.split('$', 1)[0]) != self._method_key
+
+    def stats(self) -> Dict:
+        """Retorna as métricas do pool (profundidade da fila e latência)."""
+        with self._stats_lock:
+            average = self._total_seconds / self._completed if self._completed else 0.0
+            return {
+                'workers': self.workers,
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avg_seconds': average,
+                'max_seconds': self._max_seconds
+            }
+
+    def shutdown(self) -> None:
+        """Encerra o pool de processos."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run(self, func, *args):
+        """Executa func no pool, rejeitando na hora se não houver vaga ou ao estourar o timeout."""
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._rejected += 1
+            raise HashPoolBusyError(self.retry_after)
+
+        with self._stats_lock:
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return func(*args)
+            future = self._get_executor().submit(func, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                # Sai da fila se ainda não começou; conta como rejeitado (503)
+                future.cancel()
+                with self._stats_lock:
+                    self._rejected += 1
+                raise HashPoolBusyError(self.retry_after)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self._in_flight -= 1
+                self._completed += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+            self._slots.release()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Cria o pool na primeira utilização (depois de um eventual fork)."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    context = multiprocessing.get_context(self.mp_context) if self.mp_context else None
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=context
+                    )
+        return self._executor
+
+
+# Instância única do pool de hash
+password_hasher = PasswordHasher(
+    method=Config.PASSWORD_HASH_METHOD,
+    workers=Config.PASSWORD_HASH_WORKERS,
+    queue_size=Config.PASSWORD_HASH_QUEUE_SIZE,
+    timeout=Config.PASSWORD_HASH_TIMEOUT,
+    retry_after=Config.PASSWORD_HASH_RETRY_AFTER,
+    mp_context=Config.PASSWORD_HASH_MP_CONTEXT
+)
+
+# Encerra os processos do pool junto com a aplicação
+atexit.register(password_hasher.shutdown)
@@ -0,0 +1,92 @@
+"""
+Épocas das Sessões Assinadas
+Cada usuário tem um contador (época) gravado no banco; o cookie de uma
+sessão assinada carrega a época vigente no login. O logout incrementa a
+época, e os cookies com a época antiga deixam de valer.
+
+As épocas ficam em cache no processo: verificar um cookie não consulta o
+banco. Outros workers são avisados pelo mesmo canal das revogações de
+tokens (services/token_cache.py).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from config import Config
+from database import storage
+from services.token_cache import RevocationChannel
+
+
+class SessionEpochCache:
+    """
+    Cache LRU das épocas por usuário (user_id -> época).
+    As entradas valem por ttl segundos; um evento de revogação do usuário
+    (publicado por qualquer worker) remove a entrada antes disso.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300,
+                 channel: Optional[RevocationChannel] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.channel = channel
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> int:
+        """
+        Retorna a época atual do usuário (do cache ou, na falta, do banco).
+
+        Args:
+            user_id: ID do usuário
+
+        Returns:
+            Época atual (0 se o usuário nunca fez logout)
+        """
+        if self.channel is not None:
+            self.channel.poll(self)
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() < entry[1]:
+                self._entries.move_to_end(user_id)
+                return entry[0]
+
+        epoch = storage.users.get_session_epoch(user_id)
+        self._set(user_id, epoch)
+        return epoch
+
+    def bump(self, user_id: str) -> int:
+        """
+        Invalida as sessões assinadas do usuário em todos os workers.
+
+        Returns:
+            Nova época
+        """
+        epoch = storage.users.bump_session_epoch(user_id)
+        self._set(user_id, epoch)
+        if self.channel is not None:
+            self.channel.publish(user_id=user_id)
+        return epoch
+
+    def _set(self, user_id: str, epoch: int) -> None:
+        with self._lock:
+            self._entries[user_id] = (epoch, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        """Revogação de um token isolado: não afeta as épocas."""
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Remove a época do usuário do cache (relida no próximo acesso)."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+# Instância única usada pela interface de sessão assinada
+session_epochs = SessionEpochCache(
+    max_entries=Config.SESSION_EPOCH_CACHE_MAX_ENTRIES,
+    ttl=Config.SESSION_EPOCH_CACHE_TTL,
+    channel=RevocationChannel(sync_interval=Config.TOKEN_REVOCATION_SYNC_INTERVAL)
+)
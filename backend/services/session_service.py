@@ -1,28 +1,75 @@
 """
 Serviço de Sessão
-Responsável por salvar informações legíveis das sessões no MongoDB.
+Responsável por salvar informações legíveis das sessões no banco.
 """
+import logging
+import secrets
 from datetime import datetime, timedelta
-from database import db
+from flask import session
+from config import Config
+from database import storage
+from services.activity_buffer import activity_buffer
+from services.session_epochs import session_epochs
 from typing import Optional, Dict
 
+logger = logging.getLogger(__name__)
+
 
 class SessionService:
     """
-    Serviço para gerenciar informações legíveis de sessões no MongoDB.
+    Serviço para gerenciar informações legíveis de sessões no banco.
     Armazena email, data de criação, atualização e expiração de forma legível.
     """
     COLLECTION_NAME = 'sessions_info'
 
     @staticmethod
-    def get_collection():
-        """Retorna a coleção de informações de sessão."""
-        return db.get_collection(SessionService.COLLECTION_NAME)
+    def get_current_session_id() -> Optional[str]:
+        """
+        Retorna o ID da sessão da requisição atual.
+        O ID vem da própria interface do Flask-Session (session.sid) ou,
+        no modo assinado, do cookie; nos dois casos sem consultar o banco.
+        
+        Returns:
+            ID da sessão ou None se não houver sessão
+        """
+        return getattr(session, 'sid', None) or session.get('sid')
+
+    @staticmethod
+    def start_session(email: str, user_id: str) -> None:
+        """
+        Autentica o usuário na sessão da requisição atual.
+        No modo assinado, o cookie também recebe um ID de sessão e a época
+        atual do usuário (que o logout incrementa).
+        
+        Args:
+            email: Email do usuário
+            user_id: ID do usuário
+        """
+        session['user'] = {'email': email, '_id': user_id}
+        session.permanent = True
+        if Config.SESSION_MODE == 'signed':
+            session['sid'] = secrets.token_urlsafe(24)
+            session['epoch'] = session_epochs.get(user_id)
+
+    @staticmethod
+    def end_session() -> None:
+        """
+        Encerra a sessão da requisição atual (logout).
+        A sessão é esvaziada: no modo servidor, é removida do banco e dos
+        caches de sessão de todos os workers (ver SessionCache.discard).
+        No modo assinado, incrementa a época do usuário: todos os cookies
+        emitidos antes deixam de valer, em todos os workers.
+        """
+        user = session.pop('user', None)
+        if user is not None:
+            if Config.SESSION_MODE == 'signed':
+                session_epochs.bump(user['_id'])
+            session.clear()
 
     @staticmethod
     def create_session_info(session_id: str, email: str, user_id: str, expiration_minutes: int = 31) -> Dict:
         """
-        Cria informações legíveis de uma sessão no MongoDB.
+        Cria informações legíveis de uma sessão no banco.
         
         Args:
             session_id: ID da sessão do Flask
@@ -33,23 +80,47 @@ class SessionService:
         Returns:
             Dicionário com informações da sessão criada
         """
-        now = datetime.utcnow()
-        expiration = now + timedelta(minutes=expiration_minutes)
+        session_info = SessionService.new_session_info(session_id, email, user_id, expiration_minutes)
         
-        session_info = {
+        storage.sessions.insert(session_info)
+        
+        logger.info('Informacoes de sessao salvas', extra={'event': 'session.info_saved', 'email': email,
+                                                           'session_id': session_id[:20]})
+        return session_info
+
+    @staticmethod
+    def new_session_info(session_id: str, email: str, user_id: str, expiration_minutes: int) -> Dict:
+        """
+        Monta as informações legíveis de uma sessão nova (usado também pelo
+        modo assíncrono).
+        
+        Args:
+            session_id: ID da sessão
+            email: Email do usuário
+            user_id: ID do usuário
+            expiration_minutes: Minutos até a expiração
+            
+        Returns:
+            Documento com as informações da sessão
+        """
+        now = datetime.utcnow()
+        return {
             'session_id': session_id,
             'email': email,
             'user_id': user_id,
             'created_at': now,
             'updated_at': now,
-            'expires_at': expiration,
+            'expires_at': now + timedelta(minutes=expiration_minutes),
             'is_active': True
         }
-        
-        collection = SessionService.get_collection()
-        collection.insert_one(session_info)
-        
-        print(f"[OK] Informacoes de sessao salvas: {email} (ID: {session_id[:20]}...)")
+
+    @staticmethod
+    def to_readable(session_info: Dict) -> Dict:
+        """Converte o ObjectId e as datas de uma sessão lida do banco para strings."""
+        session_info['_id'] = str(session_info['_id'])
+        for field in ('created_at', 'updated_at', 'expires_at'):
+            if isinstance(session_info.get(field), datetime):
+                session_info[field] = session_info[field].isoformat()
         return session_info
 
     @staticmethod
@@ -63,12 +134,19 @@ class SessionService:
         Returns:
             True se atualizado com sucesso, False caso contrário
         """
-        collection = SessionService.get_collection()
-        result = collection.update_one(
-            {'session_id': session_id, 'is_active': True},
-            {'$set': {'updated_at': datetime.utcnow()}}
-        )
-        return result.modified_count > 0
+        return storage.sessions.touch(session_id, datetime.utcnow())
+
+    @staticmethod
+    def touch_session(session_id: str) -> None:
+        """
+        Registra atividade de uma sessão sem gravar imediatamente.
+        A data de atualização é agrupada no buffer de atividade e
+        gravada periodicamente em lote.
+        
+        Args:
+            session_id: ID da sessão
+        """
+        activity_buffer.touch(session_id)
 
     @staticmethod
     def deactivate_session(session_id: str) -> bool:
@@ -81,12 +159,9 @@ class SessionService:
         Returns:
             True se desativado com sucesso, False caso contrário
         """
-        collection = SessionService.get_collection()
-        result = collection.update_one(
-            {'session_id': session_id},
-            {'$set': {'is_active': False, 'updated_at': datetime.utcnow()}}
-        )
-        return result.modified_count > 0
+        activity_buffer.discard(session_id)
+
+        return storage.sessions.deactivate(session_id, datetime.utcnow())
 
     @staticmethod
     def get_session_info(session_id: str) -> Optional[Dict]:
@@ -99,18 +174,11 @@ class SessionService:
         Returns:
             Dicionário com informações da sessão ou None se não encontrado
         """
-        collection = SessionService.get_collection()
-        session_info = collection.find_one({'session_id': session_id})
+        session_info = storage.sessions.get(session_id)
         
         if session_info:
             # Converte ObjectId e datetime para strings legíveis
-            session_info['_id'] = str(session_info['_id'])
-            if isinstance(session_info.get('created_at'), datetime):
-                session_info['created_at'] = session_info['created_at'].isoformat()
-            if isinstance(session_info.get('updated_at'), datetime):
-                session_info['updated_at'] = session_info['updated_at'].isoformat()
-            if isinstance(session_info.get('expires_at'), datetime):
-                session_info['expires_at'] = session_info['expires_at'].isoformat()
+            SessionService.to_readable(session_info)
         
         return session_info
 
@@ -122,18 +190,8 @@ class SessionService:
         Returns:
             Lista de sessões ativas
         """
-        collection = SessionService.get_collection()
-        sessions = list(collection.find({'is_active': True}).sort('created_at', -1))
+        sessions = storage.sessions.list_active()
         
         # Converte para formato legível
-        for session in sessions:
-            session['_id'] = str(session['_id'])
-            if isinstance(session.get('created_at'), datetime):
-                session['created_at'] = session['created_at'].isoformat()
-            if isinstance(session.get('updated_at'), datetime):
-                session['updated_at'] = session['updated_at'].isoformat()
-            if isinstance(session.get('expires_at'), datetime):
-                session['expires_at'] = session['expires_at'].isoformat()
-        
-        return sessions
+        return [SessionService.to_readable(session) for session in sessions]
 
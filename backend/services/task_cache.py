@@ -0,0 +1,195 @@
+"""
+Cache de Listas de Tarefas
+Guarda a lista de tarefas de cada usuário com TTL, despejo LRU e
+invalidação explícita a cada alteração feita pelo TaskService.
+
+Cada entrada é marcada com a versão da lista lida antes da consulta
+(a mesma do ETag): uma entrada de outra versão nunca é servida, então
+um set atrasado ou o cache de outro worker não devolvem uma lista velha.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class MemoryCacheBackend:
+    """
+    Backend em memória do processo (LRU com TTL).
+    Limita o número de entradas e, opcionalmente, o total de bytes.
+    Cada worker tem o seu próprio cache.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int = 0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna o valor em cache ou None se ausente/expirado."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict) -> None:
+        """Guarda um valor, despejando os menos usados se necessário."""
+        size = len(json.dumps(value)) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._total_bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self._total_bytes > self.max_bytes)
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Remove uma entrada do cache."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def size(self) -> int:
+        """Número de entradas em cache."""
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+
+class FileSystemCacheBackend:
+    """
+    Backend compartilhado entre workers da mesma máquina.
+    Usa o FileSystemCache do cachelib (já instalado com o Flask-Session),
+    então a invalidação feita por um worker vale para todos.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, cache_dir: str):
+        from cachelib import FileSystemCache
+
+        self.evictions = 0
+        self._cache = FileSystemCache(
+            cache_dir,
+            threshold=max_entries,
+            default_timeout=int(ttl)
+        )
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna o valor em cache ou None se ausente/expirado."""
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Dict) -> None:
+        """Guarda um valor (o cachelib poda as entradas acima do limite)."""
+        self._cache.set(key, value)
+
+    def delete(self, key: str) -> None:
+        """Remove uma entrada do cache."""
+        self._cache.delete(key)
+
+    def size(self) -> int:
+        """Número de entradas em cache (não rastreado neste backend)."""
+        return -1
+
+
+class TaskListCache:
+    """
+    Cache das listas de tarefas por usuário, com contadores de uso.
+    O backend é escolhido pela configuração (memória ou arquivo).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f'tasks:{user_id}'
+
+    def get(self, user_id: str, version: int) -> Optional[List[Dict]]:
+        """
+        Retorna a lista em cache do usuário ou None.
+        
+        Args:
+            user_id: ID do usuário
+            version: Versão atual da lista; entradas de outra versão são ignoradas
+        """
+        entry = self.backend.get(self._key(user_id))
+        if entry is None or entry['version'] != version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['tasks']
+
+    def set(self, user_id: str, tasks: List[Dict], version: int) -> None:
+        """
+        Guarda a lista de tarefas do usuário.
+        
+        Args:
+            user_id: ID do usuário
+            tasks: Lista de tarefas
+            version: Versão da lista lida antes da consulta
+        """
+        self.backend.set(self._key(user_id), {'version': version, 'tasks': tasks})
+
+    def invalidate(self, user_id: str) -> None:
+        """Descarta a lista em cache do usuário (após uma alteração)."""
+        self.backend.delete(self._key(user_id))
+        self.invalidations += 1
+
+    def stats(self) -> Dict:
+        """Retorna os contadores do cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.backend.evictions,
+            'invalidations': self.invalidations,
+            'entries': self.backend.size()
+        }
+
+
+def create_task_cache(config) -> Optional[TaskListCache]:
+    """
+    Cria o cache de tarefas a partir da configuração.
+
+    Args:
+        config: Objeto de configuração (Config)
+
+    Returns:
+        Instância de TaskListCache ou None se o cache estiver desativado
+    """
+    backend_name = getattr(config, 'TASK_CACHE_BACKEND', None)
+    ttl = config.TASK_CACHE_TTL
+    max_entries = config.TASK_CACHE_MAX_ENTRIES
+
+    if not backend_name:
+        return None
+    if backend_name == 'memory':
+        backend = MemoryCacheBackend(ttl, max_entries, config.TASK_CACHE_MAX_BYTES)
+    elif backend_name == 'filesystem':
+        backend = FileSystemCacheBackend(ttl, max_entries, config.TASK_CACHE_DIR)
+    else:
+        raise ValueError(f'Backend de cache desconhecido: {backend_name}')
+    return TaskListCache(backend)
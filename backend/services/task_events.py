@@ -0,0 +1,405 @@
+"""
+Feed de Alterações das Tarefas (GET /todos/stream, Server-Sent Events)
+Cada conexão recebe os eventos created/updated/deleted das tarefas do
+usuário logado.
+
+Os eventos vêm do change stream da coleção de tarefas (MongoDB em replica
+set), que enxerga as escritas de todos os workers. Sem change stream
+(SQLite, mongod standalone ou TASK_STREAM_SOURCE = 'local'), o TaskService
+publica os eventos diretamente aqui, e cada worker só vê as próprias
+escritas.
+
+Os últimos eventos ficam num buffer circular: o cliente que reconecta com
+Last-Event-ID recebe o que perdeu. Cada conexão guarda no máximo
+TASK_STREAM_MAX_PENDING eventos (e bytes) não enviados; ao passar do
+limite, os pendentes são descartados e o cliente recebe um evento "reset"
+para recarregar a lista.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from config import Config
+from database import storage
+
+logger = logging.getLogger(__name__)
+
+# Tipo do evento de cada operação de um lote (POST /todos/batch)
+BATCH_EVENT_TYPES = {'create': 'created', 'update': 'updated', 'delete': 'deleted'}
+# Comentário enviado quando não há eventos (mantém proxies e o navegador conectados)
+HEARTBEAT = ': ping\n\n'
+
+
+def format_sse(event: str, data, event_id: str = None) -> str:
+    """
+    Formata um evento no protocolo text/event-stream.
+
+    Args:
+        event: Nome do evento (created, updated, deleted, reset)
+        data: Conteúdo serializável em JSON
+        event_id: ID do evento (vira o Last-Event-ID do cliente)
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class StreamLimitError(Exception):
+    """O usuário já tem o número máximo de conexões abertas no worker."""
+
+
+class StreamCapacityError(StreamLimitError):
+    """O worker já tem o número máximo de conexões abertas (todos os usuários)."""
+
+
+def sync_connection_limit(config) -> int:
+    """
+    Conexões do feed por worker no app síncrono, sempre abaixo de
+    SERVER_THREADS (cada conexão ocupa uma thread até TASK_STREAM_MAX_DURATION).
+
+    Args:
+        config: Configuração da aplicação (app.config)
+    """
+    threads = config['SERVER_THREADS']
+    limit = config['TASK_STREAM_MAX_CONNECTIONS'] or threads // 2
+    return max(0, min(limit, threads - 1))
+
+
+class Subscription:
+    """
+    Eventos pendentes de uma conexão (já formatados).
+    Acima de max_events ou max_bytes, os pendentes são descartados e a
+    próxima leitura começa com um evento "reset".
+    """
+
+    def __init__(self, user_id: str, max_events: int = 100, max_bytes: int = 256 * 1024):
+        self.user_id = user_id
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.needs_reset = False
+        # Chamado (de qualquer thread) a cada evento; usado pelo modo assíncrono
+        self.waker = None
+        self._events: deque = deque()
+        self._bytes = 0
+        self._cond = threading.Condition()
+
+    def push(self, chunk: str) -> bool:
+        """
+        Enfileira um evento formatado.
+
+        Returns:
+            True se este evento estourou o limite (pendentes descartados)
+        """
+        with self._cond:
+            if self.needs_reset:
+                # O reset já vai recarregar a lista inteira
+                return False
+            overflowed = (len(self._events) >= self.max_events
+                          or self._bytes + len(chunk) > self.max_bytes)
+            if overflowed:
+                self._events.clear()
+                self._bytes = 0
+                self.needs_reset = True
+            else:
+                self._events.append(chunk)
+                self._bytes += len(chunk)
+            self._cond.notify()
+
+        waker = self.waker
+        if waker is not None:
+            try:
+                waker()
+            except RuntimeError:
+                # Loop de eventos já encerrado (conexão fechando)
+                pass
+        return overflowed
+
+    def drain(self) -> List[str]:
+        """Retira os eventos pendentes (o "reset", se houver, vem primeiro)."""
+        with self._cond:
+            return self._take()
+
+    def wait(self, timeout: float) -> List[str]:
+        """Como drain, mas espera até timeout segundos por um evento."""
+        with self._cond:
+            if not self._events and not self.needs_reset:
+                self._cond.wait(timeout)
+            return self._take()
+
+    def _take(self) -> List[str]:
+        chunks = []
+        if self.needs_reset:
+            chunks.append(format_sse('reset', {}))
+            self.needs_reset = False
+        chunks.extend(self._events)
+        self._events.clear()
+        self._bytes = 0
+        return chunks
+
+
+class TaskEventBroker:
+    """
+    Distribui os eventos de tarefas às conexões abertas neste worker.
+    Após um fork, o filho começa sem conexões e sem a thread do change
+    stream (aberta de novo na primeira conexão).
+    """
+
+    def __init__(self, source: str = 'auto', replay_size: int = 1000, max_pending: int = 100,
+                 max_pending_bytes: int = 256 * 1024, max_per_user: int = 5):
+        self.source = source
+        self.replay_size = replay_size
+        self.max_pending = max_pending
+        self.max_pending_bytes = max_pending_bytes
+        self.max_per_user = max_per_user
+        self._reset_state()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_state)
+
+    def _reset_state(self) -> None:
+        self._lock = threading.Lock()
+        # (id, user_id, evento formatado), do mais antigo para o mais novo
+        self._replay: deque = deque(maxlen=self.replay_size)
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._connections = 0
+        # IDs dos eventos locais: prefixo do processo + sequência
+        self._prefix = uuid.uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+        self._watcher: Optional[threading.Thread] = None
+        self._watching = False
+        self._use_change_stream = self.source == 'auto'
+        self._published = 0
+        self._resets = 0
+
+    def publish(self, event_type: str, user_id: str, task: Dict, event_id: str = None) -> None:
+        """
+        Entrega um evento às conexões do usuário e o guarda para replay.
+
+        Args:
+            event_type: created, updated ou deleted
+            user_id: Dono da tarefa
+            task: Tarefa (em deleted, apenas o _id)
+            event_id: ID do evento (gerado se omitido)
+        """
+        with self._lock:
+            if event_id is None:
+                event_id = f'{self._prefix}-{next(self._sequence)}'
+            chunk = format_sse(event_type, task, event_id)
+            self._replay.append((event_id, user_id, chunk))
+            self._published += 1
+            # Dentro do lock: as conexões recebem os eventos na ordem do buffer
+            for subscription in self._subscribers.get(user_id, ()):
+                if subscription.push(chunk):
+                    self._resets += 1
+
+    def publish_local(self, event_type: str, user_id: str, task: Dict) -> None:
+        """Evento vindo do TaskService (ignorado enquanto o change stream entrega)."""
+        if not self._watching:
+            self.publish(event_type, user_id, task)
+
+    def publish_batch(self, user_id: str, results: List[Dict]) -> None:
+        """Publica as operações bem-sucedidas de um lote (TaskService.format_batch_results)."""
+        for result in results:
+            if result['status'] != 'ok':
+                continue
+            event_type = BATCH_EVENT_TYPES[result['op']]
+            task = result['task'] if event_type != 'deleted' else {'_id': result['_id']}
+            self.publish_local(event_type, user_id, task)
+
+    def subscribe(self, user_id: str, last_event_id: str = None,
+                  max_connections: int = None) -> Subscription:
+        """
+        Abre uma conexão para o usuário.
+
+        Args:
+            user_id: ID do usuário
+            last_event_id: Último evento recebido pelo cliente (reconexão)
+            max_connections: Limite de conexões abertas no worker (None = sem limite)
+
+        Returns:
+            Assinatura com os eventos perdidos já enfileirados; se o ID não
+            está mais no buffer, a assinatura começa com um "reset"
+
+        Raises:
+            StreamLimitError: Se o usuário já tem max_per_user conexões
+            StreamCapacityError: Se o worker já tem max_connections conexões
+        """
+        self.ensure_source()
+        subscription = Subscription(user_id, self.max_pending, self.max_pending_bytes)
+        with self._lock:
+            if max_connections is not None and self._connections >= max_connections:
+                raise StreamCapacityError()
+            subscriptions = self._subscribers.setdefault(user_id, [])
+            if len(subscriptions) >= self.max_per_user:
+                raise StreamLimitError()
+            if last_event_id:
+                missed = self._events_after(last_event_id)
+                if missed is None:
+                    subscription.needs_reset = True
+                else:
+                    for event_user_id, chunk in missed:
+                        if event_user_id == user_id:
+                            subscription.push(chunk)
+            subscriptions.append(subscription)
+            self._connections += 1
+        return subscription
+
+    def _events_after(self, event_id: str) -> Optional[List]:
+        """Eventos do buffer depois de event_id (None se o ID não está no buffer)."""
+        missed = None
+        for replay_id, user_id, chunk in self._replay:
+            if missed is not None:
+                missed.append((user_id, chunk))
+            elif replay_id == event_id:
+                missed = []
+        return missed
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions and subscription in subscriptions:
+                subscriptions.remove(subscription)
+                self._connections -= 1
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def stats(self) -> Dict:
+        """Conexões abertas, eventos publicados e resets por estouro de memória."""
+        with self._lock:
+            return {
+                'connections': self._connections,
+                'published': self._published,
+                'resets': self._resets,
+                'change_stream': self._watching,
+            }
+
+    def ensure_source(self) -> None:
+        """Inicia a thread do change stream (seguro após fork)."""
+        if not self._use_change_stream:
+            return
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._watcher = threading.Thread(target=self._watch, name='task-change-stream',
+                                             daemon=True)
+            self._watcher.start()
+
+    def _watch(self) -> None:
+        """
+        Lê o change stream e publica os eventos. Após uma queda, reabre a
+        partir do último resume token (enquanto isso, vale a publicação local).
+        """
+        resume_token = None
+        opened = False
+        delay = 1
+        while True:
+            try:
+                changes = storage.tasks.watch(resume_after=resume_token)
+            except Exception as e:
+                if not opened:
+                    # Sem suporte (SQLite, standalone, MongoDB < 6.0): fica só o modo local
+                    self._use_change_stream = False
+                    logger.info(f'Feed de tarefas sem change stream ({type(e).__name__}); '
+                                'usando a publicação local',
+                                extra={'event': 'task_stream.local_fallback'})
+                    return
+                logger.warning('Falha ao reabrir o change stream das tarefas',
+                               exc_info=True, extra={'event': 'task_stream.reopen_failed'})
+                if resume_token is not None:
+                    # O token pode ter saído do oplog: recomeça do presente
+                    resume_token = None
+                    self._reset_all()
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            opened = True
+            delay = 1
+            self._watching = True
+            try:
+                for change in changes:
+                    resume_token = change['resume_token']
+                    self.publish(change['type'], change['user_id'], change['task'],
+                                 event_id=change['id'])
+            except Exception:
+                logger.warning('Change stream das tarefas interrompido', exc_info=True,
+                               extra={'event': 'task_stream.interrupted'})
+            finally:
+                self._watching = False
+
+    def _reset_all(self) -> None:
+        """Eventos podem ter sido perdidos: todas as conexões recarregam a lista."""
+        with self._lock:
+            self._replay.clear()
+            for subscriptions in self._subscribers.values():
+                for subscription in subscriptions:
+                    with subscription._cond:
+                        subscription.needs_reset = True
+                        subscription._cond.notify()
+
+
+def sse_events(subscription: Subscription, heartbeat: float, max_duration: float,
+               retry_ms: int) -> Iterator[str]:
+    """
+    Corpo da resposta SSE: eventos conforme chegam e um comentário a cada
+    heartbeat segundos sem eventos. Termina após max_duration segundos (o
+    navegador reconecta com Last-Event-ID).
+    """
+    try:
+        yield f'retry: {retry_ms}\n\n' + ''.join(subscription.drain())
+        deadline = time.monotonic() + max_duration
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            chunks = subscription.wait(min(heartbeat, remaining))
+            yield ''.join(chunks) if chunks else HEARTBEAT
+    finally:
+        task_events.unsubscribe(subscription)
+
+
+async def async_sse_events(subscription: Subscription, heartbeat: float, max_duration: float,
+                           retry_ms: int) -> AsyncIterator[str]:
+    """Versão assíncrona de sse_events (não ocupa uma thread por conexão)."""
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    subscription.waker = lambda: loop.call_soon_threadsafe(ready.set)
+    try:
+        yield f'retry: {retry_ms}\n\n' + ''.join(subscription.drain())
+        deadline = time.monotonic() + max_duration
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            ready.clear()
+            chunks = subscription.drain()
+            if not chunks:
+                try:
+                    await asyncio.wait_for(ready.wait(), min(heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    pass
+                chunks = subscription.drain()
+            yield ''.join(chunks) if chunks else HEARTBEAT
+    finally:
+        subscription.waker = None
+        task_events.unsubscribe(subscription)
+
+
+# Instância única usada pelo TaskService e pelas rotas /todos/stream
+task_events = TaskEventBroker(
+    source=Config.TASK_STREAM_SOURCE,
+    replay_size=Config.TASK_STREAM_REPLAY_SIZE,
+    max_pending=Config.TASK_STREAM_MAX_PENDING,
+    max_pending_bytes=Config.TASK_STREAM_MAX_PENDING_BYTES,
+    max_per_user=Config.TASK_STREAM_MAX_PER_USER
+)
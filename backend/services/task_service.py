@@ -2,8 +2,20 @@
 Serviço de Tarefas
 Responsável pela lógica de negócio relacionada a tarefas.
 """
-from typing import Optional, Dict, List
+import base64
+import binascii
+import hashlib
+import json
+import time
+from typing import Optional, Dict, List, Iterator
+from bson import ObjectId
+from config import Config
 from models.task import Task
+from services.task_cache import create_task_cache
+from services.task_events import task_events
+
+# Cache das listas de tarefas por usuário (None se desativado)
+task_cache = create_task_cache(Config)
 
 
 class TaskService:
@@ -13,18 +25,408 @@ class TaskService:
     """
 
     @staticmethod
-    def get_all_tasks(user_id: str) -> List[Dict]:
+    def get_all_tasks(user_id: str, version: Optional[int] = None) -> List[Dict]:
         """
         Recupera todas as tarefas de um usuário.
         
         Args:
             user_id: ID do usuário
+            version: Versão da lista já lida (ex.: a usada no ETag); se
+                omitida, é lida aqui
             
         Returns:
             Lista de tarefas em formato de dicionário
         """
-        tasks = Task.find_all_by_user(user_id)
-        return [task.to_dict() for task in tasks]
+        if task_cache is None:
+            return Task.find_page_by_user(user_id)
+
+        if version is None:
+            version = Task.get_list_version(user_id)
+        tasks = task_cache.get(user_id, version)
+        if tasks is None:
+            tasks = Task.find_page_by_user(user_id)
+            task_cache.set(user_id, tasks, version)
+        return tasks
+
+    @staticmethod
+    def get_cache_stats() -> Optional[Dict]:
+        """
+        Retorna os contadores do cache de tarefas.
+        
+        Returns:
+            Dicionário com hits, misses, evictions, invalidations e entries,
+            ou None se o cache estiver desativado
+        """
+        return task_cache.stats() if task_cache is not None else None
+
+    @staticmethod
+    def _on_tasks_changed(user_id: str) -> None:
+        """
+        Invalida o cache após uma alteração.
+        A versão da lista (ETag) é incrementada pela própria escrita.
+        """
+        if task_cache is not None:
+            task_cache.invalidate(user_id)
+
+    @staticmethod
+    def get_list_version(user_id: str) -> int:
+        """
+        Retorna a versão da lista de tarefas de um usuário.
+        A mesma versão deve ser usada no ETag e no cache da resposta.
+        
+        Args:
+            user_id: ID do usuário
+            
+        Returns:
+            Versão atual da lista
+        """
+        return Task.get_list_version(user_id)
+
+    @staticmethod
+    def get_list_etag(user_id: str, variant: str = '') -> str:
+        """
+        Calcula o ETag da lista de tarefas de um usuário.
+        Depende apenas da versão da lista, sem carregar as tarefas.
+        
+        Args:
+            user_id: ID do usuário
+            variant: Identifica a representação pedida (ex.: query string)
+            
+        Returns:
+            Valor do ETag (sem aspas)
+        """
+        return TaskService.make_list_etag(user_id, Task.get_list_version(user_id), variant)
+
+    @staticmethod
+    def make_list_etag(user_id: str, version: int, variant: str = '') -> str:
+        """Calcula o ETag a partir de uma versão já conhecida da lista."""
+        raw = f'{user_id}:{version}:{variant}'.encode('utf-8')
+        return hashlib.sha1(raw).hexdigest()
+
+    @staticmethod
+    def stream_tasks_json(user_id: str) -> Iterator[str]:
+        """
+        Gera as tarefas de um usuário como um array JSON, em pedaços.
+        A memória usada é constante, independente do número de tarefas.
+        
+        Args:
+            user_id: ID do usuário
+            
+        Yields:
+            Pedaços do array JSON
+        """
+        yield '['
+        for index, task in enumerate(Task.iter_by_user(user_id)):
+            yield TaskService.json_array_item(task, index)
+        yield ']'
+
+    @staticmethod
+    def json_array_item(task: Dict, index: int) -> str:
+        """Uma tarefa do array JSON em pedaços (com a vírgula, depois da primeira)."""
+        return json.dumps(task) if index == 0 else ',' + json.dumps(task)
+
+    @staticmethod
+    def stream_tasks_ndjson(user_id: str) -> Iterator[str]:
+        """
+        Gera as tarefas de um usuário como NDJSON (uma tarefa por linha).
+        
+        Args:
+            user_id: ID do usuário
+            
+        Yields:
+            Linhas JSON terminadas em quebra de linha
+        """
+        for task in Task.iter_by_user(user_id):
+            yield json.dumps(task) + '\n'
+
+    @staticmethod
+    def get_tasks_page(user_id: str, limit: int, cursor: str = None) -> Dict:
+        """
+        Recupera uma página de tarefas de um usuário (paginação por cursor).
+        
+        Args:
+            user_id: ID do usuário
+            limit: Número máximo de tarefas na página
+            cursor: Cursor opaco retornado pela página anterior (opcional)
+            
+        Returns:
+            Dicionário com as tarefas e o cursor da próxima página (ou None)
+            
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        after_id = TaskService.decode_cursor(cursor) if cursor else None
+
+        # Busca um item a mais para saber se existe próxima página
+        tasks = Task.find_page_by_user(user_id, limit=limit + 1, after_id=after_id)
+        return TaskService.format_page(tasks, limit)
+
+    @staticmethod
+    def format_page(tasks: List[Dict], limit: int) -> Dict:
+        """Monta a página a partir das tarefas lidas (até limit + 1)."""
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = TaskService.encode_cursor(tasks[-1]['_id'])
+        
+        return {
+            'tasks': tasks,
+            'next_cursor': next_cursor
+        }
+
+    @staticmethod
+    def get_changes(user_id: str, cursor: str = None, limit: int = 500) -> Dict:
+        """
+        Sincronização incremental: o que mudou desde o cursor.
+        Sem cursor (ou com um cursor mais antigo que a retenção das lápides),
+        retorna a lista completa com "reset": True.
+        
+        Args:
+            user_id: ID do usuário
+            cursor: Cursor retornado pela sincronização anterior (opcional)
+            limit: Número máximo de alterações na resposta
+            
+        Returns:
+            Dicionário com tasks (criadas/alteradas), deleted (IDs removidos),
+            cursor, has_more e reset
+            
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        now = int(time.time())
+        since, basis = TaskService.decode_sync_cursor(cursor) if cursor else (None, None)
+
+        # A sequência é lida antes das alterações: o que for gravado no meio
+        # volta de novo na próxima sincronização (e não se perde)
+        sync_seq = Task.get_sync_seq(user_id)
+
+        if TaskService.needs_reset(since, basis, now):
+            return TaskService.format_reset(Task.find_page_by_user(user_id), sync_seq, now)
+
+        changes = Task.changes_since(user_id, since, limit + 1)
+        return TaskService.format_changes(changes, since, sync_seq, basis, now, limit)
+
+    @staticmethod
+    def needs_reset(since: Optional[int], basis: Optional[int], now: int) -> bool:
+        """Sem cursor, ou com um cursor mais antigo que a retenção das lápides."""
+        return since is None or basis < now - Config.TASK_TOMBSTONE_RETENTION_DAYS * 86400
+
+    @staticmethod
+    def format_reset(tasks: List[Dict], sync_seq: int, now: int) -> Dict:
+        """
+        Monta a resposta de get_changes com a lista completa.
+        O que for gravado depois de sync_seq volta na próxima sincronização.
+        """
+        cursor = TaskService.encode_sync_cursor(sync_seq, now)
+        return {'tasks': tasks, 'deleted': [], 'cursor': cursor, 'has_more': False, 'reset': True}
+
+    @staticmethod
+    def format_changes(changes: List[Dict], since: int, sync_seq: int, basis: int,
+                       now: int, limit: int) -> Dict:
+        """
+        Monta a resposta de get_changes a partir dos itens lidos (até limit + 1).
+        O cursor nunca passa de sync_seq; o de uma página intermediária
+        mantém o momento-base do cursor recebido. Itens depois de sync_seq
+        (escritas ainda em andamento) voltam na próxima sincronização.
+        
+        Sequências podem empatar (MongoDB): numa página cortada pelo limite,
+        os itens com a mesma sequência do primeiro que ficou de fora também
+        ficam para a próxima página, para que o cursor não pule nenhum.
+        """
+        has_more = len(changes) > limit
+        if has_more:
+            boundary = changes[limit]['seq']
+            before = [change for change in changes[:limit] if change['seq'] < boundary]
+            # Mais de limit itens empatados: a página vai inteira (sem como cortar)
+            changes = before or changes[:limit]
+            has_more = changes[-1]['seq'] < sync_seq
+        if has_more:
+            next_seq, next_basis = min(changes[-1]['seq'], sync_seq), basis
+        else:
+            next_seq, next_basis = sync_seq, now
+
+        return {
+            'tasks': [change['task'] for change in changes if 'task' in change],
+            'deleted': [change['deleted'] for change in changes if 'deleted' in change],
+            'cursor': TaskService.encode_sync_cursor(max(next_seq, since), next_basis),
+            'has_more': has_more,
+            'reset': False
+        }
+
+    @staticmethod
+    def encode_sync_cursor(seq: int, basis: int) -> str:
+        """Codifica a sequência e o momento-base (epoch) em um cursor opaco."""
+        raw = f'{seq}.{basis}'.encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_sync_cursor(cursor: str) -> tuple:
+        """
+        Decodifica um cursor de sincronização.
+        
+        Returns:
+            Tupla (sequência, momento-base)
+            
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            seq, basis = base64.urlsafe_b64decode(cursor + padding).decode('ascii').split('.')
+            return int(seq), int(basis)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValueError('Cursor inválido')
+
+    @staticmethod
+    def apply_batch(user_id: str, operations: List[Dict], ordered: bool = True) -> List[Dict]:
+        """
+        Aplica um lote de operações (create/update/delete) de uma só vez.
+        Operações inválidas recebem um resultado de erro e não são enviadas
+        ao banco; em modo ordenado, as operações seguintes são ignoradas.
+        
+        Args:
+            user_id: ID do usuário
+            operations: Lista de operações enviadas pelo cliente
+            ordered: Se True, para na primeira falha
+            
+        Returns:
+            Lista de resultados, um por operação, com o índice da operação
+        """
+        results, valid_ops, valid_index = TaskService.validate_batch(operations, ordered)
+
+        for index, result in zip(valid_index, Task.bulk_apply(user_id, valid_ops, ordered)):
+            results[index] = result
+        return TaskService.after_batch(user_id, operations, results)
+
+    @staticmethod
+    def after_batch(user_id: str, operations: List[Dict], results: List[Optional[Dict]]) -> List[Dict]:
+        """
+        Invalida o cache (se algo foi aplicado) e avisa os assinantes de um lote.
+        
+        Returns:
+            Resultados formatados (ver format_batch_results)
+        """
+        if any(result and result['status'] == 'ok' for result in results):
+            TaskService._on_tasks_changed(user_id)
+
+        formatted = TaskService.format_batch_results(operations, results)
+        task_events.publish_batch(user_id, formatted)
+        return formatted
+
+    @staticmethod
+    def validate_batch(operations: List[Dict], ordered: bool) -> tuple:
+        """
+        Valida as operações de um lote.
+        
+        Returns:
+            Tupla (resultados parciais, operações válidas, índice de cada válida)
+        """
+        results: List[Optional[Dict]] = [None] * len(operations)
+        valid_ops = []
+        valid_index = []
+
+        for index, raw_op in enumerate(operations):
+            op, error = TaskService._normalize_batch_op(raw_op)
+            if error:
+                results[index] = {'status': 'error', 'error': error}
+                if ordered:
+                    break
+                continue
+            valid_ops.append(op)
+            valid_index.append(index)
+
+        return results, valid_ops, valid_index
+
+    @staticmethod
+    def format_batch_results(operations: List[Dict], results: List[Optional[Dict]]) -> List[Dict]:
+        """Monta a resposta do lote: um resultado por operação, com índice."""
+        return [
+            {'index': index, 'op': raw_op.get('op') if isinstance(raw_op, dict) else None,
+             **(result if result is not None else {'status': 'skipped'})}
+            for index, (raw_op, result) in enumerate(zip(operations, results))
+        ]
+
+    @staticmethod
+    def _normalize_batch_op(raw_op) -> tuple:
+        """
+        Valida uma operação do lote e a converte para o formato do modelo.
+        
+        Returns:
+            Tupla (operação normalizada, mensagem de erro ou None)
+        """
+        if not isinstance(raw_op, dict):
+            return None, 'Operação inválida'
+
+        op_type = raw_op.get('op')
+        if op_type == 'create':
+            fields, error = TaskService._batch_fields(raw_op)
+            if error:
+                return None, error
+            if 'text' not in fields:
+                return None, 'O campo "text" é obrigatório'
+            return {'op': 'create', 'text': fields['text'], 'done': fields.get('done', False)}, None
+
+        if op_type not in ('update', 'delete'):
+            return None, 'O campo "op" deve ser "create", "update" ou "delete"'
+
+        task_id = raw_op.get('_id')
+        if not isinstance(task_id, str) or not ObjectId.is_valid(task_id):
+            return None, 'O campo "_id" é obrigatório e deve ser válido'
+
+        if op_type == 'delete':
+            return {'op': 'delete', '_id': task_id}, None
+
+        fields, error = TaskService._batch_fields(raw_op)
+        if error:
+            return None, error
+        if not fields:
+            return None, 'Informe "text" e/ou "done" para atualizar'
+        return {'op': 'update', '_id': task_id, 'fields': fields}, None
+
+    @staticmethod
+    def _batch_fields(raw_op: Dict) -> tuple:
+        """
+        Valida os campos "text" (texto não vazio) e "done" (booleano JSON)
+        de uma operação; campos ausentes ou null são ignorados.
+        
+        Returns:
+            Tupla (campos válidos, mensagem de erro ou None)
+        """
+        fields = {}
+        text = raw_op.get('text')
+        if text is not None:
+            if not isinstance(text, str) or not text.strip():
+                return None, 'O campo "text" deve ser um texto não vazio'
+            fields['text'] = text
+        done = raw_op.get('done')
+        if done is not None:
+            if not isinstance(done, bool):
+                return None, 'O campo "done" deve ser true ou false'
+            fields['done'] = done
+        return fields, None
+
+    @staticmethod
+    def encode_cursor(task_id: str) -> str:
+        """Codifica o _id de uma tarefa em um cursor opaco."""
+        return base64.urlsafe_b64encode(bytes.fromhex(task_id)).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> str:
+        """
+        Decodifica um cursor opaco para o _id da tarefa.
+        
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            task_id = base64.urlsafe_b64decode(cursor + padding).hex()
+        except (binascii.Error, ValueError):
+            raise ValueError('Cursor inválido')
+        
+        if not ObjectId.is_valid(task_id):
+            raise ValueError('Cursor inválido')
+        return task_id
 
     @staticmethod
     def create_task(text: str, user_id: str) -> Dict:
@@ -41,7 +443,7 @@ class TaskService:
         task = Task(text=text, done=False, user_id=user_id)
         task_id = task.save()
         task._id = task_id
-        return task.to_dict()
+        return TaskService.after_write('created', user_id, task.to_dict())
 
     @staticmethod
     def update_task(task_id: str, user_id: str, text: str = None, done: bool = None) -> Optional[Dict]:
@@ -57,20 +459,25 @@ class TaskService:
         Returns:
             Tarefa atualizada em formato de dicionário ou None se não encontrada
         """
-        task = Task.find_by_id(task_id, user_id)
-        
-        if not task:
-            return None
+        fields = TaskService.update_fields(text, done)
+        if not fields:
+            task = Task.find_by_id(task_id, user_id)
+            return task.to_dict() if task else None
 
-        # Atualiza apenas os campos fornecidos
-        update_text = text if text is not None else task.text
-        update_done = done if done is not None else task.done
-        
-        success = task.update(text=update_text, done=update_done)
-        
-        if success:
-            return task.to_dict()
-        return None
+        updated_task = Task.update_by_id(task_id, user_id, fields)
+        if updated_task:
+            TaskService.after_write('updated', user_id, updated_task)
+        return updated_task
+
+    @staticmethod
+    def update_fields(text: str = None, done: bool = None) -> Dict:
+        """Campos de uma atualização: apenas os fornecidos."""
+        fields = {}
+        if text is not None:
+            fields['text'] = text
+        if done is not None:
+            fields['done'] = done
+        return fields
 
     @staticmethod
     def delete_task(task_id: str, user_id: str) -> bool:
@@ -84,10 +491,24 @@ class TaskService:
         Returns:
             True se deletado com sucesso, False caso contrário
         """
-        task = Task.find_by_id(task_id, user_id)
-        
-        if not task:
-            return False
-
-        return task.delete()
+        was_deleted = Task.delete_by_id(task_id, user_id)
+        if was_deleted:
+            TaskService.after_write('deleted', user_id, {'_id': task_id})
+        return was_deleted
 
+    @staticmethod
+    def after_write(event_type: str, user_id: str, task: Dict) -> Dict:
+        """
+        Invalida o cache e avisa os assinantes após uma escrita aplicada.
+        
+        Args:
+            event_type: 'created', 'updated' ou 'deleted'
+            user_id: ID do usuário
+            task: Tarefa gravada (ou só o _id, na remoção)
+            
+        Returns:
+            A própria tarefa
+        """
+        TaskService._on_tasks_changed(user_id)
+        task_events.publish_local(event_type, user_id, task)
+        return task
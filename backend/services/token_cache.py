@@ -0,0 +1,174 @@
+"""
+Cache de Tokens Validados
+Evita ir ao banco a cada auto-login para o mesmo token, respeitando
+expiração e revogação (inclusive feita por outros workers).
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from database import storage
+
+
+class RevocationChannel:
+    """
+    Canal de invalidação entre workers.
+    Cada revogação grava um evento na coleção token_revocations; os workers
+    consultam os eventos recentes no máximo uma vez por intervalo.
+    """
+    COLLECTION_NAME = 'token_revocations'
+
+    def __init__(self, sync_interval: float = 1.0, overlap_seconds: float = 5.0):
+        self.sync_interval = sync_interval
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self._last_sync: Optional[datetime] = None
+        self._next_sync_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def event(token: str = None, user_id: str = None) -> Dict:
+        """Evento de revogação de um token (ou chave de sessão) ou de um usuário."""
+        event = {'created_at': datetime.utcnow()}
+        if token is not None:
+            event['token'] = token
+        if user_id is not None:
+            event['user_id'] = user_id
+        return event
+
+    def publish(self, token: str = None, user_id: str = None) -> None:
+        """Publica uma revogação de token ou de todos os tokens de um usuário."""
+        storage.tokens.publish_revocation(self.event(token=token, user_id=user_id))
+
+    def poll(self, cache: 'TokenCache') -> None:
+        """Aplica no cache os eventos publicados desde a última consulta."""
+        window = self.claim()
+        if window is not None:
+            since, sync_started = window
+            self.apply(cache, storage.tokens.revocations_since(since), sync_started)
+
+    def claim(self) -> Optional[tuple]:
+        """
+        Reserva a próxima consulta, no máximo uma por intervalo.
+        Separada de apply() para o modo assíncrono ler os eventos com o
+        driver async (sem I/O bloqueante no event loop).
+
+        Returns:
+            Tupla (ler eventos desde, início da consulta) ou None se ainda
+            não é hora de consultar
+        """
+        now = time.monotonic()
+        if now < self._next_sync_at:
+            return None
+
+        with self._lock:
+            if now < self._next_sync_at:
+                return None
+            self._next_sync_at = now + self.sync_interval
+            sync_started = datetime.utcnow()
+
+            if self._last_sync is None:
+                # Cache vazio: eventos antigos não interessam
+                self._last_sync = sync_started
+                return None
+
+            # A sobreposição cobre diferenças de relógio entre workers;
+            # reaplicar uma invalidação não tem efeito colateral
+            return self._last_sync - self.overlap, sync_started
+
+    def apply(self, cache: 'TokenCache', events, sync_started: datetime) -> None:
+        """Aplica no cache os eventos lidos para a consulta reservada em claim()."""
+        for event in events:
+            if 'token' in event:
+                cache.invalidate(event['token'])
+            if 'user_id' in event:
+                cache.invalidate_user(event['user_id'])
+        with self._lock:
+            self._last_sync = max(self._last_sync, sync_started)
+
+
+class TokenCache:
+    """
+    Cache LRU de tokens já validados.
+    Cada entrada vale até o menor entre o expires_at do token e o TTL local.
+    Também agrupa as escritas de last_used_at (no máximo uma por intervalo).
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300,
+                 last_used_interval: float = 300,
+                 channel: Optional[RevocationChannel] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.last_used_interval = last_used_interval
+        self.channel = channel
+        self._entries: OrderedDict = OrderedDict()
+        self._last_used_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str, poll: bool = True) -> Optional[Dict]:
+        """
+        Retorna as informações do usuário de um token em cache.
+
+        Args:
+            token: Token a buscar
+            poll: Se False, não consulta o canal de revogações (o chamador
+                já aplicou os eventos, ex.: o modo assíncrono)
+
+        Returns:
+            Dicionário com user_id e email, ou None se ausente/expirado
+        """
+        if poll and self.channel is not None:
+            self.channel.poll(self)
+
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            user_info, expires_at, cached_until = entry
+            if time.monotonic() >= cached_until or (
+                    expires_at is not None and datetime.utcnow() > expires_at):
+                self._entries.pop(token, None)
+                return None
+            self._entries.move_to_end(token)
+            return dict(user_info)
+
+    def set(self, token: str, user_info: Dict, expires_at: Optional[datetime]) -> None:
+        """Guarda um token validado."""
+        with self._lock:
+            self._entries[token] = (dict(user_info), expires_at, time.monotonic() + self.ttl)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._last_used_writes.pop(oldest, None)
+
+    def invalidate(self, token: str) -> None:
+        """Remove um token do cache."""
+        with self._lock:
+            self._entries.pop(token, None)
+            self._last_used_writes.pop(token, None)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Remove do cache todos os tokens de um usuário."""
+        with self._lock:
+            tokens = [
+                token for token, (user_info, _, _) in self._entries.items()
+                if user_info.get('user_id') == user_id
+            ]
+            for token in tokens:
+                self._entries.pop(token, None)
+                self._last_used_writes.pop(token, None)
+
+    def should_write_last_used(self, token: str) -> bool:
+        """
+        Indica se o last_used_at do token deve ser gravado agora.
+        Retorna True no máximo uma vez por intervalo para cada token.
+        """
+        now = time.monotonic()
+        with self._lock:
+            last_write = self._last_used_writes.get(token)
+            if last_write is not None and now - last_write < self.last_used_interval:
+                return False
+            self._last_used_writes[token] = now
+            if len(self._last_used_writes) > self.max_entries:
+                self._last_used_writes.pop(next(iter(self._last_used_writes)))
+            return True
@@ -2,11 +2,24 @@
 Serviço de Tokens de Autenticação
 Responsável por gerenciar tokens persistentes para login automático.
 """
+import logging
 import secrets
 from datetime import datetime, timedelta
-from database import db
+from config import Config
+from database import storage
+from services.token_cache import TokenCache, RevocationChannel
 from typing import Optional, Dict
 
+logger = logging.getLogger(__name__)
+
+# Cache de tokens validados (None se desativado)
+token_cache = TokenCache(
+    max_entries=Config.TOKEN_CACHE_MAX_ENTRIES,
+    ttl=Config.TOKEN_CACHE_TTL,
+    last_used_interval=Config.TOKEN_LAST_USED_WRITE_INTERVAL,
+    channel=RevocationChannel(sync_interval=Config.TOKEN_REVOCATION_SYNC_INTERVAL)
+) if Config.TOKEN_CACHE_ENABLED else None
+
 
 class TokenService:
     """
@@ -15,11 +28,6 @@ class TokenService:
     """
     COLLECTION_NAME = 'auth_tokens'
 
-    @staticmethod
-    def get_collection():
-        """Retorna a coleção de tokens."""
-        return db.get_collection(TokenService.COLLECTION_NAME)
-
     @staticmethod
     def create_token(user_id: str, email: str, days_valid: int = 30) -> str:
         """
@@ -33,25 +41,35 @@ class TokenService:
         Returns:
             Token gerado
         """
-        # Gera um token único e seguro
-        token = secrets.token_urlsafe(32)
+        token_data = TokenService.new_token_data(user_id, email, days_valid)
+        storage.tokens.insert(token_data)
         
-        expires_at = datetime.utcnow() + timedelta(days=days_valid)
+        logger.info('Token criado', extra={'event': 'auth.token_created', 'email': email,
+                                           'days_valid': days_valid})
+        return token_data['token']
+
+    @staticmethod
+    def new_token_data(user_id: str, email: str, days_valid: int) -> Dict:
+        """
+        Monta o documento de um token novo (usado também pelo modo assíncrono).
         
-        token_data = {
-            'token': token,
+        Args:
+            user_id: ID do usuário
+            email: Email do usuário
+            days_valid: Dias de validade do token
+            
+        Returns:
+            Documento do token, com um token único e seguro
+        """
+        now = datetime.utcnow()
+        return {
+            'token': secrets.token_urlsafe(32),
             'user_id': user_id,
             'email': email,
-            'created_at': datetime.utcnow(),
-            'expires_at': expires_at,
+            'created_at': now,
+            'expires_at': now + timedelta(days=days_valid),
             'is_active': True
         }
-        
-        collection = TokenService.get_collection()
-        collection.insert_one(token_data)
-        
-        print(f"[OK] Token criado para usuario: {email} (valido por {days_valid} dias)")
-        return token
 
     @staticmethod
     def validate_token(token: str) -> Optional[Dict]:
@@ -64,36 +82,70 @@ class TokenService:
         Returns:
             Dicionário com informações do usuário ou None se inválido
         """
-        collection = TokenService.get_collection()
-        token_doc = collection.find_one({
-            'token': token,
-            'is_active': True
-        })
+        if token_cache is not None:
+            user_info = token_cache.get(token)
+            if user_info is not None:
+                TokenService._touch_last_used(token)
+                return user_info
+
+        token_doc = storage.tokens.find_active(token)
         
         if not token_doc:
             return None
         
-        # Verifica se o token não expirou
-        expires_at = token_doc.get('expires_at')
-        if isinstance(expires_at, datetime):
-            if datetime.utcnow() > expires_at:
-                # Marca o token como inativo
-                collection.update_one(
-                    {'_id': token_doc['_id']},
-                    {'$set': {'is_active': False}}
-                )
-                return None
+        if TokenService.is_expired(token_doc):
+            # Marca o token como inativo
+            storage.tokens.deactivate(token)
+            return None
+        
+        user_info = TokenService.accept_token(token, token_doc)
         
         # Atualiza a última data de uso
-        collection.update_one(
-            {'_id': token_doc['_id']},
-            {'$set': {'last_used_at': datetime.utcnow()}}
-        )
+        TokenService._touch_last_used(token)
         
-        return {
+        return user_info
+
+    @staticmethod
+    def is_expired(token_doc: Dict) -> bool:
+        """Indica se o token lido do banco já passou do expires_at."""
+        expires_at = token_doc.get('expires_at')
+        return isinstance(expires_at, datetime) and datetime.utcnow() > expires_at
+
+    @staticmethod
+    def accept_token(token: str, token_doc: Dict) -> Dict:
+        """
+        Registra um token válido lido do banco (no cache, se ativo).
+        
+        Args:
+            token: Token validado
+            token_doc: Documento do token (user_id, email, expires_at)
+            
+        Returns:
+            Dicionário com as informações do usuário
+        """
+        user_info = {
             'user_id': token_doc['user_id'],
             'email': token_doc['email']
         }
+        
+        if token_cache is not None:
+            expires_at = token_doc.get('expires_at')
+            token_cache.set(token, user_info, expires_at if isinstance(expires_at, datetime) else None)
+        return user_info
+
+    @staticmethod
+    def _touch_last_used(token: str) -> None:
+        """
+        Atualiza a última data de uso do token.
+        Com o cache ativo, grava no máximo uma vez por intervalo.
+        """
+        if TokenService.last_used_due(token):
+            storage.tokens.touch_last_used(token, datetime.utcnow())
+
+    @staticmethod
+    def last_used_due(token: str) -> bool:
+        """Indica se o last_used_at deve ser gravado agora (sem cache, sempre)."""
+        return token_cache is None or token_cache.should_write_last_used(token)
 
     @staticmethod
     def revoke_token(token: str) -> bool:
@@ -106,12 +158,12 @@ class TokenService:
         Returns:
             True se revogado com sucesso, False caso contrário
         """
-        collection = TokenService.get_collection()
-        result = collection.update_one(
-            {'token': token},
-            {'$set': {'is_active': False, 'revoked_at': datetime.utcnow()}}
-        )
-        return result.modified_count > 0
+        revoked = storage.tokens.revoke(token, datetime.utcnow())
+        
+        if token_cache is not None:
+            token_cache.invalidate(token)
+            token_cache.channel.publish(token=token)
+        return revoked
 
     @staticmethod
     def revoke_all_user_tokens(user_id: str) -> int:
@@ -124,10 +176,10 @@ class TokenService:
         Returns:
             Número de tokens revogados
         """
-        collection = TokenService.get_collection()
-        result = collection.update_many(
-            {'user_id': user_id, 'is_active': True},
-            {'$set': {'is_active': False, 'revoked_at': datetime.utcnow()}}
-        )
-        return result.modified_count
+        revoked_count = storage.tokens.revoke_user(user_id, datetime.utcnow())
+        
+        if token_cache is not None:
+            token_cache.invalidate_user(user_id)
+            token_cache.channel.publish(user_id=user_id)
+        return revoked_count
 
@@ -0,0 +1,54 @@
+"""
+Configuração dos testes: SQLite em memória com o perfil de comandos ativo.
+As variáveis TODO_* são lidas pelo config.py na importação, então precisam
+ser definidas antes de qualquer import do app.
+"""
+import os
+import sys
+import tempfile
+import uuid
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+_tmp_dir = tempfile.mkdtemp(prefix='todo_tests_')
+os.environ.update({
+    'TODO_STORAGE_BACKEND': 'sqlite',
+    'TODO_SQLITE_PATH': ':memory:',
+    'TODO_SESSION_CACHELIB_DIR': os.path.join(_tmp_dir, 'sessions'),
+    'TODO_TASK_CACHE_DIR': os.path.join(_tmp_dir, 'task_cache'),
+    'TODO_DB_PROFILER_ENABLED': 'true',
+    'TODO_PASSWORD_HASH_WORKERS': '0',
+    'TODO_SECRET_KEY': 'test-secret-key',
+    'TODO_LOG_LEVEL': 'ERROR',
+})
+
+PASSWORD = 'secret123'
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Aplicação Flask criada uma vez (o banco em memória vive no processo)."""
+    from app import app as flask_app
+    flask_app.testing = True
+    return flask_app
+
+
+@pytest.fixture
+def credentials(app):
+    """Email e senha de um usuário novo, já cadastrado."""
+    email = f'{uuid.uuid4().hex[:12]}@example.com'
+    response = app.test_client().post('/todos/register', json={'email': email, 'password': PASSWORD})
+    assert response.status_code == 201
+    return {'email': email, 'password': PASSWORD}
+
+
+@pytest.fixture
+def client(app, credentials):
+    """Test client com a sessão do usuário de credentials já aberta."""
+    test_client = app.test_client()
+    response = test_client.post('/todos/login', json=credentials)
+    assert response.status_code == 200
+    return test_client
@@ -0,0 +1,76 @@
+"""
+Orçamento de idas ao banco das rotas principais (SQLite em memória).
+Cada statement conta como uma ida (ver monitoring.profiler); uma consulta
+a mais em qualquer caminho faz o teste falhar com o resumo por chamador.
+"""
+import pytest
+from monitoring.testing import assert_roundtrips
+
+MISSING_ID = '0' * 24
+
+# Login: busca do usuário (2x, authenticate e get_user_by_email) e a sessão
+LOGIN_BUDGET = 3
+# Com remember_me, mais o token de login automático
+LOGIN_REMEMBER_BUDGET = 4
+# Lista sem cache: versão + página; com o cache da versão atual, só a versão
+LIST_COLD_BUDGET = 2
+LIST_CACHED_BUDGET = 1
+# Escritas: sequência, a escrita, a versão (e a releitura ou a lápide)
+UPDATE_BUDGET = 4
+UPDATE_MISSING_BUDGET = 2
+DELETE_BUDGET = 4
+DELETE_MISSING_BUDGET = 1
+
+
+@pytest.fixture
+def task(client):
+    """Tarefa nova do usuário logado."""
+    response = client.post('/todos', json={'text': 'comprar pão'})
+    assert response.status_code == 201
+    return response.get_json()
+
+
+@pytest.mark.parametrize('remember_me, budget', [
+    (False, LOGIN_BUDGET),
+    (True, LOGIN_REMEMBER_BUDGET),
+])
+def test_login(app, credentials, remember_me, budget):
+    response = assert_roundtrips(app.test_client(), 'POST', '/todos/login', budget,
+                                 json={**credentials, 'remember_me': remember_me})
+    assert response.status_code == 200
+    assert ('token' in response.get_json()) is remember_me
+
+
+def test_list_tasks(client, task):
+    response = assert_roundtrips(client, 'GET', '/todos', LIST_COLD_BUDGET)
+    assert response.status_code == 200
+    assert [item['_id'] for item in response.get_json()] == [task['_id']]
+
+    response = assert_roundtrips(client, 'GET', '/todos', LIST_CACHED_BUDGET)
+    assert response.status_code == 200
+
+
+def test_update_task(client, task):
+    response = assert_roundtrips(client, 'PUT', f"/todos/{task['_id']}", UPDATE_BUDGET,
+                                 json={'done': True})
+    assert response.status_code == 200
+    assert response.get_json()['done'] is True
+
+    response = assert_roundtrips(client, 'PUT', f'/todos/{MISSING_ID}', UPDATE_MISSING_BUDGET,
+                                 json={'done': True})
+    assert response.status_code == 404
+
+
+def test_delete_task(client, task):
+    response = assert_roundtrips(client, 'DELETE', f"/todos/{task['_id']}", DELETE_BUDGET)
+    assert response.status_code == 200
+
+    response = assert_roundtrips(client, 'DELETE', f"/todos/{task['_id']}", DELETE_MISSING_BUDGET)
+    assert response.status_code == 404
+
+
+def test_budget_exceeded_reports_callers(client, task):
+    with pytest.raises(AssertionError) as excinfo:
+        assert_roundtrips(client, 'PUT', f"/todos/{task['_id']}", UPDATE_BUDGET - 1,
+                          json={'text': 'comprar leite'})
+    assert 'Task.update_by_id' in str(excinfo.value)
@@ -0,0 +1,12 @@
+# /backend/wsgi.py
+"""
+Ponto de entrada WSGI (produção, vários workers).
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+As configurações vêm de config.py, do arquivo em TODO_CONFIG_FILE e das
+variáveis TODO_<NOME> (ver config.load_settings).
+"""
+from app import app
+
+__all__ = ['app']